@@ -1,20 +1,141 @@
-POST_MAX_LEN = 280
+import re
+import unicodedata
+
+# Bluesky begrenzt Posts auf 300 Grapheme (sichtbare Zeichen), nicht auf Code Points
+POST_MAX_GRAPHEMES = 300
 
 HASHTAGS = ["#Berlin", "#Verkehr", "#Baustelle", "#Sperrung", "#Störung", "#Straße"]
 
-def beautify_text(message, resolved: bool = False):
-    """Formatiert den Post-Text mit Emojis, Hashtags und Splits."""
+# Emojis für Schlüsselbegriffe
+REPLACEMENTS = {
+    "Baustelle": "🚧 Baustelle",
+    "Sperrung": "⛔ Sperrung",
+    "Gefahr": "⚠️ Gefahr",
+    "Fahrbahn": "🛣️ Fahrbahn",
+    "Ampel": "🚦 Ampel",
+}
+# Alle Ersetzungen in einem Durchlauf (Schlüssel überlappen nicht, Ergebnis wie nacheinander)
+_REPLACE_RE = re.compile("|".join(re.escape(word) for word in REPLACEMENTS))
+
+# Hashtag wie von Bluesky erkannt: '#' am Wortanfang, danach Buchstaben/Ziffern/_
+_HASHTAG_RE = re.compile(r"(?<![\w#])#(\w+)")
+FACET_TAG_TYPE = "app.bsky.richtext.facet#tag"
+
+# ----------------------------- Grapheme -----------------------------
+_ZWJ = "\u200d"
+
+def _is_extend(ch):
+    """Zeichen, das an das vorige Graphem angehängt wird (Näherung an UAX #29)."""
+    cp = ord(ch)
+    if cp < 0x300:
+        return False
+    return (
+        0xFE00 <= cp <= 0xFE0F          # Variation Selectors (z. B. VS16 bei 🛣️)
+        or 0x1F3FB <= cp <= 0x1F3FF     # Hautfarben-Modifikatoren
+        or 0xE0020 <= cp <= 0xE007F     # Tag-Zeichen (Flaggen-Sequenzen)
+        or ch == _ZWJ
+        or unicodedata.category(ch) in ("Mn", "Me", "Mc")
+    )
+
+def _is_regional_indicator(ch):
+    return 0x1F1E6 <= ord(ch) <= 0x1F1FF
+
+def grapheme_starts(text):
+    """Startindizes (Code Points) aller Grapheme im Text, in einem Durchlauf."""
+    starts = []
+    prev = None
+    ri_open = False  # vorheriges Regional-Indicator-Zeichen wartet auf seinen Partner
+    for i, ch in enumerate(text):
+        if prev is None:
+            joined = False
+        elif prev == "\r" and ch == "\n":
+            joined = True
+        elif _is_extend(ch):
+            joined = True
+        elif prev == _ZWJ and not ch.isspace():
+            joined = True  # ZWJ-Sequenz (👩‍💻)
+        elif ri_open and _is_regional_indicator(ch):
+            joined = True  # Flagge aus zwei Regional Indicators
+        else:
+            joined = False
+
+        if _is_regional_indicator(ch):
+            ri_open = not (joined and ri_open)
+        elif not _is_extend(ch):
+            ri_open = False
+
+        if not joined:
+            starts.append(i)
+        prev = ch
+    return starts
+
+def grapheme_len(text):
+    """Länge in Graphemen, wie Bluesky sie zählt (Näherung)."""
+    if text.isascii():
+        return len(text) - text.count("\r\n")
+    return len(grapheme_starts(text))
+
+# ----------------------------- Splitten -----------------------------
+def split_text(text, limit=POST_MAX_GRAPHEMES):
+    """Teilt text in Posts mit höchstens limit Graphemen, in einem Durchlauf.
+
+    Getrennt wird am letzten Leerraum vor der Grenze, aber nie direkt hinter
+    einem '#'. Gibt es keinen, wird hart an der Graphem-Grenze getrennt.
+    Jeder Teil wird genau einmal aus text herausgeschnitten.
+    """
+    starts = grapheme_starts(text)
+    starts.append(len(text))
+
+    parts = []
+    part_start = 0        # Index in starts, an dem der aktuelle Teil beginnt
+    last_break = None     # Index in starts des letzten erlaubten Trennzeichens
+    g = 0
+    while g < len(starts) - 1:
+        pos = starts[g]
+        ch = text[pos]
+        if ch in " \n" and pos > 0 and text[pos - 1] != "#":
+            last_break = g
+        if g - part_start >= limit:
+            cut = last_break if last_break is not None and last_break > part_start else g
+            part = text[starts[part_start]:starts[cut]].strip()
+            if part:
+                parts.append(part)
+            part_start = cut
+            last_break = None
+            # Leerraum am Anfang des nächsten Teils überspringen
+            while part_start < len(starts) - 1 and text[starts[part_start]].isspace():
+                part_start += 1
+            g = part_start
+            continue
+        g += 1
+
+    rest = text[starts[part_start]:].strip()
+    if rest or not parts:
+        parts.append(rest)
+    return parts
+
+# ----------------------------- Facets -----------------------------
+def hashtag_facets(text):
+    """Richtext-Facets für alle Hashtags, mit UTF-8-Byte-Offsets."""
+    facets = []
+    byte_pos = 0
+    char_pos = 0
+    for match in _HASHTAG_RE.finditer(text):
+        start, end = match.span()
+        byte_pos += len(text[char_pos:start].encode("utf-8"))
+        byte_end = byte_pos + len(text[start:end].encode("utf-8"))
+        facets.append({
+            "index": {"byteStart": byte_pos, "byteEnd": byte_end},
+            "features": [{"$type": FACET_TAG_TYPE, "tag": match.group(1)}],
+        })
+        byte_pos, char_pos = byte_end, end
+    return facets
+
+def format_text(message, resolved: bool = False):
+    """Post-Text vor dem Splitten: Emojis, ggf. Behoben-Prefix und Hashtags."""
 
     # Emojis für Schlüsselbegriffe ersetzen
-    replacements = {
-        "Baustelle": "🚧 Baustelle",
-        "Sperrung": "⛔ Sperrung",
-        "Gefahr": "⚠️ Gefahr",
-        "Fahrbahn": "🛣️ Fahrbahn",
-        "Ampel": "🚦 Ampel",
-    }
-    for word, emoji in replacements.items():
-        message = message.replace(word, emoji)
+    message = _REPLACE_RE.sub(lambda m: REPLACEMENTS[m.group(0)], message)
 
     # Falls behoben → Prefix hinzufügen
     if resolved:
@@ -22,21 +143,8 @@ def beautify_text(message, resolved: bool = False):
 
     # Hashtags erst NACH dem Split anhängen (damit sie immer ganz bleiben)
     hashtags_text = " ".join(HASHTAGS)
-    full_text = f"{message}\n{hashtags_text}"
-
-    parts = []
-    while len(full_text) > POST_MAX_LEN:
-        # nicht mitten in einem Wort oder Hashtag trennen
-        split_idx = full_text.rfind(" ", 0, POST_MAX_LEN)
-        while split_idx > 0 and full_text[split_idx - 1] == "#":
-            split_idx = full_text.rfind(" ", 0, split_idx - 1)
+    return f"{message}\n{hashtags_text}"
 
-        if split_idx == -1:
-            split_idx = POST_MAX_LEN
-
-        parts.append(full_text[:split_idx].strip())
-        full_text = full_text[split_idx:].strip()
-
-    parts.append(full_text.strip())
-
-    return parts
+def beautify_text(message, resolved: bool = False):
+    """Formatiert den Post-Text mit Emojis, Hashtags und Splits."""
+    return split_text(format_text(message, resolved))
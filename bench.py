@@ -0,0 +1,291 @@
+"""Benchmarks der optimierten Pfade gegen die bisherigen Implementierungen.
+
+Aufruf:
+    python bench.py normalize [datei.json ...]   (Standard: data.json)
+    python bench.py parser [seite.html ...]      (Standard: Seiten aus data.json)
+"""
+import re
+import sys
+import json
+import timeit
+import logging
+import tracemalloc
+import unicodedata
+
+from bs4 import BeautifulSoup
+
+from normalize import normalize_many
+from records import build_notice
+from fallback import (
+    PARSER_BACKEND, STREAM_CHUNK_SIZE, _inner_text, iter_notices, needs_js_rendering, parse_viz_html,
+)
+
+logger = logging.getLogger(__name__)
+
+def _load_messages(paths):
+    messages = []
+    for path in paths or ["data.json"]:
+        with open(path, "r", encoding="utf-8") as f:
+            messages.extend(json.load(f))
+    return messages
+
+# ----------------------------- Normalisierung -----------------------------
+def _normalize_message_legacy(message: str) -> str:
+    """Bisherige Implementierung aus bot.py, nur als Referenz für den Benchmark."""
+    if not message or not isinstance(message, str):
+        return ""
+    msg = message.lower().strip()
+    msg = msg.replace("\u200b", "").replace("\xa0", " ")
+    msg = "".join(ch for ch in msg if not unicodedata.category(ch).startswith("So"))
+    msg = re.sub(r"[^a-z0-9äöüß|,.:;\/\- ]+", " ", msg)
+    msg = re.sub(r"\s+", " ", msg).strip()
+    msg = msg.replace(" | ", "|")
+    return msg
+
+def bench_normalize(messages, number=20):
+    """Vergleicht alte und neue Normalisierung und prüft byte-identische Ausgabe."""
+    expected = [_normalize_message_legacy(m) for m in messages]
+    actual = list(normalize_many(messages))
+    mismatches = sum(1 for e, a in zip(expected, actual) if e != a)
+
+    legacy = timeit.timeit(lambda: [_normalize_message_legacy(m) for m in messages], number=number)
+    fast = timeit.timeit(lambda: list(normalize_many(messages)), number=number)
+    return {
+        "messages": len(messages),
+        "mismatches": mismatches,
+        "legacy_ms": legacy / number * 1000,
+        "fast_ms": fast / number * 1000,
+        "speedup": legacy / fast if fast else float("inf"),
+    }
+
+def main_normalize(paths):
+    messages = _load_messages(paths)
+    # Zusätzlich "rohe" Varianten mit Emojis, Großbuchstaben und Sonderzeichen
+    messages += [f"🚧 {m.upper()} ⛔ | 🛣️ «Info»​" for m in messages]
+
+    result = bench_normalize(messages)
+    print(f"{result['messages']} Meldungen, {result['mismatches']} Abweichungen")
+    print(f"alt: {result['legacy_ms']:.2f} ms, neu: {result['fast_ms']:.2f} ms, Faktor {result['speedup']:.1f}x")
+    return not result["mismatches"]
+
+# ----------------------------- Fallback-Parser -----------------------------
+def _parse_viz_html_legacy(content):
+    """Bisheriger Parser (html.parser, ganzer Baum) - nur als Referenz für den Benchmark."""
+    soup = BeautifulSoup(content, 'html.parser')
+    
+    # Debug: HTML-Struktur analysieren
+    logger.info("🔍 Analysiere HTML-Struktur...")
+    
+    # Zuerst schauen, ob überhaupt Content da ist
+    body_text = soup.get_text(strip=True)[:500]
+    logger.info(f"🔍 Body-Text (erste 500 Zeichen): {body_text}")
+    
+    # Nach verschiedenen möglichen Container-Strukturen suchen
+    selectors_to_try = [
+        'li.construction-sites-item',
+        '.construction-sites-item',
+        'li[class*="construction"]',
+        '.item-container li',
+        '.construction-item',
+        '.traffic-item',
+        '.disruption-item',
+        'article',
+        '.entry',
+        '.post',
+        '[class*="baustelle"]',
+        '[class*="sperrung"]',
+        '[class*="störung"]',
+        '[class*="traffic"]',
+        '[class*="item"]'
+    ]
+    
+    items = []
+    
+    for selector in selectors_to_try:
+        items = soup.select(selector)
+        if items:
+            logger.info(f"✅ {len(items)} Elemente mit Selector '{selector}' gefunden")
+            break
+        else:
+            logger.debug(f"❌ Kein Element mit Selector '{selector}' gefunden")
+    
+    if not items:
+        logger.info("🔍 Keine spezifischen Selektoren erfolgreich, versuche generische Suche...")
+        
+        # Fallback: Alle Elemente mit genug Text und relevanten Keywords
+        all_elements = soup.find_all(['div', 'li', 'article', 'section'])
+        keywords = ['baustelle', 'sperrung', 'störung', 'verkehr', 'straße', 'autobahn', 'umleit']
+        
+        for elem in all_elements:
+            text = elem.get_text(strip=True).lower()
+            if (len(text) > 30 and 
+                any(keyword in text for keyword in keywords) and
+                not elem.find_parent(['script', 'style', 'nav', 'header', 'footer'])):
+                items.append(elem)
+        
+        logger.info(f"🔄 Keyword-basierte Suche: {len(items)} relevante Elemente gefunden")
+    
+    if not items:
+        # Letzte Fallback-Strategie: Alle li-Elemente mit substantiellem Inhalt
+        all_lis = soup.find_all('li')
+        items = []
+        for li in all_lis:
+            text = li.get_text(strip=True)
+            # Mindestens 20 Zeichen, aber nicht nur Navigation/Footer-Content
+            if (len(text) > 20 and 
+                not text.lower().startswith(('home', 'kontakt', 'impressum', 'datenschutz')) and
+                not li.find_parent(['nav', 'footer', 'header'])):
+                items.append(li)
+        
+        logger.info(f"🔄 Generische li-Suche: {len(items)} Elemente gefunden")
+    
+    updates = []
+    processed = 0
+    
+    for item in items:
+        try:
+            text_content = item.get_text()
+            
+            # Filter für zu kurze oder irrelevante Inhalte
+            if text_content.strip().lower().startswith(('cookie', 'datenschutz', 'impressum', 'kontakt')):
+                continue
+            
+            # Dieselben Felder wie der Selenium-Scraper (strong = Titel, spans = Details),
+            # damit die State-Schlüssel unabhängig vom Scraper identisch sind
+            strong = item.find('strong')
+            title = _inner_text(strong) if strong else None
+            span_texts = [_inner_text(span) for span in item.find_all('span')]
+            
+            notice = build_notice(text_content, title, span_texts)
+            if notice:
+                updates.append(notice)
+                processed += 1
+                
+                # Debug für erste paar Nachrichten
+                if processed <= 3:
+                    logger.info(f"📋 Extrahierte Nachricht {processed}: {notice.message[:100]}...")
+            
+        except Exception as e:
+            logger.debug(f"Fehler beim Verarbeiten eines Fallback-Eintrags: {e}")
+            continue
+    
+    logger.info(f"✅ Fallback-Scraper: {processed} von {len(items)} Elementen verarbeitet")
+    
+    # Debug: Wenn keine Updates gefunden wurden
+    if not updates and items:
+        logger.warning("⚠️ Elemente gefunden, aber keine Updates extrahiert")
+        for i, item in enumerate(items[:3]):
+            sample_text = item.get_text(strip=True)[:100]
+            logger.info(f"📋 Beispiel-Element {i+1}: {sample_text}...")
+    
+    return updates
+
+def sample_page(messages, with_classes=True):
+    """Baut eine VIZ-ähnliche Seite (Navigation, Footer, verschachtelte Liste) aus Meldungen."""
+    item_class = "construction-sites-item" if with_classes else "box"
+    container_class = "item-container" if with_classes else "content"
+    nav = "".join(f"<li><a href='#'>Menüpunkt {i}</a></li>" for i in range(40))
+    items = []
+    for message in messages:
+        fields = [f.strip() for f in message.split("|")]
+        spans = "".join(f"<span>{f}</span>" for f in fields[1:])
+        items.append(
+            f"<li class='{item_class}'><div class='head'><strong>{fields[0]}</strong></div>"
+            f"<div class='body'><p>{spans}<span>Zeitraum: 01.01.2025 - 31.12.2025</span></p></div></li>"
+        )
+    return (
+        "<html><head><script>var x = 1;</script><style>li {}</style></head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        f"<main><div class='{container_class}'><section><ul>{''.join(items)}</ul></section></div></main>"
+        f"<footer><ul><li>Impressum</li><li>Datenschutz</li></ul></footer></body></html>"
+    ).encode("utf-8")
+
+def benchmark(pages, number=5):
+    """Vergleicht alten und neuen Parser: identische Meldungen und Laufzeit."""
+    logging.disable(logging.CRITICAL)
+    try:
+        results = []
+        for name, content in pages:
+            expected = [n.message for n in _parse_viz_html_legacy(content)]
+            actual = [n.message for n in parse_viz_html(content)]
+            legacy = min(timeit.repeat(lambda: _parse_viz_html_legacy(content), number=number, repeat=3)) / number
+            fast = min(timeit.repeat(lambda: parse_viz_html(content), number=number, repeat=3)) / number
+            results.append({
+                "page": name,
+                "notices": len(actual),
+                "identical": expected == actual,
+                "legacy_ms": legacy * 1000,
+                "fast_ms": fast * 1000,
+            })
+        return results
+    finally:
+        logging.disable(logging.NOTSET)
+
+def check_streaming(content, chunk_size=STREAM_CHUNK_SIZE):
+    """Vergleicht Streaming- und Soup-Parser: identische Meldungen und Spitzen-Speicher (KB)."""
+    logging.disable(logging.CRITICAL)
+    try:
+        chunks = (content[i:i + chunk_size] for i in range(0, len(content), chunk_size))
+        tracemalloc.start()
+        streamed = [n.message for n in iter_notices(chunks)]
+        stream_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        parsed = [n.message for n in parse_viz_html(content)]
+        soup_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return {
+            "notices": len(streamed),
+            "identical": streamed == parsed,
+            "stream_kb": stream_peak / 1024,
+            "soup_kb": soup_peak / 1024,
+        }
+    finally:
+        logging.disable(logging.NOTSET)
+
+def main_parser(paths):
+    """Ohne Argumente werden Seiten aus den Meldungen in data.json erzeugt."""
+    if paths:
+        pages = []
+        for path in paths:
+            with open(path, "rb") as f:
+                pages.append((path, f.read()))
+    else:
+        messages = _load_messages(None)
+        pages = [
+            ("data.json (Meldungsklassen)", sample_page(messages)),
+            ("data.json (ohne Klassen, generische Suche)", sample_page(messages[:150], with_classes=False)),
+        ]
+
+    print(f"Parser: {PARSER_BACKEND}")
+    failed = False
+    for result in benchmark(pages):
+        failed |= not result["identical"]
+        print(
+            f"{result['page']}: {result['notices']} Meldungen, "
+            f"{'identisch' if result['identical'] else 'ABWEICHUNG'}, "
+            f"alt {result['legacy_ms']:.1f} ms, neu {result['fast_ms']:.1f} ms, "
+            f"Faktor {result['legacy_ms'] / result['fast_ms']:.1f}x"
+        )
+    # Streaming nur für Seiten mit Meldungseinträgen; ohne sie liefert er bewusst nichts
+    for name, content in pages:
+        if needs_js_rendering(content):
+            continue
+        result = check_streaming(content)
+        failed |= not result["identical"]
+        print(
+            f"{name} (Streaming): {result['notices']} Meldungen, "
+            f"{'identisch' if result['identical'] else 'ABWEICHUNG'}, "
+            f"Spitze {result['stream_kb']:.0f} KB statt {result['soup_kb']:.0f} KB"
+        )
+    return not failed
+
+BENCHMARKS = {
+    "normalize": main_normalize,
+    "parser": main_parser,
+}
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print(f"Aufruf: python bench.py {{{'|'.join(BENCHMARKS)}}} [dateien ...]")
+        sys.exit(2)
+    sys.exit(0 if BENCHMARKS[sys.argv[1]](sys.argv[2:]) else 1)
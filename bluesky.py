@@ -1,34 +1,151 @@
-from atproto import Client
-from atproto.exceptions import AtProtocolError
+from atproto import Client, Session, SessionEvent
+from atproto.exceptions import AtProtocolError, UnauthorizedError, RequestErrorBase
 import os
+import re
 import time
+import threading
 import logging
 
+from scheduler import posting_limiter, DeadlineExceeded
+from state_store import atomic_write_text
+from thread_writer import build_thread_writes, apply_thread_writes, create_thread_write
+
 logger = logging.getLogger(__name__)
 
 BLUESKY_HANDLE = os.getenv("BLUESKY_HANDLE")
 BLUESKY_PASSWORD = os.getenv("BLUESKY_PASSWORD")
+# Gespeicherte Session (Access-/Refresh-Token), damit nicht jeder Lauf createSession braucht
+SESSION_FILE = os.getenv("BLUESKY_SESSION_FILE", ".bluesky_session")
+# Alternativer PDS, z. B. ein lokaler Fake-PDS für Tests ("http://localhost:2583/xrpc")
+BLUESKY_BASE_URL = os.getenv("BLUESKY_BASE_URL")
 
 class BlueskyError(Exception):
     """Custom exception für Bluesky-spezifische Fehler."""
     pass
 
+class AlreadyPostedError(BlueskyError):
+    """Ein Record mit diesem rkey existiert schon - der Thread wurde bereits gepostet."""
+    pass
+
+# Antwort des PDS auf ein create mit bereits vergebenem rkey
+_ALREADY_EXISTS_RE = re.compile(r"already ?exists", re.IGNORECASE)
+
+def _error_text(error):
+    """Fehlertext eines AT-Protocol-Fehlers ohne Response-Header.
+
+    str(e) enthält auch die ratelimit-*-Header, damit sähe jeder Fehler wie ein
+    Rate-Limit aus; maßgeblich sind nur error und message der XRPC-Antwort.
+    """
+    content = getattr(getattr(error, "response", None), "content", None)
+    if content is None:
+        return str(error).lower()
+    if isinstance(content, (str, bytes)):
+        return str(content).lower()
+    return f"{getattr(content, 'error', '')} {getattr(content, 'message', '')}".lower()
+
+class RateLimitedClient(Client):
+    """atproto-Client, der die RateLimit-Header von Schreibzugriffen an den Scheduler meldet."""
+
+    def __init__(self, base_url=None, rate_limiter=None, *args, **kwargs):
+        super().__init__(base_url, *args, **kwargs)
+        self.rate_limiter = rate_limiter or posting_limiter
+
+    def _invoke(self, invoke_type, **kwargs):
+        is_write = "com.atproto.repo." in str(kwargs.get("url", ""))
+        try:
+            response = super()._invoke(invoke_type, **kwargs)
+        except RequestErrorBase as e:
+            if is_write and e.response is not None:
+                self.rate_limiter.update_from_headers(e.response.headers, e.response.status_code)
+            raise
+        if is_write:
+            self.rate_limiter.update_from_headers(response.headers, response.status_code)
+        return response
+
 class BlueskyClient:
     def __init__(self):
         self.client = None
+        self.did = None
         self.authenticated = False
+        # Mehrere Posting-Worker teilen sich den Client: Session-Erneuerung nur einmal
+        self._auth_lock = threading.Lock()
+        self._auth_generation = 0
+        
+    def _on_session_change(self, event, session):
+        """Speichert jede neue bzw. erneuerte Session für den nächsten Lauf."""
+        if event in (SessionEvent.CREATE, SessionEvent.REFRESH):
+            save_session_string(session.encode())
+            logger.debug(f"💾 Bluesky-Session gespeichert ({event.value})")
+
+    def _new_client(self):
+        client = RateLimitedClient(BLUESKY_BASE_URL)
+        client.on_session_change(self._on_session_change)
+        return client
+
+    def restore_session(self):
+        """Übernimmt eine gespeicherte Session ohne Login-Request.
+
+        Abgelaufene Access-Tokens erneuert der Client vor dem nächsten Aufruf
+        selbst per refreshSession.
+        """
+        session_string = load_session_string()
+        if not session_string:
+            return False
+        try:
+            session = Session.decode(session_string)
+            if BLUESKY_HANDLE and session.handle != BLUESKY_HANDLE:
+                logger.info("🔐 Gespeicherte Session gehört zu anderem Handle - ignoriert")
+                return False
+            self.client = self._new_client()
+            self.client._import_session_string(session_string)
+            # Ohne login() ist client.me nicht gesetzt → Repo-DID explizit merken
+            self.did = session.did
+            self.authenticated = True
+            logger.info("✅ Bluesky-Session aus Datei übernommen")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Gespeicherte Bluesky-Session unbrauchbar: {e}")
+            return False
+
+    def refresh_session(self, seen_generation=None):
+        """Erneuert die Session per Refresh-Token, erst danach per Passwort-Login.
+
+        seen_generation ist der Stand, mit dem der fehlgeschlagene Aufruf lief;
+        hat ein anderer Worker die Session inzwischen erneuert, passiert nichts.
+        """
+        with self._auth_lock:
+            if seen_generation is not None and seen_generation != self._auth_generation:
+                return
+            self._refresh_session()
+            self._auth_generation += 1
+
+    def _refresh_session(self):
+        if self.client is not None:
+            try:
+                self.client._refresh_and_set_session()
+                self.authenticated = True
+                logger.info("🔄 Bluesky-Session erneuert")
+                return
+            except Exception as e:
+                logger.warning(f"⚠️ Session-Refresh fehlgeschlagen: {e}")
+        self.authenticated = False
+        self.authenticate(use_saved_session=False)
+
+    def authenticate(self, use_saved_session=True):
+        """Authentifizierung mit Retry-Logic, bevorzugt über die gespeicherte Session."""
+        if use_saved_session and self.restore_session():
+            return
         
-    def authenticate(self):
-        """Authentifizierung mit Retry-Logic."""
         if not BLUESKY_HANDLE or not BLUESKY_PASSWORD:
             raise BlueskyError("BLUESKY_HANDLE oder BLUESKY_PASSWORD nicht gesetzt")
         
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                self.client = Client()
+                self.client = self._new_client()
                 logger.info(f"🔐 Authentifizierung bei Bluesky (Versuch {attempt + 1}/{max_retries})")
-                self.client.login(BLUESKY_HANDLE, BLUESKY_PASSWORD)
+                profile = self.client.login(BLUESKY_HANDLE, BLUESKY_PASSWORD)
+                self.did = profile.did
                 self.authenticated = True
                 logger.info("✅ Bluesky-Authentifizierung erfolgreich")
                 return
@@ -45,35 +162,84 @@ class BlueskyClient:
                 else:
                     raise BlueskyError(f"Unerwarteter Fehler bei Authentifizierung: {e}")
     
-    def post_with_retry(self, text, reply_to=None, max_retries=3):
-        """Post mit Retry-Logic."""
+    def post_thread_batch(self, parts, max_retries=3, timestamp_us=None, deadline=None):
+        """Schreibt alle Teile eines Threads in einem applyWrites-Aufruf.
+
+        Die rkeys werden einmal vorab berechnet und bei Wiederholungen
+        beibehalten. Der ganze Thread zählt als eine Einheit im Rate-Budget.
+        Mit festem timestamp_us sind die rkeys deterministisch; ein zweiter
+        Versuch endet dann in AlreadyPostedError statt in einem Doppelpost.
+        """
+        if not self.authenticated:
+            raise BlueskyError("Nicht authentifiziert")
+        writes = build_thread_writes(self.did, parts, timestamp_us)
+        return self._write_with_retry(
+            lambda: apply_thread_writes(self.client, self.did, writes),
+            f"Thread mit {len(parts)} Teilen", max_retries, deadline,
+        )
+
+    def post_thread_parts(self, parts, max_retries=3, timestamp_us=None, deadline=None):
+        """Fallback zu post_thread_batch: schreibt die Teile einzeln per createRecord.
+
+        Es sind dieselben Records und rkeys wie beim applyWrites-Aufruf, die
+        Reply-Refs stehen also vorab fest. Teile, die schon existieren (früherer
+        Lauf oder abgebrochener Thread), werden übersprungen statt doppelt gepostet.
+        Gibt die Anzahl der Teile zurück, die danach im Repo stehen.
+        """
+        if not self.authenticated:
+            raise BlueskyError("Nicht authentifiziert")
+        writes = build_thread_writes(self.did, parts, timestamp_us)
+        for i, write in enumerate(writes):
+            try:
+                self._write_with_retry(
+                    lambda write=write: create_thread_write(self.client, self.did, write),
+                    f"Teil {i + 1}/{len(writes)}: {parts[i][:50]}...", max_retries, deadline,
+                )
+            except AlreadyPostedError:
+                logger.info(f"♻️ Teil {i + 1}/{len(writes)} existiert bereits - übersprungen")
+        return len(writes)
+
+    def _write_with_retry(self, write, description, max_retries=3, deadline=None):
+        """Führt einen Schreibzugriff mit Rate-Budget, Session-Erneuerung und Retries aus.
+
+        Mit deadline (time.monotonic()) wird nie über sie hinaus auf das
+        Rate-Budget gewartet; stattdessen geht DeadlineExceeded an den Aufrufer.
+        """
         for attempt in range(max_retries):
             try:
                 if not self.authenticated:
                     raise BlueskyError("Nicht authentifiziert")
                 
-                logger.debug(f"📤 Poste (Versuch {attempt + 1}/{max_retries}): {text[:50]}...")
-                post = self.client.post(text=text, reply_to=reply_to)
-                logger.debug(f"✅ Post erfolgreich: {post.uri}")
-                return post
+                generation = self._auth_generation
+                posting_limiter.acquire(deadline=deadline)
+                logger.debug(f"📤 Poste (Versuch {attempt + 1}/{max_retries}): {description}")
+                result = write()
+                logger.debug("✅ Post erfolgreich")
+                return result
                 
             except AtProtocolError as e:
-                error_msg = str(e).lower()
+                error_msg = _error_text(e)
                 
-                # Rate-Limit-Behandlung
-                if "rate" in error_msg or "limit" in error_msg or "too many" in error_msg:
-                    wait_time = 60 * (attempt + 1)  # 60, 120, 180 Sekunden
-                    logger.warning(f"⏳ Rate-Limit erreicht, warte {wait_time} Sekunden...")
-                    time.sleep(wait_time)
+                # Idempotenz: gleicher rkey wie bei einem früheren, erfolgreichen Versuch
+                if _ALREADY_EXISTS_RE.search(error_msg):
+                    raise AlreadyPostedError(f"Bereits gepostet: {description}")
+                
+                # Rate-Limit-Behandlung: der Scheduler kennt den Reset-Zeitpunkt aus den
+                # Headern und lässt acquire() beim nächsten Versuch genau so lange warten
+                status_code = getattr(getattr(e, "response", None), "status_code", None)
+                if status_code == 429 or "rate" in error_msg or "limit" in error_msg or "too many" in error_msg:
+                    logger.warning("⏳ Rate-Limit erreicht, warte auf Reset des Budgets...")
+                    if status_code != 429:
+                        posting_limiter.update_from_headers({}, 429)
                     continue
                 
                 # Authentifizierungs-Fehler
-                elif "auth" in error_msg or "unauthorized" in error_msg or "forbidden" in error_msg:
-                    logger.warning("🔐 Authentifizierung verloren, versuche Neuanmeldung...")
-                    self.authenticated = False
+                elif (isinstance(e, UnauthorizedError) or "auth" in error_msg or "unauthorized" in error_msg
+                        or "forbidden" in error_msg or "expired" in error_msg):
+                    logger.warning("🔐 Authentifizierung verloren, erneuere Session...")
                     try:
-                        self.authenticate()
-                        continue  # Nochmal versuchen nach Neuanmeldung
+                        self.refresh_session(generation)
+                        continue  # Nochmal versuchen nach Erneuerung
                     except Exception:
                         raise BlueskyError(f"Neuanmeldung fehlgeschlagen: {e}")
                 
@@ -84,6 +250,9 @@ class BlueskyClient:
                         time.sleep(10)  # Kurze Pause vor nächstem Versuch
                     else:
                         raise BlueskyError(f"Post-Fehler nach {max_retries} Versuchen: {e}")
+
+            except DeadlineExceeded:
+                raise
                         
             except Exception as e:
                 logger.error(f"❌ Unerwarteter Post-Fehler (Versuch {attempt + 1}): {e}")
@@ -94,53 +263,77 @@ class BlueskyClient:
         
         raise BlueskyError(f"Post nach {max_retries} Versuchen fehlgeschlagen")
 
+def load_session_string():
+    """Liest die gespeicherte Session, falls vorhanden."""
+    try:
+        with open(SESSION_FILE, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def save_session_string(session_string):
+    """Schreibt die Session atomar und nur für den Besitzer lesbar."""
+    try:
+        atomic_write_text(SESSION_FILE, session_string, mode=0o600)
+    except OSError as e:
+        logger.warning(f"⚠️ Bluesky-Session konnte nicht gespeichert werden: {e}")
+
 # Global client instance
 _bluesky_client = None
+_client_lock = threading.Lock()
 
 def get_client():
     """Lazy-Loading des Bluesky-Clients."""
     global _bluesky_client
-    if _bluesky_client is None:
-        _bluesky_client = BlueskyClient()
-        _bluesky_client.authenticate()
+    with _client_lock:
+        if _bluesky_client is None:
+            client = BlueskyClient()
+            client.authenticate()
+            _bluesky_client = client
     return _bluesky_client
 
-def post_on_bluesky_thread(parts):
-    """Postet eine Nachricht oder Thread auf Bluesky mit verbesserter Fehlerbehandlung."""
+def post_on_bluesky_thread(parts, timestamp_us=None, deadline=None):
+    """Postet eine Nachricht oder Thread auf Bluesky mit verbesserter Fehlerbehandlung.
+
+    Alle Teile gehen zuerst gemeinsam per applyWrites raus; nur wenn das
+    scheitert, wird Teil für Teil mit denselben rkeys geschrieben. timestamp_us
+    legt die rkeys fest (Idempotenz-Schlüssel, siehe outbox.py); bereits
+    vorhandene Teile werden übersprungen, fehlende ergänzt. Reicht das
+    Rate-Budget erst nach deadline, endet der Aufruf mit DeadlineExceeded.
+    """
     if not parts or not isinstance(parts, list):
         raise BlueskyError("Ungültige parts für Thread-Post")
     
-    client = get_client()
-    reply_to = None
-    posted_parts = 0
-    
-    logger.info(f"📝 Starte Thread-Post mit {len(parts)} Teilen")
-    
     for i, part in enumerate(parts):
         if not part or not part.strip():
             logger.warning(f"⚠️ Überspringe leeren Teil {i+1}")
-            continue
-            
+    parts = [part for part in parts if part and part.strip()]
+    if not parts:
+        raise BlueskyError("Kein Teil des Threads konnte gepostet werden")
+    
+    client = get_client()
+    logger.info(f"📝 Starte Thread-Post mit {len(parts)} Teilen")
+    # Batch und Einzel-Fallback nutzen dieselben rkeys
+    if timestamp_us is None:
+        timestamp_us = time.time_ns() // 1000
+    
+    try:
+        client.post_thread_batch(parts, timestamp_us=timestamp_us, deadline=deadline)
+        posted_parts = len(parts)
+    except BlueskyError as e:
+        # applyWrites ist atomar: "existiert bereits" kann auch nur Teil 1 eines
+        # abgebrochenen Einzel-Fallbacks betreffen - der Fallback überspringt
+        # vorhandene Teile und schreibt nur die fehlenden
+        if isinstance(e, AlreadyPostedError):
+            logger.info("♻️ Thread existiert schon (ganz oder teilweise) - ergänze fehlende Teile einzeln...")
+        else:
+            logger.warning(f"⚠️ applyWrites fehlgeschlagen ({e}), poste Teile einzeln...")
         try:
-            logger.debug(f"📤 Poste Teil {i+1}/{len(parts)}: {len(part)} Zeichen")
-            post = client.post_with_retry(text=part, reply_to=reply_to)
-            reply_to = post.uri
-            posted_parts += 1
-            
-            # Pause zwischen Thread-Posts
-            if i < len(parts) - 1:  # Nicht nach dem letzten Post warten
-                time.sleep(2)
-                
-        except BlueskyError:
-            logger.error(f"❌ Teil {i+1} konnte nicht gepostet werden")
+            posted_parts = client.post_thread_parts(parts, timestamp_us=timestamp_us, deadline=deadline)
+        except (BlueskyError, DeadlineExceeded):
             raise
         except Exception as e:
-            logger.error(f"❌ Unerwarteter Fehler bei Teil {i+1}: {e}")
-            raise BlueskyError(f"Thread-Post fehlgeschlagen bei Teil {i+1}: {e}")
+            raise BlueskyError(f"Thread-Post fehlgeschlagen: {e}")
     
     logger.info(f"✅ Thread erfolgreich gepostet: {posted_parts}/{len(parts)} Teile")
-    
-    if posted_parts == 0:
-        raise BlueskyError("Kein Teil des Threads konnte gepostet werden")
-    
     return posted_parts
@@ -1,9 +1,12 @@
 import os
 import json
 import time
+import argparse
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 import requests
-import re
-import unicodedata
 import logging
 from bs4 import BeautifulSoup
 from selenium import webdriver
@@ -16,156 +19,470 @@ from selenium.common.exceptions import TimeoutException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 
 from beautify import beautify_text
-from bluesky import post_on_bluesky_thread, BlueskyError
-from fallback import get_viz_updates_fallback
+from outbox import Outbox, OUTBOX_DRAIN_SECONDS
+from digest import needs_digest, build_digests
+from fallback import get_viz_updates_fallback, fetch_viz_page
+from matcher import is_berlin_related
+from state_store import load_state, save_state, atomic_write_json
+from diffing import diff_states
+from hysteresis import MissTracker, COLLAPSE_RATIO
+from engine_health import EngineHealth, backoff_delay
+from fingerprints import FingerprintCache
+from feed_discovery import (
+    FEED_MIN_OVERLAP, LOGGING_PREFS, load_feed, fetch_feed_notices, discover_feed, feed_is_stale, feed_overlap,
+)
+from records import build_notice, notice_keys
 
 # Logging konfigurieren
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 URL = "https://viz.berlin.de/verkehr-in-berlin/baustellen-sperrungen-und-sonstige-storungen/"
-STATE_FILE = "data.json"
-BACKUP_FILE = "data_backup.json"
+HTTP_CACHE_FILE = "http_cache.json"
+DRIVER_CACHE_FILE = os.getenv("DRIVER_CACHE_FILE", ".chromedriver_cache.json")
 MAX_RETRIES = 3
-RETRY_DELAY = 10
-
-BERLIN_INDICATORS = [
-    'berlin', 'a100', 'a111', 'a113', 'a115', 'stadtring',
-    'charlottenburg', 'neukölln', 'friedrichshain', 'kreuzberg', 
-    'prenzlauer berg', 'mitte', 'wedding', 'tiergarten', 'moabit',
-    'tempelhof', 'schöneberg', 'wilmersdorf', 'zehlendorf', 'steglitz',
-    'lichterfelde', 'lankwitz', 'mariendorf', 'marzahn', 'hellersdorf',
-    'köpenick', 'treptow', 'lichtenberg', 'pankow', 'reinickendorf',
-    'spandau', 'friedrichsfelde', 'karlshorst', 'weißensee', 'buch',
-    'wittenau', 'tegel', 'siemensstadt', 'hakenfelde', 'kladow',
-    'dahlem', 'grunewald', 'westend', 'wannsee', 'nikolassee',
-    'friedrichshagen', 'rahnsdorf', 'schmöckwitz', 'rudow', 'buckow',
-    'britz', 'johannisthal', 'adlershof', 'alt-treptow', 'plänterwald',
-    'oberschöneweide', 'niederschöneweide', 'baumschulenweg', 'wuhlheide',
-    'fennpfuhl', 'rummelsburg', 'alt-hohenschönhausen', 'neu-hohenschönhausen',
-    'malchow', 'französisch buchholz', 'rosenthal', 'wilhelmsruh',
-    'gesundbrunnen', 'hansaviertel', 'hansa', 'falkenhagener feld',
-    'staaken', 'gatow', 'pichelsdorf', 'charlottenburg-nord'
+# Gesamtzeit für das Scraping (alle Runden), Sekunden
+SCRAPE_TIMEOUT = float(os.getenv("SCRAPE_TIMEOUT", "180"))
+# Anteil der Meldungen, die Titel und Inhalt haben müssen, damit ein Ergebnis plausibel ist
+MIN_STRUCTURED_RATIO = 0.8
+
+# Daemon-Modus: Poll-Intervall und Grenzen für das Recycling des Browsers
+POLL_INTERVAL = int(os.getenv("POLL_INTERVAL", "300"))
+BROWSER_MAX_RSS_MB = int(os.getenv("BROWSER_MAX_RSS_MB", "1024"))
+BROWSER_MAX_CYCLES = int(os.getenv("BROWSER_MAX_CYCLES", "100"))
+
+# Browser-Profil: "full" lädt alles wie bisher; "lean" blockiert Bilder, Fonts, Medien,
+# Stylesheets und Tracker, lädt "eager" mit kleinem Fenster. Ohne Stylesheets kann sich
+# innerText versteckter Elemente ändern - vor dem Umstellen mit --compare-profiles prüfen.
+BROWSER_PROFILE = os.getenv("BROWSER_PROFILE", "full")
+BROWSER_PROFILES = {
+    "full": {"window_size": "1920,1080", "page_load_strategy": "normal", "block": False},
+    "lean": {"window_size": "800,600", "page_load_strategy": "eager", "block": True},
+}
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg",
+    "*.css",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*etracker.com*", "*etracker.de*", "*matomo*", "*piwik*", "*hotjar.com*", "*facebook.net*",
+] + [p for p in os.getenv("BROWSER_BLOCKED_URLS", "").split(",") if p]
+
+# Geänderte Meldungen (ähnliches Paar aus behoben + neu): "post" = ein Update-Post, "suppress" = gar nicht posten
+UPDATE_MODE = os.getenv("UPDATE_MODE", "post")
+
+# ----------------------------- Bulk-Extraktion -----------------------------
+ITEM_SELECTORS = [
+    "li.construction-sites-item",
+    ".construction-sites-item",
+    "li[class*='construction']",
+    ".item-container li"
 ]
 
-def is_berlin_related(message: str) -> bool:
-    """Prüft, ob eine Meldung Berlin-bezogen ist."""
-    if not message:
-        return False
-    
-    msg_lower = message.lower()
-    
-    # Direkte Prüfung auf Berlin-Begriffe
-    for indicator in BERLIN_INDICATORS:
-        if indicator in msg_lower:
-            return True
-    
-    # Prüfe auf typische Berlin-Straßen-Muster
-    if 'berlin,' in msg_lower or msg_lower.startswith('berlin'):
-        return True
-    
-    # Filter out: Bundesstraßen außerhalb Berlins, Kreis-/Landstraßen
-    non_berlin_patterns = [
-        r'kreis\s+(barnim|oberhavel|märkisch-oderland|dahme-spreewald|teltow-fläming|potsdam-mittelmark|havelland|oder-spree|uckermark)',
-        r'od\s+[a-zäöü]+',  # "od xyz" = Ortsdurchfahrt außerhalb Berlins
-        r'ou\s+[a-zäöü]+',  # "ou xyz" = Ortsumgehung
-        r'l\d{2,3},',  # Landstraßen ohne Berlin-Kontext
-        r'k\d{4,5},',  # Kreisstraßen
-        r'b\d+[,\s]+(od|ou|zwischen).+?(elsterwerda|cottbus|spremberg|brandenburg|potsdam|neuruppin|wittenberge|eberswalde|fürstenberg|bad belzig|zossen|königs wusterhausen)',
-    ]
-    
-    for pattern in non_berlin_patterns:
-        if re.search(pattern, msg_lower):
-            logger.debug(f"Gefiltert (außerhalb Berlin): {message[:50]}...")
-            return False
-    
-    return True
+# Liest alle Einträge in einem execute_script-Aufruf aus, statt pro Element
+# mehrere Round-Trips zu chromedriver zu machen. Liefert dieselben Felder wie
+# get_attribute('textContent'), find_element("strong").text und span.text.
+EXTRACT_ITEMS_JS = """
+const selectors = arguments[0];
+let selector = null;
+let nodes = [];
+for (const sel of selectors) {
+    nodes = document.querySelectorAll(sel);
+    if (nodes.length) { selector = sel; break; }
+}
+if (!nodes.length) {
+    nodes = document.getElementsByTagName('li');
+}
+const clean = (el) => (el.innerText || '').trim();
+const items = [];
+for (const li of nodes) {
+    const strong = li.querySelector('strong');
+    items.push({
+        text: li.textContent || li.innerText || '',
+        title: strong ? clean(strong) : null,
+        spans: Array.from(li.querySelectorAll('span'), clean)
+    });
+}
+return {selector: selector, items: items};
+"""
 
-# ----------------------------- Helper: Normalisierung -----------------------------
-def normalize_message(message: str) -> str:
-    """Normiert Meldungen für stabilen Vergleich im State-File."""
-    if not message or not isinstance(message, str):
-        return ""
-    
-    msg = message.lower().strip()
+def extract_items_bulk(driver):
+    """Extrahiert alle Meldungs-Elemente mit einem einzigen WebDriver-Aufruf.
 
-    # Unsichtbare Unicode-Zeichen entfernen
-    msg = msg.replace("\u200b", "").replace("\xa0", " ")
+    Gibt (selector, items) zurück; selector ist None, wenn nur der
+    li-Fallback gegriffen hat.
+    """
+    result = driver.execute_script(EXTRACT_ITEMS_JS, ITEM_SELECTORS) or {}
+    return result.get("selector"), result.get("items") or []
 
-    # Emojis und Symbole entfernen
-    msg = "".join(ch for ch in msg if not unicodedata.category(ch).startswith("So"))
+# ----------------------------- Scraping-Koordinator (Selenium ∥ HTTP) -----------------------------
+def well_formed(notices):
+    """Strukturprüfung eines Scrape-Ergebnisses: es gibt Meldungen, die meisten mit Titel und Inhalt."""
+    if not notices:
+        return False
+    structured = sum(1 for n in notices if n.title and (n.description or n.street))
+    if structured < len(notices) * MIN_STRUCTURED_RATIO:
+        logger.warning(f"⚠️ Nur {structured}/{len(notices)} Meldungen vollständig strukturiert")
+        return False
+    return True
+
+def collapsed(notices, expected_count=0):
+    """Die Anzahl ist gegenüber dem letzten guten Lauf eingebrochen."""
+    if expected_count and len(notices) < expected_count * COLLAPSE_RATIO:
+        logger.warning(f"⚠️ Nur {len(notices)} Meldungen statt ~{expected_count}")
+        return True
+    return False
 
-    # Erlaubte Zeichen (Buchstaben, Zahlen, Umlaute, Satzzeichen, Trenner)
-    msg = re.sub(r"[^a-z0-9äöüß|,.:;\/\- ]+", " ", msg)
+def plausible(notices, expected_count=0):
+    """Plausibilitätsprüfung eines Scrape-Ergebnisses: well_formed und nicht eingebrochen."""
+    return well_formed(notices) and not collapsed(notices, expected_count)
 
-    # Mehrfach-Leerzeichen und Trenner vereinheitlichen
-    msg = re.sub(r"\s+", " ", msg).strip()
-    msg = msg.replace(" | ", "|")
+class SeleniumEngine:
+    """Browser-Scraper; cancel() beendet den Browser, damit ein laufender Aufruf sofort abbricht."""
+    name = "selenium"
 
-    return msg
+    def __init__(self, browser=None):
+        self.browser = browser
+        self.driver = None
+        self.cancelled = threading.Event()
 
-# ----------------------------- Backup-System -----------------------------
-def create_backup():
-    """Erstellt ein Backup der aktuellen State-Datei."""
-    if os.path.exists(STATE_FILE):
+    def run(self):
+        self.driver = self.browser.get() if self.browser else create_driver()
+        if self.cancelled.is_set():
+            self._quit()
+            return []
         try:
-            with open(STATE_FILE, 'r', encoding='utf-8') as src:
-                with open(BACKUP_FILE, 'w', encoding='utf-8') as dst:
-                    dst.write(src.read())
-            logger.info("✅ Backup erstellt")
-        except Exception as e:
-            logger.warning(f"⚠️ Backup konnte nicht erstellt werden: {e}")
+            notices = scrape_viz_page(self.driver)
+            _discover_feed(self.driver, notices)
+            return notices
+        except Exception:
+            if self.browser and not self.cancelled.is_set():
+                self.browser.recycle("Scraping-Fehler")
+            raise
+        finally:
+            if not self.browser:
+                self._quit()
 
-def restore_from_backup():
-    """Stellt State-Datei aus Backup wieder her."""
-    if os.path.exists(BACKUP_FILE):
+    def _quit(self):
+        driver, self.driver = self.driver, None
+        if driver is None:
+            return
+        if self.browser:
+            self.browser.recycle("Scrape abgebrochen")
+            return
         try:
-            with open(BACKUP_FILE, 'r', encoding='utf-8') as src:
-                with open(STATE_FILE, 'w', encoding='utf-8') as dst:
-                    dst.write(src.read())
-            logger.info("✅ State aus Backup wiederhergestellt")
-            return True
-        except Exception as e:
-            logger.error(f"❌ Backup-Wiederherstellung fehlgeschlagen: {e}")
-    return False
+            driver.quit()
+            logger.debug("🔄 WebDriver beendet")
+        except Exception:
+            pass
+
+    def cancel(self):
+        self.cancelled.set()
+        self._quit()
+
+class HttpEngine:
+    """requests (gestreamt oder BeautifulSoup); liefert nur etwas, wenn die Meldungen im HTML stehen."""
+    name = "http"
+
+    def run(self):
+        return get_viz_updates_fallback()
+
+    def cancel(self):
+        pass  # Abruf ist durch den HTTP-Timeout begrenzt
+
+class FeedEngine:
+    """Direkter Abruf des JSON-Endpunkts, den die Seite selbst lädt (siehe feed_discovery).
+
+    Findet das Ergebnis zu wenige der bekannten State-Schlüssel wieder, passt
+    die gespeicherte Abbildung nicht mehr zur Seite; es wird dann verworfen.
+    """
+    name = "feed"
+
+    def __init__(self, feed, known_keys=None):
+        self.feed = feed
+        self.known_keys = known_keys
+
+    def run(self):
+        notices = fetch_feed_notices(self.feed)
+        overlap = feed_overlap(notices, self.known_keys)
+        if overlap < FEED_MIN_OVERLAP:
+            logger.warning(
+                f"⚠️ Feed verworfen: nur {overlap:.0%} der {len(self.known_keys)} bekannten Meldungen wiedergefunden"
+            )
+            return []
+        return notices
+
+    def cancel(self):
+        pass  # Abruf ist durch den HTTP-Timeout begrenzt
+
+def _discover_feed(driver, notices):
+    """Merkt sich nach einem Browser-Scrape den Feed-Endpunkt; Fehler dabei sind nicht fatal."""
+    try:
+        discover_feed(driver, notices)
+    except Exception as e:
+        logger.warning(f"⚠️ Feed-Erkennung fehlgeschlagen: {e}")
+
+def _timed(run):
+    started = time.monotonic()
+    return run(), time.monotonic() - started
+
+def race_scrapers(engines, expected_count=0, timeout=SCRAPE_TIMEOUT, health=None):
+    """Startet alle Engines gleichzeitig und nimmt das erste plausible Ergebnis.
+
+    Die übrigen Engines werden abgebrochen. Ist kein Ergebnis plausibel,
+    wird das größte nicht-leere genommen (die Hysterese verhindert dann
+    Massen-Behoben-Meldungen). Mit health werden Erfolg/Fehlschlag und
+    Latenz jeder fertigen Engine festgehalten; als Fehlschlag gelten nur
+    Exceptions und strukturell kaputte Ergebnisse. Gibt (engine_name, notices) zurück.
+    """
+    executor = ThreadPoolExecutor(max_workers=len(engines), thread_name_prefix="scraper")
+    futures = {executor.submit(_timed, engine.run): engine for engine in engines}
+    winner, best = None, (None, [])
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            engine = futures[future]
+            try:
+                notices, latency = future.result()
+            except Exception as e:
+                logger.error(f"❌ Scraper '{engine.name}' fehlgeschlagen: {e}")
+                if health:
+                    health.record_failure(engine.name)
+                continue
+            logger.info(f"🏁 Scraper '{engine.name}': {len(notices)} Meldungen in {latency:.1f} s")
+            # Für den Circuit zählt nur die Struktur: eine eingebrochene Anzahl kann
+            # auch echt sein und ist Sache der Hysterese (MissTracker)
+            structured = well_formed(notices)
+            if health:
+                if structured:
+                    health.record_success(engine.name, latency)
+                else:
+                    health.record_failure(engine.name)
+            if structured and not collapsed(notices, expected_count):
+                winner = (engine.name, notices)
+                break
+            if len(notices) > len(best[1]):
+                best = (engine.name, notices)
+    except FuturesTimeout:
+        logger.warning(f"⚠️ Scraping-Timeout nach {timeout} s")
+    finally:
+        for future, engine in futures.items():
+            if not future.done():
+                logger.info(f"⏹️ Breche Scraper '{engine.name}' ab")
+                engine.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return winner or best
+
+def get_viz_updates_with_retry(browser=None, expected_count=0, skip_http=False, known_keys=None):
+    """Scraping über den Koordinator: die gesunden Engines laufen parallel.
+
+    Engines mit offenem Circuit (engine_health) werden übersprungen, ebenso
+    solche, deren typische Latenz das Restbudget übersteigt. Ohne plausibles
+    Ergebnis wird mit Jitter-Backoff neu gestartet, solange SCRAPE_TIMEOUT reicht.
+    Mit einer BrowserSession wird der warme Browser wiederverwendet. Ist ein
+    Feed-Endpunkt bekannt, läuft die erste Runde ohne Browser, es sei denn,
+    seine Abbildung muss erneut geprüft werden (FEED_REVALIDATE_SECONDS).
+    known_keys (bisheriger State) dient dem Feed als Plausibilitätsprüfung.
+    skip_http lässt den HTTP-Scraper weg, wenn der Schnellpfad die Seite
+    gerade ohne Meldungen im HTML gesehen hat.
+    """
+    health = EngineHealth.load()
+    factories = {"selenium": lambda: SeleniumEngine(browser), "http": HttpEngine}
+    if skip_http:
+        del factories["http"]
+    feed = load_feed()
+    if feed:
+        factories["feed"] = lambda: FeedEngine(feed, known_keys)
+    # Veraltete Abbildung: Selenium läuft von Anfang an mit und bestätigt den Feed neu
+    browserless_first = bool(feed) and not feed_is_stale(feed)
+    deadline = time.monotonic() + SCRAPE_TIMEOUT
+    best = []
+    try:
+        for attempt in range(MAX_RETRIES):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            names = [
+                name for name in health.pick(list(factories))
+                if (health.typical_latency(name) or 0) <= remaining
+            ]
+            if attempt == 0 and browserless_first and "feed" in names:
+                # Mit bekanntem Feed zuerst ohne Browser; Selenium (und damit eine neue
+                # Feed-Erkennung) erst, wenn der Feed kein plausibles Ergebnis liefert
+                names = [name for name in names if name != "selenium"]
+            if not names:
+                logger.warning("⚠️ Keine Engine passt ins verbleibende Zeitbudget")
+                break
+            logger.info(f"🔍 Scraping-Runde {attempt + 1}/{MAX_RETRIES} ({' ∥ '.join(names)})")
+            engines = [factories[name]() for name in names]
+            engine, notices = race_scrapers(engines, expected_count, remaining, health)
+            if notices and plausible(notices, expected_count):
+                logger.info(f"✅ Scraping erfolgreich über '{engine}': {len(notices)} Meldungen")
+                return notices
+            if len(notices) > len(best):
+                best = notices
+            delay = backoff_delay(attempt)
+            if attempt < MAX_RETRIES - 1 and deadline - time.monotonic() > delay:
+                logger.info(f"⏳ Nächste Runde in {delay:.1f} s")
+                time.sleep(delay)
+    finally:
+        health.save()
 
-# ----------------------------- Selenium Scraper mit Retry-Logic -----------------------------
-def get_viz_updates_with_retry():
-    """Scraping mit mehreren Versuchen und Fallback."""
-    for attempt in range(MAX_RETRIES):
+    if best:
+        logger.warning(f"⚠️ Kein plausibles Ergebnis - verwende bestes ({len(best)} Meldungen)")
+    else:
+        logger.error("❌ Alle Scraping-Versuche (Selenium + HTTP) fehlgeschlagen")
+    return best
+
+# ----------------------------- ChromeDriver-Auflösung mit Cache -----------------------------
+CHROME_BINARIES = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"]
+
+_resolved_driver_path = None
+
+def _find_chrome_binary():
+    chrome_bin = os.getenv("CHROME_BIN")
+    if chrome_bin:
+        return chrome_bin
+    for name in CHROME_BINARIES:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+def _binary_version(path):
+    """Liest die Version eines Chrome-/ChromeDriver-Binaries ('--version')."""
+    if not path:
+        return None
+    try:
+        result = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def _stat_signature(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def _load_driver_cache():
+    try:
+        with open(DRIVER_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError, ValueError):
+        return None
+
+def _driver_cache_valid(entry):
+    """Prüft einen Cache-Eintrag mit einem stat() und einer Versionsabfrage."""
+    try:
+        if _stat_signature(entry["driver_path"]) != entry["driver_stat"]:
+            return False
+        if not os.access(entry["driver_path"], os.X_OK):
+            return False
+    except (OSError, KeyError, TypeError):
+        return False
+    return _binary_version(entry.get("chrome_path")) == entry.get("chrome_version")
+
+def resolve_chromedriver():
+    """Ermittelt den ChromeDriver-Pfad, bevorzugt aus dem Cache.
+
+    Der Cache speichert Pfad, Datei-Signatur sowie Chrome- und
+    ChromeDriver-Version. Nur wenn sich davon etwas geändert hat, wird neu
+    gesucht (inkl. WebDriverManager-Download und Verzeichnissuche).
+    """
+    global _resolved_driver_path
+    if _resolved_driver_path and os.access(_resolved_driver_path, os.X_OK):
+        return _resolved_driver_path
+
+    entry = _load_driver_cache()
+    if entry and _driver_cache_valid(entry):
+        logger.info(f"✅ ChromeDriver aus Cache: {entry['driver_path']} ({entry.get('driver_version')})")
+        _resolved_driver_path = entry["driver_path"]
+        return _resolved_driver_path
+
+    driver_path = _probe_chromedriver_path()
+    if not driver_path:
+        return None
+
+    chrome_path = _find_chrome_binary()
+    entry = {
+        "driver_path": driver_path,
+        "driver_stat": _stat_signature(driver_path),
+        "driver_version": _binary_version(driver_path),
+        "chrome_path": chrome_path,
+        "chrome_version": _binary_version(chrome_path),
+    }
+    try:
+        atomic_write_json(DRIVER_CACHE_FILE, entry, indent=2)
+        logger.info(f"💾 ChromeDriver-Cache aktualisiert: {entry['driver_version']} / {entry['chrome_version']}")
+    except OSError as e:
+        logger.warning(f"⚠️ ChromeDriver-Cache konnte nicht gespeichert werden: {e}")
+
+    _resolved_driver_path = driver_path
+    return driver_path
+
+def _probe_chromedriver_path():
+    """Sucht einen ausführbaren ChromeDriver (System, WebDriverManager, PATH)."""
+    # Robuste Driver-Installation mit System-ChromeDriver Präferenz
+    driver_path = None
+    
+    # Zuerst System-ChromeDriver versuchen (von GitHub Actions installiert)
+    system_chromedriver = "/usr/local/bin/chromedriver"
+    if os.path.exists(system_chromedriver) and os.access(system_chromedriver, os.X_OK):
+        driver_path = system_chromedriver
+        logger.info(f"✅ Verwende System-ChromeDriver: {driver_path}")
+    else:
+        # Fallback: WebDriver Manager
         try:
-            logger.info(f"🔍 Scraping-Versuch {attempt + 1}/{MAX_RETRIES}")
-            updates = get_viz_updates()
-            if updates:  # Erfolg, wenn mindestens eine Meldung gefunden
-                logger.info(f"✅ Scraping erfolgreich: {len(updates)} Meldungen")
-                return updates
-            else:
-                logger.warning("⚠️ Keine Meldungen gefunden - könnte ein Problem sein")
-                if attempt < MAX_RETRIES - 1:
-                    time.sleep(RETRY_DELAY)
+            driver_path = ChromeDriverManager().install()
+            logger.info(f"📁 ChromeDriver-Pfad von WebDriverManager: {driver_path}")
+            
+            # WebDriverManager-Pfad validieren und korrigieren
+            if driver_path and os.path.exists(driver_path):
+                # Wenn es ein Verzeichnis ist, nach der chromedriver-Datei suchen
+                if os.path.isdir(driver_path):
+                    for root, dirs, files in os.walk(driver_path):
+                        for file in files:
+                            if file == 'chromedriver' and not file.endswith('.chromedriver'):
+                                potential_driver = os.path.join(root, file)
+                                if os.access(potential_driver, os.X_OK):
+                                    driver_path = potential_driver
+                                    logger.info(f"🔧 Gefundener ausführbarer ChromeDriver: {driver_path}")
+                                    break
+                        if driver_path and not os.path.isdir(driver_path):
+                            break
+                
+                # Ausführungsrechte setzen falls nötig
+                if not os.access(driver_path, os.X_OK):
+                    import stat
+                    os.chmod(driver_path, stat.S_IRWXU | stat.S_IRGRP | stat.S_IROTH)
+                    logger.info(f"🔧 Ausführungsrechte für ChromeDriver gesetzt")
+                    
         except Exception as e:
-            logger.error(f"❌ Scraping-Fehler (Versuch {attempt + 1}): {e}")
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(RETRY_DELAY)
+            logger.warning(f"⚠️ WebDriverManager fehlgeschlagen: {e}")
+            driver_path = None
     
-    # Fallback-Scraper versuchen
-    logger.info("🔄 Alle Selenium-Versuche fehlgeschlagen, versuche Fallback-Scraper...")
-    try:
-        fallback_updates = get_viz_updates_fallback()
-        if fallback_updates:
-            logger.info(f"✅ Fallback-Scraper erfolgreich: {len(fallback_updates)} Meldungen")
-            return fallback_updates
-    except Exception as e:
-        logger.error(f"❌ Auch Fallback-Scraper fehlgeschlagen: {e}")
+    if driver_path and os.path.exists(driver_path) and os.access(driver_path, os.X_OK):
+        return driver_path
     
-    logger.error("❌ Alle Scraping-Versuche (Selenium + Fallback) fehlgeschlagen")
-    return []
+    # Letzter Versuch: System-PATH durchsuchen
+    for path_dir in os.environ.get('PATH', '').split(os.pathsep):
+        chromedriver_path = os.path.join(path_dir, 'chromedriver')
+        if os.path.exists(chromedriver_path) and os.access(chromedriver_path, os.X_OK):
+            logger.info(f"📍 PATH-ChromeDriver gefunden: {chromedriver_path}")
+            return chromedriver_path
+    return None
 
-def get_viz_updates():
-    """Scraping-Funktion mit verbesserter Fehlerbehandlung."""
-    logger.info("🔍 Scraper gestartet...")
-    
+def create_driver(profile=BROWSER_PROFILE):
+    """Startet einen Headless-Chrome mit robuster ChromeDriver-Auflösung.
+
+    profile wählt einen Eintrag aus BROWSER_PROFILES (Fenstergröße,
+    Page-Load-Strategie, Blockieren von Ressourcen per CDP).
+    """
+    settings = BROWSER_PROFILES.get(profile)
+    if settings is None:
+        logger.warning(f"⚠️ Unbekanntes Browser-Profil '{profile}' - verwende 'full'")
+        profile, settings = "full", BROWSER_PROFILES["full"]
     options = Options()
+    options.page_load_strategy = settings["page_load_strategy"]
     # Stabilere Headless-Einstellungen für CI-Umgebungen
     options.add_argument("--headless=new")
     options.add_argument("--no-sandbox")
@@ -174,84 +491,56 @@ def get_viz_updates():
     options.add_argument("--disable-extensions")
     options.add_argument("--disable-logging")
     options.add_argument("--disable-dev-tools")
-    options.add_argument("--window-size=1920,1080")
+    options.add_argument(f"--window-size={settings['window_size']}")
     options.add_argument("--remote-debugging-port=9222")
     options.add_argument("--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36")
+    # Netzwerk-Events ins Performance-Log, damit der Feed-Endpunkt erkannt werden kann
+    options.set_capability("goog:loggingPrefs", LOGGING_PREFS)
     
-    driver = None
+    driver_path = resolve_chromedriver()
+    if driver_path:
+        service = Service(executable_path=driver_path)
+        logger.info(f"📍 Service mit explizitem Pfad: {driver_path}")
+    else:
+        # Allerletzter Versuch ohne expliziten Pfad
+        try:
+            service = Service()
+            logger.info("📍 Service ohne expliziten Pfad (System-Standard)")
+        except Exception as e:
+            logger.error(f"❌ Kann keinen ChromeDriver-Service erstellen: {e}")
+            raise Exception("ChromeDriver-Service konnte nicht initialisiert werden")
+    
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.set_page_load_timeout(60)
+    if settings["block"]:
+        _block_resources(driver)
+    driver.profile_name = profile
+    logger.info(f"🌐 Browser-Profil '{profile}'")
+    return driver
+
+def _block_resources(driver):
+    """Blockiert Bilder, Fonts, Medien, Stylesheets und Tracker per CDP (gilt für alle Seiten der Sitzung)."""
     try:
-        # Robuste Driver-Installation mit System-ChromeDriver Präferenz
-        driver_path = None
-        
-        # Zuerst System-ChromeDriver versuchen (von GitHub Actions installiert)
-        system_chromedriver = "/usr/local/bin/chromedriver"
-        if os.path.exists(system_chromedriver) and os.access(system_chromedriver, os.X_OK):
-            driver_path = system_chromedriver
-            logger.info(f"✅ Verwende System-ChromeDriver: {driver_path}")
-        else:
-            # Fallback: WebDriver Manager
-            try:
-                driver_path = ChromeDriverManager().install()
-                logger.info(f"📁 ChromeDriver-Pfad von WebDriverManager: {driver_path}")
-                
-                # WebDriverManager-Pfad validieren und korrigieren
-                if driver_path and os.path.exists(driver_path):
-                    # Wenn es ein Verzeichnis ist, nach der chromedriver-Datei suchen
-                    if os.path.isdir(driver_path):
-                        for root, dirs, files in os.walk(driver_path):
-                            for file in files:
-                                if file == 'chromedriver' and not file.endswith('.chromedriver'):
-                                    potential_driver = os.path.join(root, file)
-                                    if os.access(potential_driver, os.X_OK):
-                                        driver_path = potential_driver
-                                        logger.info(f"🔧 Gefundener ausführbarer ChromeDriver: {driver_path}")
-                                        break
-                            if driver_path and not os.path.isdir(driver_path):
-                                break
-                    
-                    # Ausführungsrechte setzen falls nötig
-                    if not os.access(driver_path, os.X_OK):
-                        import stat
-                        os.chmod(driver_path, stat.S_IRWXU | stat.S_IRGRP | stat.S_IROTH)
-                        logger.info(f"🔧 Ausführungsrechte für ChromeDriver gesetzt")
-                        
-            except Exception as e:
-                logger.warning(f"⚠️ WebDriverManager fehlgeschlagen: {e}")
-                driver_path = None
-        
-        # Service erstellen - mit Fallback-Strategien
-        service = None
-        if driver_path and os.path.exists(driver_path) and os.access(driver_path, os.X_OK):
-            service = Service(executable_path=driver_path)
-            logger.info(f"📍 Service mit explizitem Pfad: {driver_path}")
-        else:
-            # Letzter Versuch: System-PATH durchsuchen
-            for path_dir in os.environ.get('PATH', '').split(os.pathsep):
-                chromedriver_path = os.path.join(path_dir, 'chromedriver')
-                if os.path.exists(chromedriver_path) and os.access(chromedriver_path, os.X_OK):
-                    service = Service(executable_path=chromedriver_path)
-                    logger.info(f"📍 Service mit PATH-ChromeDriver: {chromedriver_path}")
-                    break
-            
-            if not service:
-                # Allerletzter Versuch ohne expliziten Pfad
-                try:
-                    service = Service()
-                    logger.info("📍 Service ohne expliziten Pfad (System-Standard)")
-                except Exception as e:
-                    logger.error(f"❌ Kann keinen ChromeDriver-Service erstellen: {e}")
-                    raise Exception("ChromeDriver-Service konnte nicht initialisiert werden")
-        
-        if not service:
-            raise Exception("Kein funktionierender ChromeDriver gefunden")
-            
-        driver = webdriver.Chrome(service=service, options=options)
-        driver.set_page_load_timeout(60)
-        
-        logger.info(f"📡 Lade Seite: {URL}")
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        logger.info(f"🚫 {len(BLOCKED_URL_PATTERNS)} URL-Muster blockiert")
+    except WebDriverException as e:
+        logger.warning(f"⚠️ Ressourcen konnten nicht blockiert werden: {e}")
+
+def scrape_viz_page(driver, metrics=None):
+    """Lädt die VIZ-Seite im übergebenen Browser und extrahiert die Meldungen.
+
+    Gemessen werden die Zeit bis zum ersten Meldungseintrag und der
+    Spitzen-RSS von chromedriver + Chrome; mit metrics (Dict) werden sie
+    zusätzlich zurückgegeben.
+    """
+    logger.info(f"📡 Lade Seite: {URL}")
+    started = time.monotonic()
+    first_item = None
+    with PeakRssSampler(_driver_pid(driver)) as rss:
         driver.get(URL)
         
-        # Warten auf Meldungen mit flexiblerem Selector
+        # Nur auf die Meldungseinträge warten, nicht auf den Rest der Seite
         try:
             WebDriverWait(driver, 45).until(
                 EC.any_of(
@@ -260,242 +549,434 @@ def get_viz_updates():
                     EC.presence_of_all_elements_located((By.CSS_SELECTOR, "li[class*='construction']"))
                 )
             )
+            first_item = time.monotonic() - started
         except TimeoutException:
             logger.warning("⚠️ Timeout beim Warten auf Meldungen - versuche trotzdem zu scrapen")
         
-        # Mehrere Selektoren ausprobieren
-        selectors = [
-            "li.construction-sites-item",
-            ".construction-sites-item", 
-            "li[class*='construction']",
-            ".item-container li"
-        ]
-        
-        items = []
-        for selector in selectors:
-            items = driver.find_elements(By.CSS_SELECTOR, selector)
-            if items:
-                logger.info(f"✅ {len(items)} Meldungen mit Selector '{selector}' gefunden")
-                break
-        
-        if not items:
-            logger.warning("⚠️ Keine Meldungen mit bekannten Selektoren gefunden")
-            # Fallback: alle li-Elemente
-            items = driver.find_elements(By.TAG_NAME, "li")
-            logger.info(f"🔄 Fallback: {len(items)} li-Elemente gefunden")
-        
-        updates = []
-        processed = 0
-        
-        for li in items:
-            try:
-                # Flexiblere Textextraktion
-                text_content = li.get_attribute('textContent') or li.text
-                if not text_content or len(text_content.strip()) < 10:
-                    continue
-                
-                # Strukturierte Extraktion versuchen
-                try:
-                    title_elem = li.find_element(By.TAG_NAME, "strong")
-                    title = title_elem.text.strip()
-                except:
-                    # Fallback: ersten Teil als Titel verwenden
-                    title = text_content.strip().split('\n')[0][:100]
-                
-                try:
-                    span_texts = [span.text.strip() for span in li.find_elements(By.TAG_NAME, "span")]
-                    zeitraum = next((t.replace("Zeitraum:", "").strip() for t in span_texts if "Zeitraum" in t), "")
-                    location = next((t.replace("Straße:", "").strip() for t in span_texts if "Straße" in t), "")
-                    description = " | ".join([t for t in span_texts if "Zeitraum" not in t and "Straße" not in t])
-                    
-                    parts = [title, description, zeitraum, location]
-                    message = " | ".join([p for p in parts if p])
-                except:
-                    # Fallback: ganzen Text verwenden
-                    message = text_content.strip().replace('\n', ' | ')
-                
-                if message and len(message.strip()) > 5:
-                    updates.append(message)
-                    processed += 1
-                    
-            except Exception as e:
-                logger.debug(f"Fehler beim Verarbeiten eines Eintrags: {e}")
-                continue
-        
-        logger.info(f"✅ {processed} Meldungen erfolgreich verarbeitet")
-        return updates
-        
-    except WebDriverException as e:
-        logger.error(f"❌ WebDriver-Fehler: {e}")
-        raise
-    except Exception as e:
-        logger.error(f"❌ Unerwarteter Scraping-Fehler: {e}")
-        raise
-    finally:
-        if driver:
-            try:
-                driver.quit()
-                logger.debug("🔄 WebDriver beendet")
-            except:
-                pass
-
-# ----------------------------- State Management mit Fehlerbehandlung -----------------------------
-def load_state():
-    """Lädt State mit Backup-Fallback."""
-    for filepath in [STATE_FILE, BACKUP_FILE]:
-        if os.path.exists(filepath):
-            try:
-                with open(filepath, "r", encoding="utf-8") as f:
-                    data = f.read().strip()
-                    if not data:  # Datei leer
-                        continue
-                    state = set(json.loads(data))
-                    logger.info(f"✅ State aus {filepath} geladen: {len(state)} Einträge")
-                    return state
-            except (json.JSONDecodeError, ValueError) as e:
-                logger.warning(f"⚠️ Konnte {filepath} nicht lesen: {e}")
-                continue
-            except Exception as e:
-                logger.error(f"❌ Unerwarteter Fehler beim Laden von {filepath}: {e}")
-                continue
+        # Alle Einträge in einem einzigen WebDriver-Aufruf extrahieren
+        selector, items = extract_items_bulk(driver)
+
+    profile = getattr(driver, "profile_name", "?")
+    first_text = f"{first_item:.1f} s" if first_item is not None else "-"
+    logger.info(f"📊 Profil '{profile}': erste Meldung nach {first_text}, Spitze RSS {rss.peak_mb:.0f} MB")
+    if metrics is not None:
+        metrics.update(profile=profile, first_item_seconds=first_item, peak_rss_mb=rss.peak_mb)
+
+    if selector:
+        logger.info(f"✅ {len(items)} Meldungen mit Selector '{selector}' gefunden")
+    else:
+        logger.warning("⚠️ Keine Meldungen mit bekannten Selektoren gefunden")
+        logger.info(f"🔄 Fallback: {len(items)} li-Elemente gefunden")
+    
+    updates = []
+    processed = 0
+    
+    for item in items:
+        try:
+            notice = build_notice(item.get("text"), item.get("title"), item.get("spans"))
+            if notice:
+                updates.append(notice)
+                processed += 1
+        except Exception as e:
+            logger.debug(f"Fehler beim Verarbeiten eines Eintrags: {e}")
+            continue
     
-    logger.info("📝 Neuer State wird erstellt")
-    return set()
+    logger.info(f"✅ {processed} Meldungen erfolgreich verarbeitet")
+    return updates
+
+# ----------------------------- Warmer Browser für den Daemon-Modus -----------------------------
+def _process_tree_rss_mb(pid):
+    """Summiert den RSS eines Prozesses und aller Kindprozesse (Linux /proc)."""
+    total_kb = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f"/proc/{current}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+            with open(f"/proc/{current}/task/{current}/children", "r") as f:
+                stack.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024
+
+def _driver_pid(driver):
+    try:
+        return driver.service.process.pid
+    except AttributeError:
+        return None
+
+class PeakRssSampler:
+    """Misst im Hintergrund den höchsten RSS eines Prozessbaums (Kontextmanager)."""
 
-def save_state(state):
-    """Speichert State mit Backup."""
-    if not isinstance(state, (set, list)):
-        logger.error("❌ Ungültiger State-Typ")
+    def __init__(self, pid, interval=0.25):
+        self.pid = pid
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        self.peak_mb = max(self.peak_mb, _process_tree_rss_mb(self.pid))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        if self.pid:
+            self._sample()
+            self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._sample()
         return False
-    
+
+def compare_browser_profiles(profiles=tuple(BROWSER_PROFILES)):
+    """Scrapt einmal pro Profil mit frischem Browser und vergleicht Meldungen, Zeit und Speicher."""
+    results = {}
+    for profile in profiles:
+        metrics = {}
+        driver = create_driver(profile)
+        try:
+            started = time.monotonic()
+            notices = scrape_viz_page(driver, metrics)
+            metrics.update(total_seconds=time.monotonic() - started, keys=set(notice_keys(notices)))
+        finally:
+            driver.quit()
+        results[profile] = metrics
+
+    reference = results[profiles[0]]["keys"]
+    for profile, metrics in results.items():
+        first_item = metrics["first_item_seconds"]
+        print(
+            f"{profile}: {len(metrics['keys'])} Meldungen "
+            f"({'gleiche Schlüssel' if metrics['keys'] == reference else 'ABWEICHENDE Schlüssel'}), "
+            f"erste Meldung {f'{first_item:.1f} s' if first_item is not None else '-'}, "
+            f"gesamt {metrics['total_seconds']:.1f} s, Spitze RSS {metrics['peak_rss_mb']:.0f} MB"
+        )
+    return results
+
+class BrowserSession:
+    """Hält einen WebDriver über mehrere Poll-Zyklen am Leben."""
+
+    def __init__(self, max_rss_mb=BROWSER_MAX_RSS_MB, max_cycles=BROWSER_MAX_CYCLES):
+        self.driver = None
+        self.cycles = 0
+        self.max_rss_mb = max_rss_mb
+        self.max_cycles = max_cycles
+
+    def get(self):
+        """Gibt den laufenden Browser zurück und startet ihn bei Bedarf."""
+        if self.driver is None:
+            logger.info("🌐 Starte Browser für Daemon-Modus...")
+            self.driver = create_driver()
+            self.cycles = 0
+        return self.driver
+
+    def rss_mb(self):
+        """Aktueller Speicherverbrauch von chromedriver + Chrome in MB."""
+        try:
+            return _process_tree_rss_mb(self.driver.service.process.pid)
+        except Exception:
+            return 0
+
+    def recycle(self, reason):
+        """Beendet den Browser; der nächste get()-Aufruf startet ihn neu."""
+        if self.driver is None:
+            return
+        logger.info(f"♻️ Browser wird neu gestartet ({reason})")
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self.driver = None
+
+    def end_cycle(self):
+        """Prüft nach jedem Zyklus Speicherwachstum und Laufzeit des Browsers."""
+        if self.driver is None:
+            return
+        self.cycles += 1
+        rss = self.rss_mb()
+        if rss > self.max_rss_mb:
+            self.recycle(f"RSS {rss:.0f} MB > {self.max_rss_mb} MB")
+        elif self.cycles >= self.max_cycles:
+            self.recycle(f"{self.cycles} Zyklen erreicht")
+
+    def close(self):
+        self.recycle("Daemon beendet")
+
+# ----------------------------- HTTP-Cache (ETag/Last-Modified/Body-Hash) -----------------------------
+def load_http_cache():
+    """Lädt die Validatoren des letzten HTTP-Abrufs."""
+    if not os.path.exists(HTTP_CACHE_FILE):
+        return {}
     try:
-        create_backup()
-        
-        with open(STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(sorted(list(state)), f, ensure_ascii=False, indent=2)
-        
-        logger.info(f"💾 State gespeichert: {len(state)} Einträge")
-        return True
+        with open(HTTP_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, ValueError, OSError) as e:
+        logger.warning(f"⚠️ Konnte {HTTP_CACHE_FILE} nicht lesen: {e}")
+        return {}
+
+def save_http_cache(page):
+    """Speichert die Validatoren des aktuellen HTTP-Abrufs und gibt sie zurück."""
+    cache = {key: page.get(key) for key in ("etag", "last_modified", "body_hash", "rendered")}
+    try:
+        atomic_write_json(HTTP_CACHE_FILE, cache, indent=2)
+    except OSError as e:
+        logger.warning(f"⚠️ HTTP-Cache konnte nicht gespeichert werden: {e}")
+    return cache
+
+def fetch_page_fast(http_cache):
+    """HTTP-Schnellpfad vor Selenium.
+
+    Gibt (page, updates) zurück. page ist None, wenn der HTTP-Abruf
+    fehlgeschlagen ist; updates ist None, wenn die Seite JavaScript-Rendering
+    braucht oder nichts extrahiert werden konnte. Die Meldungen werden schon
+    während des Downloads geparst (fetch_viz_page).
+    """
+    try:
+        page = fetch_viz_page(http_cache)
     except Exception as e:
-        logger.error(f"❌ Fehler beim Speichern des States: {e}")
-        restore_from_backup()
+        logger.warning(f"⚠️ HTTP-Schnellpfad fehlgeschlagen: {e}")
+        return None, None
+
+    if not page.get("rendered"):
+        return page, None
+    return page, page.get("notices") or None
+
+def page_unchanged(page, http_cache):
+    """Prüft, ob der Lauf ohne Änderungen beendet werden kann.
+
+    304 bzw. ein identischer Body-Hash sagen nur etwas über die Meldungen aus,
+    wenn diese beim letzten Mal schon im HTML standen. Bei einer per
+    JavaScript gerenderten Seite ändert sich das HTML-Gerüst nicht mit den
+    Meldungen.
+    """
+    if not page or not http_cache.get("rendered"):
         return False
+    return page["status"] in ("not_modified", "unchanged")
 
 # ----------------------------- Verbesserte Post-Logik -----------------------------
-def post_updates_safely(items, resolved=False):
-    """Postet Updates mit Fehlerbehandlung pro Item."""
-    successful_posts = 0
+def prepare_posts(items, resolved=False, updated=False):
+    """Formatiert Meldungen zu Threads. Gibt ([(norm_item, parts)], Anzahl fehlgeschlagen) zurück."""
+    threads = []
     failed_posts = 0
     
     for norm_item in items:
         try:
             if resolved:
                 parts = beautify_text(f"✅ Behoben: {norm_item}", resolved=True)
+            elif updated:
+                parts = beautify_text(f"🔄 Aktualisiert: {norm_item}")
             else:
                 # Original-Text für neue Meldungen rekonstruieren (vereinfacht)
                 parts = beautify_text(norm_item)
-            
-            logger.info(f"📤 Poste: {parts[0][:50]}...")
-            post_on_bluesky_thread(parts)
-            successful_posts += 1
-            logger.info("✅ Erfolgreich gepostet!")
-            
-            # Pause zwischen Posts
-            time.sleep(8)
-            
-        except BlueskyError as e:
-            logger.error(f"❌ Bluesky-Fehler: {e}")
-            failed_posts += 1
-            # Bei Rate-Limit länger warten
-            if "rate" in str(e).lower() or "limit" in str(e).lower():
-                logger.info("⏳ Rate-Limit erreicht, warte 60 Sekunden...")
-                time.sleep(60)
+            threads.append((norm_item, parts))
         except Exception as e:
-            logger.error(f"❌ Unerwarteter Post-Fehler: {e}")
+            logger.error(f"❌ Fehler beim Formatieren: {e}")
             failed_posts += 1
     
-    logger.info(f"📊 Post-Statistik: {successful_posts} erfolgreich, {failed_posts} fehlgeschlagen")
-    return successful_posts, failed_posts
+    return threads, failed_posts
+
+def enqueue_posts(outbox, diff):
+    """Trägt die Diff-Ergebnisse in die Outbox ein. Gibt die Anzahl nicht formatierbarer Meldungen zurück.
+
+    Bei sehr vielen Änderungen (DIGEST_THRESHOLD) wird pro Bezirk nur eine
+    Sammelmeldung eingereiht statt eines Threads pro Meldung.
+    """
+    changes = [("new", item) for item in diff.new] + [("resolved", item) for item in diff.resolved]
+    if UPDATE_MODE == "post":
+        changes += [("updated", new) for _, new, _ in diff.updated]
+    if needs_digest(len(changes)):
+        for key, parts in build_digests(changes):
+            outbox.enqueue("digest", key, parts)
+        return 0
+
+    batches = [("new", prepare_posts(diff.new)), ("resolved", prepare_posts(diff.resolved, resolved=True))]
+    if UPDATE_MODE == "post":
+        batches.append(("updated", prepare_posts([new for _, new, _ in diff.updated], updated=True)))
+
+    total_failed = 0
+    for kind, (threads, failed) in batches:
+        total_failed += failed
+        for norm_item, parts in threads:
+            outbox.enqueue(kind, norm_item, parts)
+    return total_failed
 
 # ----------------------------- Main mit verbesserter Fehlerbehandlung -----------------------------
-def main():
-    """Hauptfunktion mit umfassender Fehlerbehandlung."""
-    logger.info("🚀 Bot gestartet...")
-    
-    try:
-        # State laden
+def run_cycle(prev_state=None, http_cache=None, browser=None):
+    """Ein Durchlauf scrape → normalize → diff → post.
+
+    prev_state wird bei None von der Platte geladen. Gibt den State nach dem
+    Lauf zurück (unverändert, wenn nichts gespeichert wurde).
+    """
+    # Liegengebliebene Posts aus früheren Läufen zuerst abarbeiten
+    run_started = time.monotonic()
+    outbox = Outbox.load()
+    total_successful, total_failed = outbox.drain()
+
+    # Schnellpfad: Seite per Conditional GET laden
+    if http_cache is None:
+        http_cache = load_http_cache()
+    page, notices = fetch_page_fast(http_cache)
+    if page_unchanged(page, http_cache):
+        logger.info("✅ Seite unverändert (HTTP 304/gleicher Hash) - nichts zu tun")
+        return prev_state
+
+    # State laden
+    if prev_state is None:
         prev_state = load_state()
-        logger.info(f"📂 Bisher gespeicherte Meldungen: {len(prev_state)}")
+    logger.info(f"📂 Bisher gespeicherte Meldungen: {len(prev_state)}")
+    # Stand auf der Platte: Basis für den Journal-Diff, damit auch die Entfernungen unten hineinkommen
+    loaded_state = prev_state
 
-        # Updates scrapen mit Retry-Logic
-        raw_updates = get_viz_updates_with_retry()
-        
-        if not raw_updates:
-            logger.warning("⚠️ Keine Updates erhalten - Bot beendet sich ohne Änderungen")
-            return
-        
-        # Normalisierung mit Fehlerbehandlung
-        current_updates = set()
-        for update in raw_updates:
-            try:
-                normalized = normalize_message(update)
-                if normalized:  # Nur non-empty hinzufügen
-                    current_updates.add(normalized)
-            except Exception as e:
-                logger.error(f"❌ Fehler bei Normalisierung von '{update[:50]}...': {e}")
+    # Alt-Einträge außerhalb Berlins still entfernen, damit sie nicht als "behoben" gepostet werden
+    outside = {item for item in prev_state if not is_berlin_related(item)}
+    if outside:
+        logger.info(f"🗺️ {len(outside)} gespeicherte Meldungen außerhalb Berlins entfernt")
+        prev_state = prev_state - outside
+
+    # Selenium nur, wenn der Schnellpfad kein plausibles Ergebnis liefert
+    tracker = MissTracker.load()
+    if notices and plausible(notices, tracker.last_count):
+        logger.info(f"⚡ {len(notices)} Meldungen per HTTP geladen - Selenium nicht nötig")
+    else:
+        # Hat der Schnellpfad nur das JavaScript-Gerüst gesehen, bringt ein zweiter HTTP-Abruf nichts
+        js_only = bool(page) and not page.get("rendered")
+        notices = get_viz_updates_with_retry(
+            browser, tracker.last_count, skip_http=js_only, known_keys=prev_state
+        ) or notices
+    
+    if not notices:
+        logger.warning("⚠️ Keine Updates erhalten - Bot beendet sich ohne Änderungen")
+        return loaded_state
 
-        logger.info(f"🔄 {len(raw_updates)} raw → {len(current_updates)} normalisierte Updates")
+    # Berlin-Filter und kanonische Schlüssel; unveränderte Meldungen kommen aus dem Fingerprint-Cache
+    fingerprints = FingerprintCache.load()
+    berlin_notices = fingerprints.resolve(notices)
+    if len(berlin_notices) < len(notices):
+        logger.info(f"🗺️ {len(notices) - len(berlin_notices)} Meldungen außerhalb Berlins gefiltert")
 
+    current_updates = set()
+    for i, (notice, key) in enumerate(berlin_notices):
+        if key:  # Nur non-empty hinzufügen
+            current_updates.add(key)
         # Debug: Beispiel-Normalisierung
-        if raw_updates:
-            logger.info("🔎 Beispiel-Normalisierung:")
-            for i, u in enumerate(raw_updates[:2]):
-                logger.info(f"  RAW {i+1}: {u[:100]}...")
-                logger.info(f"  NORM{i+1}: {normalize_message(u)[:100]}...")
-
-        # Neue und behobene Meldungen identifizieren
-        new_items = current_updates - prev_state
-        resolved_items = prev_state - current_updates
-        
-        logger.info(f"📈 Neue Meldungen: {len(new_items)}")
-        logger.info(f"📉 Behobene Meldungen: {len(resolved_items)}")
+        if i < 2:
+            logger.info(f"🔎 Beispiel-Normalisierung {i+1}:")
+            logger.info(f"  RAW {i+1}: {notice.message[:100]}...")
+            logger.info(f"  NORM{i+1}: {key[:100]}...")
 
-        # Posts senden
-        total_successful = 0
-        total_failed = 0
-        
-        if new_items:
-            logger.info("📤 Poste neue Meldungen...")
-            success, failed = post_updates_safely(new_items, resolved=False)
-            total_successful += success
-            total_failed += failed
-
-        if resolved_items:
-            logger.info("📤 Poste behobene Meldungen...")
-            success, failed = post_updates_safely(resolved_items, resolved=True)
-            total_successful += success
-            total_failed += failed
-
-        # State nur bei erfolgreichem Scraping aktualisieren
-        if save_state(current_updates):
-            logger.info("💾 State erfolgreich gespeichert")
-        else:
-            logger.error("❌ State-Speicherung fehlgeschlagen")
-
-        # Zusammenfassung
-        logger.info(f"🎯 Bot-Lauf beendet: {total_successful} Posts erfolgreich, {total_failed} fehlgeschlagen")
+    logger.info(f"🔄 {len(berlin_notices)} raw → {len(current_updates)} normalisierte Updates")
+
+    # Neue, behobene und geänderte Meldungen identifizieren
+    diff = diff_states(prev_state, current_updates)
+
+    # Hysterese: Verschwundenes erst nach mehreren Fehlläufen als behoben werten,
+    # bis dahin bleibt es im State
+    diff.resolved, still_missing = tracker.confirm_resolved(diff.resolved, current_updates)
+    next_state = current_updates | still_missing
+
+    new_items = diff.new
+    resolved_items = diff.resolved
+    updated_items = [new for _, new, _ in diff.updated]
+    
+    logger.info(f"📈 Neue Meldungen: {len(new_items)}")
+    logger.info(f"📉 Behobene Meldungen: {len(resolved_items)}")
+    logger.info(f"🔁 Geänderte Meldungen: {len(updated_items)}")
+
+    # Erst in die Outbox, dann State speichern, dann posten: ein fehlgeschlagener
+    # Post bleibt in der Outbox und wird im nächsten Lauf erneut versucht
+    total_failed += enqueue_posts(outbox, diff)
+    outbox.save()
+    fingerprints.save()
+
+    # State nur bei erfolgreichem Scraping aktualisieren
+    if save_state(next_state, loaded_state):
+        logger.info("💾 State erfolgreich gespeichert")
+        tracker.save()
+        if page:
+            http_cache.update(save_http_cache(page))
+        prev_state = next_state
+    else:
+        logger.error("❌ State-Speicherung fehlgeschlagen")
+        prev_state = loaded_state
+
+    # Restliches Zeitbudget des Laufs für die neuen Einträge
+    remaining = max(0.0, OUTBOX_DRAIN_SECONDS - (time.monotonic() - run_started))
+    success, failed = outbox.drain(remaining)
+    total_successful += success
+    total_failed += failed
+    if len(outbox):
+        logger.info(f"📬 {len(outbox)} Posts bleiben in der Outbox")
+
+    # Zusammenfassung
+    logger.info(f"🎯 Bot-Lauf beendet: {total_successful} Posts erfolgreich, {total_failed} fehlgeschlagen")
+    return prev_state
+
+def main():
+    """Hauptfunktion mit umfassender Fehlerbehandlung."""
+    logger.info("🚀 Bot gestartet...")
+    
+    try:
+        run_cycle()
         
     except KeyboardInterrupt:
         logger.info("⏹️ Bot durch Benutzer gestoppt")
     except Exception as e:
         logger.error(f"❌ Kritischer Fehler in main(): {e}")
-        # Versuche State zu retten
-        try:
-            restore_from_backup()
-            logger.info("🔄 Backup-State wiederhergestellt")
-        except:
-            logger.error("❌ Auch Backup-Wiederherstellung fehlgeschlagen")
         raise
 
+def run_daemon(interval=POLL_INTERVAL):
+    """Dauerbetrieb: warmer Browser, warmer Bluesky-Client, State im Speicher."""
+    logger.info(f"🚀 Bot im Daemon-Modus gestartet (Intervall: {interval}s)...")
+    
+    browser = BrowserSession()
+    prev_state = load_state()
+    http_cache = load_http_cache()
+    
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                prev_state = run_cycle(prev_state, http_cache, browser)
+            except Exception as e:
+                logger.error(f"❌ Fehler im Poll-Zyklus: {e}")
+                browser.recycle("Fehler im Poll-Zyklus")
+                # State nach einem Absturz neu von der Platte lesen
+                prev_state = load_state()
+            browser.end_cycle()
+            
+            elapsed = time.monotonic() - started
+            logger.info(f"⏱️ Zyklus in {elapsed:.1f}s beendet")
+            time.sleep(max(0, interval - elapsed))
+    except KeyboardInterrupt:
+        logger.info("⏹️ Daemon durch Benutzer gestoppt")
+    finally:
+        browser.close()
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Berlin VIZ Bluesky Bot")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Dauerbetrieb mit warmem Browser und Bluesky-Client")
+    parser.add_argument("--interval", type=int, default=POLL_INTERVAL,
+                        help="Poll-Intervall im Daemon-Modus in Sekunden")
+    parser.add_argument("--compare-profiles", action="store_true",
+                        help="Browser-Profile (full/lean) einmal scrapen und Zeit/Speicher vergleichen")
+    args = parser.parse_args()
+    
+    if args.compare_profiles:
+        compare_browser_profiles()
+    elif args.daemon:
+        run_daemon(args.interval)
+    else:
+        main()
@@ -0,0 +1,137 @@
+import json
+import time
+import base64
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+POST_COLLECTION = "app.bsky.feed.post"
+FAKE_DID = "did:plc:fakepds"
+FAKE_HANDLE = "bot.test"
+
+def _fake_jwt(exp):
+    """Unsigniertes JWT: der atproto-Client liest daraus nur exp/sub."""
+    encode = lambda data: base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+    return f"{encode({'alg': 'HS256'})}.{encode({'exp': exp, 'sub': FAKE_DID, 'scope': 'com.atproto.access'})}.sig"
+
+class FakePDS:
+    """Lokaler Fake-PDS für Tests: applyWrites, createRecord und RateLimit-Header.
+
+    Records liegen pro rkey im Speicher; ein zweites create mit demselben rkey
+    wird wie beim echten PDS mit "Record already exists" abgelehnt.
+    fail_apply_writes lässt applyWrites scheitern (Einzel-Fallback testen).
+    """
+
+    def __init__(self, limit=1000, window=300):
+        self.records = {}
+        self.calls = []
+        self.fail_apply_writes = False
+        self.limit = limit
+        self.remaining = limit
+        self.window = window
+        self.reset = int(time.time()) + window
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/xrpc"
+
+    def session_string(self):
+        """Session im Format von atproto.Session.encode(), gültig für eine Stunde."""
+        from atproto import Session
+        now = int(time.time())
+        return Session(
+            handle=FAKE_HANDLE, did=FAKE_DID,
+            access_jwt=_fake_jwt(now + 3600), refresh_jwt=_fake_jwt(now + 86400),
+        ).encode()
+
+    def texts(self):
+        """Texte aller gespeicherten Posts in rkey-Reihenfolge."""
+        return [self.records[rkey]["text"] for rkey in sorted(self.records)]
+
+    def _handle(self, path, body):
+        """Gibt (status, payload) für einen XRPC-Aufruf zurück."""
+        method = path.rsplit("/", 1)[-1]
+        with self._lock:
+            self.calls.append(method)
+            if self.remaining <= 0:
+                return 429, {"error": "RateLimitExceeded", "message": "Rate Limit Exceeded"}
+            self.remaining -= 1
+
+            if method == "com.atproto.repo.applyWrites":
+                if self.fail_apply_writes:
+                    return 400, {"error": "InvalidRequest", "message": "applyWrites disabled"}
+                creates = [(write["rkey"], write["value"]) for write in body["writes"]]
+            elif method == "com.atproto.repo.createRecord":
+                creates = [(body["rkey"], body["record"])]
+            else:
+                return 501, {"error": "MethodNotImplemented", "message": method}
+
+            if any(rkey in self.records for rkey, _ in creates):
+                return 400, {"error": "InvalidRequest", "message": "Record already exists"}
+            self.records.update(creates)
+            rkey = creates[0][0]
+            return 200, {"uri": f"at://{FAKE_DID}/{POST_COLLECTION}/{rkey}", "cid": "bafyfake", "commit": {"cid": "bafyfake", "rev": rkey}}
+
+    def start(self):
+        pds = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))) or b"{}")
+                status, payload = pds._handle(self.path, body)
+                self.send_response(status)
+                self.send_header("content-type", "application/json; charset=utf-8")
+                self.send_header("ratelimit-limit", str(pds.limit))
+                self.send_header("ratelimit-remaining", str(max(pds.remaining, 0)))
+                self.send_header("ratelimit-reset", str(pds.reset))
+                self.send_header("ratelimit-policy", f"{pds.limit};w={pds.window}")
+                self.end_headers()
+                self.wfile.write(json.dumps(payload).encode())
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+@pytest.fixture
+def fake_pds():
+    pds = FakePDS().start()
+    yield pds
+    pds.stop()
+
+@pytest.fixture
+def bluesky_client(fake_pds, tmp_path, monkeypatch):
+    """bluesky-Modul gegen den Fake-PDS: gespeicherte Session, eigenes Rate-Budget, keine Pausen."""
+    import bluesky
+    from scheduler import RateLimiter
+
+    session_file = tmp_path / ".bluesky_session"
+    session_file.write_text(fake_pds.session_string(), encoding="utf-8")
+    monkeypatch.setattr(bluesky, "SESSION_FILE", str(session_file))
+    monkeypatch.setattr(bluesky, "BLUESKY_BASE_URL", fake_pds.url)
+    monkeypatch.setattr(bluesky, "BLUESKY_HANDLE", FAKE_HANDLE)
+    monkeypatch.setattr(bluesky, "_bluesky_client", None)
+    monkeypatch.setattr(bluesky, "posting_limiter", RateLimiter(sleep=lambda seconds: None))
+    monkeypatch.setattr(bluesky.time, "sleep", lambda seconds: None)
+    return bluesky
+
+@pytest.fixture(autouse=True)
+def selector_file(tmp_path, monkeypatch):
+    """Der gemerkte Selektor landet pro Test in tmp_path statt im Repo."""
+    import fallback
+
+    path = tmp_path / "selector.json"
+    monkeypatch.setattr(fallback, "SELECTOR_FILE", str(path))
+    monkeypatch.setattr(fallback, "_last_selector", None)
+    monkeypatch.setattr(fallback, "_selector_loaded", False)
+    return path
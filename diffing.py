@@ -0,0 +1,137 @@
+import os
+import zlib
+import random
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Ab dieser Ähnlichkeit (siehe similarity) gelten verschwundene + neue Meldung als "geändert"
+SIMILARITY_THRESHOLD = float(os.getenv("SIMILARITY_THRESHOLD", "0.75"))
+SHINGLE_SIZE = 4
+# Containment zählt erst ab so vielen n-Grammen im kürzeren Text, sonst nur Jaccard
+CONTAINMENT_MIN_SHINGLES = 20
+# 32 Bänder à 2 Zeilen: Kandidaten schon ab ca. 0.3 Jaccard (> 95 %). So niedrig, weil
+# eine um Details ergänzte Meldung (Präfix-Fall) trotz Containment 1.0 oft nur 0.3-0.4 Jaccard hat
+NUM_BANDS = 32
+ROWS_PER_BAND = 2
+NUM_PERM = NUM_BANDS * ROWS_PER_BAND
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(42)  # feste Permutationen → reproduzierbare Ergebnisse
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+class DiffResult:
+    """Ergebnis eines Diffs: neue, behobene und geänderte (old, new, ähnlichkeit) Meldungen."""
+    __slots__ = ("new", "resolved", "updated")
+
+    def __init__(self, new, resolved, updated):
+        self.new = new
+        self.resolved = resolved
+        self.updated = updated
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Zeichen-n-Gramme eines (normalisierten) Textes als Hash-Menge."""
+    if len(text) <= size:
+        return {zlib.crc32(text.encode("utf-8"))}
+    data = text.encode("utf-8")
+    return {zlib.crc32(data[i:i + size]) for i in range(len(data) - size + 1)}
+
+def minhash(shingle_set):
+    """MinHash-Signatur über NUM_PERM Permutationen."""
+    return [min((a * s + b) % _MERSENNE_PRIME for s in shingle_set) for a, b in _PERMUTATIONS]
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+def containment(a, b):
+    """Anteil der kleineren Menge, der in der größeren steckt (1.0, wenn ein Text den anderen enthält)."""
+    if not a or not b:
+        return 1.0 if a == b else 0.0
+    return len(a & b) / min(len(a), len(b))
+
+def _profile(item):
+    """Shingles des ganzen Schlüssels und des Kopfs (Art + Ort, vor dem ersten '|')."""
+    return shingles(item), shingles(item.split("|", 1)[0])
+
+def similarity(a, b):
+    """Ähnlichkeit zweier Profile (_profile) als (score, jaccard).
+
+    score ist Jaccard oder, wenn höher, Containment: Jaccard bestraft den
+    typischen Edit, bei dem an eine Meldung Details angehängt werden (der
+    alte Schlüssel ist Präfix des neuen); Containment erkennt ihn. Weil sich
+    viele Meldungen lange Standardtexte teilen ("fahrbahn auf einen
+    fahrstreifen verengt"), zählt Containment nur so weit, wie auch der Kopf
+    mit dem Ort übereinstimmt. Bei sehr kurzen Texten steckt der eine leicht
+    ganz im anderen, dort gilt nur Jaccard.
+    """
+    (full_a, head_a), (full_b, head_b) = a, b
+    if not full_a and not full_b:
+        return 1.0, 1.0
+    common = len(full_a & full_b)
+    jac = common / (len(full_a) + len(full_b) - common)
+    smaller = min(len(full_a), len(full_b))
+    if smaller < CONTAINMENT_MIN_SHINGLES:
+        return jac, jac
+    return max(jac, min(common / smaller, containment(head_a, head_b))), jac
+
+def _bands(signature):
+    for band in range(NUM_BANDS):
+        start = band * ROWS_PER_BAND
+        yield band, tuple(signature[start:start + ROWS_PER_BAND])
+
+def pair_similar(disappeared, appeared, threshold=SIMILARITY_THRESHOLD):
+    """Paart verschwundene und neue Meldungen nach Ähnlichkeit (MinHash-LSH + similarity).
+
+    Nur Paare, die in mindestens einem LSH-Band kollidieren, werden exakt
+    verglichen; dadurch bleibt es auch bei großen Diffs sub-quadratisch.
+    Jede Meldung wird höchstens einmal gepaart (beste Paare zuerst).
+    """
+    if not disappeared or not appeared:
+        return []
+
+    old_profiles = {item: _profile(item) for item in disappeared}
+    buckets = {}
+    for item, (sh, _) in old_profiles.items():
+        for key in _bands(minhash(sh)):
+            buckets.setdefault(key, []).append(item)
+
+    candidates = []
+    for new_item in appeared:
+        new_profile = _profile(new_item)
+        seen = set()
+        for key in _bands(minhash(new_profile[0])):
+            for old_item in buckets.get(key, ()):
+                if old_item in seen:
+                    continue
+                seen.add(old_item)
+                score, jac = similarity(old_profiles[old_item], new_profile)
+                if score >= threshold:
+                    # Bei gleichem Score gewinnt das Paar mit der höheren Jaccard-Ähnlichkeit
+                    candidates.append((score, jac, old_item, new_item))
+
+    pairs = []
+    used_old, used_new = set(), set()
+    for score, _, old_item, new_item in sorted(candidates, reverse=True):
+        if old_item in used_old or new_item in used_new:
+            continue
+        used_old.add(old_item)
+        used_new.add(new_item)
+        pairs.append((old_item, new_item, score))
+    return pairs
+
+def diff_states(prev_state, current_state, threshold=SIMILARITY_THRESHOLD):
+    """Berechnet neue, behobene und geänderte Meldungen zwischen zwei States."""
+    appeared = current_state - prev_state
+    disappeared = prev_state - current_state
+
+    updated = pair_similar(disappeared, appeared, threshold)
+    for old_item, new_item, similarity in updated:
+        logger.debug(f"🔁 Geändert ({similarity:.2f}): {old_item[:40]}... → {new_item[:40]}...")
+
+    return DiffResult(
+        new=appeared - {new for _, new, _ in updated},
+        resolved=disappeared - {old for old, _, _ in updated},
+        updated=updated,
+    )
@@ -0,0 +1,92 @@
+import os
+import hashlib
+import logging
+
+from beautify import POST_MAX_GRAPHEMES, grapheme_len
+from matcher import find_district
+
+logger = logging.getLogger(__name__)
+
+# Ab so vielen Änderungen in einem Lauf wird statt Einzel-Threads eine Sammelmeldung pro Bezirk gepostet
+DIGEST_THRESHOLD = int(os.getenv("DIGEST_THRESHOLD", "25"))
+# Höchstens so viele Meldungen pro Bezirk ausschreiben, der Rest wird nur gezählt
+DIGEST_MAX_ITEMS = int(os.getenv("DIGEST_MAX_ITEMS", "12"))
+# Kürzere Zeilen, damit mehrere Meldungen in einen Post passen
+DIGEST_LABEL_LEN = 90
+DIGEST_HASHTAGS = "#Berlin #Verkehr"
+# Gruppe für Meldungen ohne erkennbaren Bezirk
+OTHER_DISTRICT = "sonstige"
+
+KIND_MARKERS = {"new": "🆕", "updated": "🔄", "resolved": "✅"}
+
+def needs_digest(change_count, threshold=DIGEST_THRESHOLD):
+    return threshold > 0 and change_count > threshold
+
+def _label(item):
+    """Kurzform einer normalisierten Meldung: nur der Titel-Teil vor dem ersten '|'."""
+    label = item.split("|", 1)[0].strip()
+    if len(label) > DIGEST_LABEL_LEN:
+        label = label[:DIGEST_LABEL_LEN - 1].rstrip() + "…"
+    return label[:1].upper() + label[1:]
+
+def group_by_district(changes):
+    """Gruppiert (kind, item)-Paare nach Bezirk; Reihenfolge innerhalb der Gruppe bleibt."""
+    groups = {}
+    for kind, item in changes:
+        district = find_district(item) or OTHER_DISTRICT
+        groups.setdefault(district, []).append((kind, item))
+    return groups
+
+def _pack_lines(lines, limit=POST_MAX_GRAPHEMES):
+    """Verteilt ganze Zeilen auf möglichst wenige Posts mit höchstens limit Graphemen."""
+    parts = []
+    current = ""
+    for line in lines:
+        candidate = f"{current}\n{line}" if current else line
+        if grapheme_len(candidate) <= limit:
+            current = candidate
+            continue
+        if current:
+            parts.append(current)
+        current = line[:limit]
+    if current:
+        parts.append(current)
+    return parts
+
+def build_digest_parts(district, changes):
+    """Baut den Thread einer Sammelmeldung für einen Bezirk."""
+    counts = {kind: 0 for kind in KIND_MARKERS}
+    for kind, _ in changes:
+        counts[kind] = counts.get(kind, 0) + 1
+
+    name = "Weitere Orte" if district == OTHER_DISTRICT else district.title()
+    summary = ", ".join(
+        f"{count} {word}" for count, word in (
+            (counts["new"], "neu"), (counts["updated"], "geändert"), (counts["resolved"], "behoben")
+        ) if count
+    )
+    lines = [f"📋 Sammelmeldung {name}: {summary}"]
+    # Neue zuerst, dann geänderte, dann behobene
+    ordered = sorted(changes, key=lambda change: list(KIND_MARKERS).index(change[0]))
+    for kind, item in ordered[:DIGEST_MAX_ITEMS]:
+        lines.append(f"{KIND_MARKERS[kind]} {_label(item)}")
+    if len(ordered) > DIGEST_MAX_ITEMS:
+        lines.append(f"… und {len(ordered) - DIGEST_MAX_ITEMS} weitere")
+    lines.append(DIGEST_HASHTAGS)
+    return _pack_lines(lines)
+
+def build_digests(changes):
+    """Gibt für alle Änderungen eines Laufs [(digest_key, parts)] zurück, einen Eintrag pro Bezirk.
+
+    digest_key ist stabil für dieselbe Menge an Änderungen, damit die Outbox
+    eine Sammelmeldung nicht doppelt einreiht.
+    """
+    digests = []
+    groups = group_by_district(changes)
+    for district in sorted(groups):
+        members = groups[district]
+        fingerprint = hashlib.sha1("\n".join(sorted(f"{k}\0{i}" for k, i in members)).encode("utf-8"))
+        key = f"sammelmeldung {district} {fingerprint.hexdigest()[:12]}"
+        digests.append((key, build_digest_parts(district, members)))
+    logger.info(f"📋 Sammelmodus: {len(changes)} Änderungen → {len(digests)} Bezirks-Threads")
+    return digests
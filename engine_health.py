@@ -0,0 +1,120 @@
+import os
+import json
+import time
+import random
+import logging
+
+from state_store import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+# Gesundheitszustand der Scraper über Läufe hinweg (per actions/cache wiederhergestellt)
+HEALTH_FILE = os.getenv("ENGINE_HEALTH_FILE", "engine_health.json")
+# Nach so vielen Fehlschlägen in Folge wird der Circuit geöffnet
+FAILURE_THRESHOLD = int(os.getenv("ENGINE_FAILURE_THRESHOLD", "3"))
+# Sperrzeit eines offenen Circuits; verdoppelt sich mit jeder fehlgeschlagenen Probe
+OPEN_SECONDS = float(os.getenv("ENGINE_OPEN_SECONDS", "900"))
+OPEN_MAX_SECONDS = float(os.getenv("ENGINE_OPEN_MAX_SECONDS", str(6 * 3600)))
+# Gewicht neuer Messungen im gleitenden Latenz-Mittel
+LATENCY_ALPHA = 0.3
+
+# Wartezeit zwischen Scraping-Runden: exponentiell mit vollem Jitter
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "2"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+def backoff_delay(attempt, base=RETRY_BASE_DELAY, cap=RETRY_MAX_DELAY, rng=random):
+    """Full-Jitter-Backoff: zufällig zwischen 0 und min(cap, base * 2^attempt)."""
+    return rng.uniform(0, min(cap, base * (2 ** attempt)))
+
+def _new_record():
+    return {
+        "state": CLOSED,
+        "successes": 0,
+        "failures": 0,
+        "consecutive_failures": 0,
+        "latency": None,
+        "open_until": 0,
+        "open_seconds": OPEN_SECONDS,
+    }
+
+class EngineHealth:
+    """Circuit Breaker (closed/open/half-open) und Statistik pro Scraping-Engine."""
+
+    def __init__(self, engines=None, path=HEALTH_FILE, clock=time.time):
+        self.engines = engines or {}
+        self.path = path
+        self.clock = clock
+
+    @classmethod
+    def load(cls, path=HEALTH_FILE):
+        if not os.path.exists(path):
+            return cls(path=path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(json.load(f), path)
+        except (json.JSONDecodeError, ValueError, OSError) as e:
+            logger.warning(f"⚠️ Konnte {path} nicht lesen: {e}")
+            return cls(path=path)
+
+    def save(self):
+        try:
+            atomic_write_json(self.path, self.engines, indent=2, sort_keys=True)
+        except OSError as e:
+            logger.warning(f"⚠️ Engine-Status konnte nicht gespeichert werden: {e}")
+
+    def record(self, name):
+        return self.engines.setdefault(name, _new_record())
+
+    def is_available(self, name):
+        """closed → ja; open → erst nach Ablauf der Sperrzeit, dann als Probe (half-open)."""
+        record = self.record(name)
+        if record["state"] == OPEN:
+            if self.clock() < record["open_until"]:
+                return False
+            record["state"] = HALF_OPEN
+            logger.info(f"🔌 Engine '{name}': Circuit half-open - Probe-Versuch")
+        return True
+
+    def typical_latency(self, name):
+        return self.record(name)["latency"]
+
+    def record_success(self, name, latency):
+        record = self.record(name)
+        if record["state"] != CLOSED:
+            logger.info(f"✅ Engine '{name}': Circuit wieder geschlossen")
+        record.update(state=CLOSED, consecutive_failures=0, open_seconds=OPEN_SECONDS)
+        record["successes"] += 1
+        previous = record["latency"]
+        record["latency"] = latency if previous is None else previous + LATENCY_ALPHA * (latency - previous)
+
+    def record_failure(self, name):
+        record = self.record(name)
+        record["failures"] += 1
+        record["consecutive_failures"] += 1
+        if record["state"] == HALF_OPEN:
+            # Probe fehlgeschlagen → länger sperren
+            record["open_seconds"] = min(record["open_seconds"] * 2, OPEN_MAX_SECONDS)
+            self._open(name, record)
+        elif record["state"] == CLOSED and record["consecutive_failures"] >= FAILURE_THRESHOLD:
+            self._open(name, record)
+
+    def _open(self, name, record):
+        # Jitter, damit nicht alle Probes auf denselben Lauf fallen
+        cooldown = record["open_seconds"] * random.uniform(0.8, 1.2)
+        record["state"] = OPEN
+        record["open_until"] = self.clock() + cooldown
+        logger.warning(
+            f"🔌 Engine '{name}': Circuit offen für {cooldown / 60:.0f} min "
+            f"({record['consecutive_failures']} Fehlschläge in Folge)"
+        )
+
+    def pick(self, names):
+        """Verfügbare Engines; sind alle gesperrt, die mit der frühesten Freigabe."""
+        available = [name for name in names if self.is_available(name)]
+        if available:
+            return available
+        fallback = min(names, key=lambda name: self.record(name)["open_until"])
+        logger.warning(f"⚠️ Alle Engines gesperrt - versuche '{fallback}' trotzdem")
+        return [fallback]
@@ -1,249 +1,160 @@
+import os
+import json
+import codecs
+import hashlib
+import importlib.util
 import requests
 import time
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.element import Tag, NavigableString, CData
+from html.parser import HTMLParser
 import logging
 
+from records import build_notice
+from state_store import atomic_write_json
+
 logger = logging.getLogger(__name__)
 
-BERLIN_INDICATORS = [
-    'berlin', 'a100', 'a111', 'a113', 'a115', 'stadtring',
-    'charlottenburg', 'neukölln', 'friedrichshain', 'kreuzberg', 
-    'prenzlauer berg', 'mitte', 'wedding', 'tiergarten', 'moabit',
-    'tempelhof', 'schöneberg', 'wilmersdorf', 'zehlendorf', 'steglitz',
-    'lichterfelde', 'lankwitz', 'mariendorf', 'marzahn', 'hellersdorf',
-    'köpenick', 'treptow', 'lichtenberg', 'pankow', 'reinickendorf',
-    'spandau', 'friedrichsfelde', 'karlshorst', 'weißensee', 'buch',
-    'wittenau', 'tegel', 'siemensstadt', 'hakenfelde', 'kladow',
-    'dahlem', 'grunewald', 'westend', 'wannsee', 'nikolassee',
-    'friedrichshagen', 'rahnsdorf', 'schmöckwitz', 'rudow', 'buckow',
-    'britz', 'johannisthal', 'adlershof', 'alt-treptow', 'plänterwald',
-    'oberschöneweide', 'niederschöneweide', 'baumschulenweg', 'wuhlheide',
-    'fennpfuhl', 'rummelsburg', 'alt-hohenschönhausen', 'neu-hohenschönhausen',
-    'malchow', 'französisch buchholz', 'rosenthal', 'wilhelmsruh',
-    'gesundbrunnen', 'hansaviertel', 'hansa', 'falkenhagener feld',
-    'staaken', 'gatow', 'pichelsdorf', 'charlottenburg-nord'
+URL = "https://viz.berlin.de/verkehr-in-berlin/baustellen-sperrungen-und-sonstige-storungen/"
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'de-DE,de;q=0.8,en;q=0.6',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Cache-Control': 'no-cache',
+}
+
+# Marker, an dem erkannt wird, dass die Meldungen bereits serverseitig im HTML stehen
+ITEM_MARKER = b"construction-sites-item"
+
+# lxml ist deutlich schneller als html.parser, aber optional
+PARSER_BACKEND = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+# Nur die Meldungseinträge parsen, wenn sie im HTML stehen
+ITEM_STRAINER = SoupStrainer(class_=ITEM_MARKER.decode())
+ITEM_SELECTORS_STRAINED = ['li.construction-sites-item', '.construction-sites-item']
+
+# Nach verschiedenen möglichen Container-Strukturen suchen
+SELECTORS_TO_TRY = [
+    'li.construction-sites-item',
+    '.construction-sites-item',
+    'li[class*="construction"]',
+    '.item-container li',
+    '.construction-item',
+    '.traffic-item',
+    '.disruption-item',
+    'article',
+    '.entry',
+    '.post',
+    '[class*="baustelle"]',
+    '[class*="sperrung"]',
+    '[class*="störung"]',
+    '[class*="traffic"]',
+    '[class*="item"]'
 ]
+# Die häufigsten Selektoren direkt über find_all statt über die CSS-Engine (gleiches Ergebnis)
+_CLASS_SELECTORS = {
+    'li.construction-sites-item': lambda soup: soup.find_all('li', class_=ITEM_MARKER.decode()),
+    '.construction-sites-item': lambda soup: soup.find_all(class_=ITEM_MARKER.decode()),
+}
+# Zuletzt erfolgreicher Selektor (wird beim nächsten Parsen zuerst probiert); liegt in
+# SELECTOR_FILE, damit er auch im nächsten Cron-Lauf gilt (wird wie http_cache.json committet)
+SELECTOR_FILE = os.getenv("SELECTOR_FILE", "selector.json")
+_last_selector = None
+_selector_loaded = False
 
-def is_berlin_related(message: str) -> bool:
-    """Prüft, ob eine Meldung Berlin-bezogen ist."""
-    if not message:
-        return False
-    
-    msg_lower = message.lower()
-    
-    for indicator in BERLIN_INDICATORS:
-        if indicator in msg_lower:
-            return True
-    
-    if 'berlin,' in msg_lower or msg_lower.startswith('berlin'):
-        return True
-    
-    # Filter für Nicht-Berlin
-    non_berlin_patterns = [
-        r'kreis\s+(barnim|oberhavel|märkisch-oderland|dahme-spreewald|teltow-fläming|potsdam-mittelmark|havelland|oder-spree|uckermark)',
-        r'od\s+[a-zäöü]+',
-        r'ou\s+[a-zäöü]+',
-        r'l\d{2,3},',
-        r'k\d{4,5},',
-    ]
-    
-    for pattern in non_berlin_patterns:
-        if re.search(pattern, msg_lower):
-            return False
-    
-    return True
+_TEXT_TYPES = (NavigableString, CData)
+
+# "stream": Antwort stückweise lesen und Meldungen liefern, sobald ihr Eintrag schließt;
+# "soup": ganze Seite laden und mit BeautifulSoup parsen (inkl. Selektor-Kaskade)
+HTTP_SCRAPER_MODE = os.getenv("HTTP_SCRAPER_MODE", "stream")
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "16384"))
+ITEM_CLASS = ITEM_MARKER.decode()
+# Einträge, die mit diesen Wörtern beginnen, sind Seitenrahmen und keine Meldungen
+_SKIP_PREFIXES = ('cookie', 'datenschutz', 'impressum', 'kontakt')
+
+def _create_session():
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    return session
+
+def needs_js_rendering(content: bytes) -> bool:
+    """Prüft, ob die Meldungsliste erst per JavaScript gerendert wird."""
+    return ITEM_MARKER not in (content or b"")
+
+def fetch_viz_page(cache=None, timeout=30, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Lädt die VIZ-Seite per Conditional GET (ETag/Last-Modified) im Streaming-Modus.
+
+    Der Body wird nie als Ganzes gehalten: jedes Stück geht in den Hash und
+    direkt in den Streaming-Parser. Gibt ein Dict mit status ('not_modified',
+    'unchanged' oder 'changed'), notices (None bei 304) und den neuen
+    Validatoren (etag, last_modified, body_hash, rendered) zurück.
+    'unchanged' heißt: Server hat 200 geliefert, der Body ist aber identisch
+    zum letzten Lauf.
+    """
+    cache = cache or {}
+    headers = {}
+    if cache.get("etag"):
+        headers["If-None-Match"] = cache["etag"]
+    if cache.get("last_modified"):
+        headers["If-Modified-Since"] = cache["last_modified"]
+
+    session = _create_session()
+    logger.info(f"📡 Lade Seite (HTTP): {URL}")
+    with session.get(URL, headers=headers, timeout=timeout, stream=True) as response:
+        if response.status_code == 304:
+            return {**cache, "status": "not_modified", "notices": None}
+
+        response.raise_for_status()
+        digest = hashlib.sha256()
+        size = 0
+
+        def hashed_chunks():
+            nonlocal size
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                digest.update(chunk)
+                size += len(chunk)
+                yield chunk
+
+        parser = ItemStreamParser()
+        notices = list(iter_notices(hashed_chunks(), _stream_encoding(response), parser))
+        logger.info(f"📄 Antwort erhalten: {size} Bytes, Status: {response.status_code}")
+
+    body_hash = digest.hexdigest()
+    return {
+        "status": "unchanged" if body_hash == cache.get("body_hash") else "changed",
+        "notices": notices,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "body_hash": body_hash,
+        # Ohne Meldungseinträge im HTML rendert die Seite per JavaScript
+        "rendered": parser.items_seen > 0,
+    }
 
 def get_viz_updates_fallback():
     """
     Fallback-Scraper mit requests + BeautifulSoup
     Falls Selenium komplett fehlschlägt.
     """
+    if HTTP_SCRAPER_MODE == "stream":
+        return get_viz_updates_streaming()
+
     logger.info("🔄 Fallback-Scraper (requests + BeautifulSoup) gestartet...")
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'de-DE,de;q=0.8,en;q=0.6',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-        'Cache-Control': 'no-cache',
-    }
-    
-    url = "https://viz.berlin.de/verkehr-in-berlin/baustellen-sperrungen-und-sonstige-storungen/"
-    
     try:
-        session = requests.Session()
-        session.headers.update(headers)
+        session = _create_session()
         
-        logger.info(f"📡 Lade Seite: {url}")
-        response = session.get(url, timeout=30)
+        logger.info(f"📡 Lade Seite: {URL}")
+        response = session.get(URL, timeout=30)
         response.raise_for_status()
         
         logger.info(f"📄 Antwort erhalten: {len(response.content)} Bytes, Status: {response.status_code}")
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Debug: HTML-Struktur analysieren
-        logger.info("🔍 Analysiere HTML-Struktur...")
-        
-        # Zuerst schauen, ob überhaupt Content da ist
-        body_text = soup.get_text(strip=True)[:500]
-        logger.info(f"🔍 Body-Text (erste 500 Zeichen): {body_text}")
-        
-        # Nach verschiedenen möglichen Container-Strukturen suchen
-        selectors_to_try = [
-            'li.construction-sites-item',
-            '.construction-sites-item',
-            'li[class*="construction"]',
-            '.item-container li',
-            '.construction-item',
-            '.traffic-item',
-            '.disruption-item',
-            'article',
-            '.entry',
-            '.post',
-            '[class*="baustelle"]',
-            '[class*="sperrung"]',
-            '[class*="störung"]',
-            '[class*="traffic"]',
-            '[class*="item"]'
-        ]
-        
-        items = []
-        found_selector = None
-        
-        for selector in selectors_to_try:
-            items = soup.select(selector)
-            if items:
-                found_selector = selector
-                logger.info(f"✅ {len(items)} Elemente mit Selector '{selector}' gefunden")
-                break
-            else:
-                logger.debug(f"❌ Kein Element mit Selector '{selector}' gefunden")
-        
-        if not items:
-            logger.info("🔍 Keine spezifischen Selektoren erfolgreich, versuche generische Suche...")
-            
-            # Fallback: Alle Elemente mit genug Text und relevanten Keywords
-            all_elements = soup.find_all(['div', 'li', 'article', 'section'])
-            keywords = ['baustelle', 'sperrung', 'störung', 'verkehr', 'straße', 'autobahn', 'umleit']
-            
-            for elem in all_elements:
-                text = elem.get_text(strip=True).lower()
-                if (len(text) > 30 and 
-                    any(keyword in text for keyword in keywords) and
-                    not elem.find_parent(['script', 'style', 'nav', 'header', 'footer'])):
-                    items.append(elem)
-            
-            logger.info(f"🔄 Keyword-basierte Suche: {len(items)} relevante Elemente gefunden")
-        
-        if not items:
-            # Letzte Fallback-Strategie: Alle li-Elemente mit substantiellem Inhalt
-            all_lis = soup.find_all('li')
-            items = []
-            for li in all_lis:
-                text = li.get_text(strip=True)
-                # Mindestens 20 Zeichen, aber nicht nur Navigation/Footer-Content
-                if (len(text) > 20 and 
-                    not text.lower().startswith(('home', 'kontakt', 'impressum', 'datenschutz')) and
-                    not li.find_parent(['nav', 'footer', 'header'])):
-                    items.append(li)
-            
-            logger.info(f"🔄 Generische li-Suche: {len(items)} Elemente gefunden")
-        
-        updates = []
-        processed = 0
-        
-        for item in items:
-            try:
-                text_content = item.get_text(separator=' ', strip=True)
-                
-                # Filter für zu kurze oder irrelevante Inhalte
-                if (not text_content or 
-                    len(text_content) < 15 or
-                    text_content.lower().startswith(('cookie', 'datenschutz', 'impressum', 'kontakt'))):
-                    continue
-                
-                # Strukturierte Extraktion versuchen
-                title = ""
-                description = ""
-                zeitraum = ""
-                location = ""
-                
-                # Title aus strong, h1-h6, oder erstem Satz extrahieren
-                title_candidates = (item.find_all(['strong', 'b', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']) or
-                                  [item])
-                if title_candidates:
-                    title = title_candidates[0].get_text(strip=True)
-                    if len(title) > 100:  # Zu lang für Titel
-                        title = title[:97] + "..."
-                
-                # Spans für strukturierte Daten durchsuchen
-                spans = item.find_all(['span', 'div', 'p'])
-                for span in spans:
-                    span_text = span.get_text(strip=True)
-                    if not span_text:
-                        continue
-                        
-                    if any(word in span_text.lower() for word in ['zeitraum:', 'datum:', 'zeit:']):
-                        zeitraum = span_text.replace('Zeitraum:', '').replace('Datum:', '').strip()
-                    elif any(word in span_text.lower() for word in ['straße:', 'ort:', 'bereich:']):
-                        location = span_text.replace('Straße:', '').replace('Ort:', '').replace('Bereich:', '').strip()
-                    elif len(span_text) > 10 and span_text != title:
-                        if not description:
-                            description = span_text
-                        elif len(description) < 200:  # Beschreibung erweitern
-                            description += " | " + span_text
-                
-                # Fallback: gesamten Text als Description verwenden
-                if not description:
-                    description = text_content
-                    # Title aus erstem Teil extrahieren
-                    if not title and len(description) > 30:
-                        sentences = description.split('.')
-                        if sentences:
-                            title = sentences[0].strip()[:100]
-                            description = '. '.join(sentences[1:]).strip()
-                
-                # Message zusammenbauen
-                parts = []
-                if title and title != description[:len(title)]:
-                    parts.append(title)
-                if description:
-                    parts.append(description)
-                if zeitraum:
-                    parts.append(f"Zeitraum: {zeitraum}")
-                if location:
-                    parts.append(f"Ort: {location}")
-                
-                if parts:
-                    message = " | ".join(parts)
-                    # Nachricht begrenzen
-                    if len(message) > 500:
-                        message = message[:497] + "..."
-                    
-                    updates.append(message)
-                    processed += 1
-                    
-                    # Debug für erste paar Nachrichten
-                    if processed <= 3:
-                        logger.info(f"📋 Extrahierte Nachricht {processed}: {message[:100]}...")
-                
-            except Exception as e:
-                logger.debug(f"Fehler beim Verarbeiten eines Fallback-Eintrags: {e}")
-                continue
-        
-        logger.info(f"✅ Fallback-Scraper: {processed} von {len(items)} Elementen verarbeitet")
-        
-        # Debug: Wenn keine Updates gefunden wurden
-        if not updates and items:
-            logger.warning("⚠️ Elemente gefunden, aber keine Updates extrahiert")
-            for i, item in enumerate(items[:3]):
-                sample_text = item.get_text(strip=True)[:100]
-                logger.info(f"📋 Beispiel-Element {i+1}: {sample_text}...")
-        
-        return updates
+        return parse_viz_html(response.content)
         
     except requests.RequestException as e:
         logger.error(f"❌ Fallback-Scraper HTTP-Fehler: {e}")
@@ -251,3 +162,323 @@ def get_viz_updates_fallback():
     except Exception as e:
         logger.error(f"❌ Fallback-Scraper unerwarteter Fehler: {e}")
         return []
+
+def get_viz_updates_streaming():
+    """Fallback-Scraper im Streaming-Modus; Fehler ergeben wie beim Soup-Modus eine leere Liste."""
+    logger.info("🔄 Fallback-Scraper (Streaming) gestartet...")
+    try:
+        updates = list(stream_viz_notices())
+    except requests.RequestException as e:
+        logger.error(f"❌ Fallback-Scraper HTTP-Fehler: {e}")
+        return []
+    except Exception as e:
+        logger.error(f"❌ Fallback-Scraper unerwarteter Fehler: {e}")
+        return []
+    if not updates:
+        logger.info("ℹ️ Keine Meldungen im HTML - Seite wird vermutlich per JavaScript gerendert")
+    return updates
+
+def _inner_text(element):
+    """Näherung an Seleniums element.text: Text mit zusammengefassten Leerzeichen."""
+    return " ".join(element.get_text().split())
+
+def parse_viz_html(content):
+    """Extrahiert die Meldungen aus dem HTML der VIZ-Seite.
+
+    Stehen die Meldungen im HTML, wird nur die Meldungsliste geparst
+    (SoupStrainer, lxml falls installiert). Sonst läuft die Selektor-Kaskade
+    über den ganzen Baum, beginnend mit dem zuletzt erfolgreichen Selektor.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+
+    items = []
+    if not needs_js_rendering(content):
+        soup = BeautifulSoup(content, PARSER_BACKEND, parse_only=ITEM_STRAINER)
+        selector, items = _select_items(soup, ITEM_SELECTORS_STRAINED)
+
+    if not items:
+        soup = BeautifulSoup(content, PARSER_BACKEND)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"🔍 Body-Text (erste 500 Zeichen): {soup.get_text(strip=True)[:500]}")
+        selector, items = _select_items(soup, SELECTORS_TO_TRY)
+        if not items:
+            return _parse_generic(soup)
+
+    logger.info(f"✅ {len(items)} Elemente mit Selector '{selector}' gefunden ({PARSER_BACKEND})")
+    return _items_to_notices(items)
+
+def _load_last_selector():
+    """Liest den zuletzt erfolgreichen Selektor aus SELECTOR_FILE (einmal pro Prozess)."""
+    global _last_selector, _selector_loaded
+    if not _selector_loaded:
+        _selector_loaded = True
+        try:
+            with open(SELECTOR_FILE, "r", encoding="utf-8") as f:
+                _last_selector = json.load(f).get("selector")
+        except (OSError, json.JSONDecodeError, ValueError, AttributeError):
+            _last_selector = None
+    return _last_selector
+
+def _remember_selector(selector):
+    """Merkt sich den Treffer; geschrieben wird nur, wenn sich der Selektor geändert hat."""
+    global _last_selector
+    if selector == _last_selector:
+        return
+    _last_selector = selector
+    try:
+        atomic_write_json(SELECTOR_FILE, {"selector": selector})
+    except OSError as e:
+        logger.warning(f"⚠️ Selektor konnte nicht gespeichert werden: {e}")
+
+def _select_items(soup, selectors):
+    """Probiert die Selektoren durch, den zuletzt erfolgreichen zuerst, und merkt sich den Treffer."""
+    last_selector = _load_last_selector()
+    if last_selector in selectors:
+        selectors = [last_selector] + [s for s in selectors if s != last_selector]
+    for selector in selectors:
+        finder = _CLASS_SELECTORS.get(selector)
+        items = finder(soup) if finder else soup.select(selector)
+        if items:
+            _remember_selector(selector)
+            return selector, items
+        logger.debug(f"❌ Kein Element mit Selector '{selector}' gefunden")
+    return None, []
+
+def _items_to_notices(items):
+    """Baut die Notices; Text und Felder jedes Eintrags werden genau einmal extrahiert."""
+    updates = []
+    for item in items:
+        try:
+            text_content = item.get_text()
+            
+            # Filter für zu kurze oder irrelevante Inhalte
+            if text_content.strip().lower().startswith(_SKIP_PREFIXES):
+                continue
+            
+            # Dieselben Felder wie der Selenium-Scraper (strong = Titel, spans = Details),
+            # damit die State-Schlüssel unabhängig vom Scraper identisch sind
+            strong = item.find('strong')
+            title = _inner_text(strong) if strong else None
+            span_texts = [_inner_text(span) for span in item.find_all('span')]
+            
+            notice = build_notice(text_content, title, span_texts)
+            if notice:
+                updates.append(notice)
+                if len(updates) <= 3:
+                    logger.info(f"📋 Extrahierte Nachricht {len(updates)}: {notice.message[:100]}...")
+        except Exception as e:
+            logger.debug(f"Fehler beim Verarbeiten eines Fallback-Eintrags: {e}")
+            continue
+    
+    logger.info(f"✅ Fallback-Scraper: {len(updates)} von {len(items)} Elementen verarbeitet")
+    return updates
+
+def _stripped_texts(root):
+    """get_text(strip=True) für jeden Tag unter root in einem Bottom-up-Durchlauf.
+
+    Eltern setzen ihren Text aus den Texten der Kinder zusammen, statt ihn
+    wie bei get_text pro Element erneut aus dem ganzen Teilbaum zu holen.
+    """
+    texts = {}
+    stack = [(root, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if not children_done:
+            stack.append((node, True))
+            stack.extend((child, False) for child in node.contents if isinstance(child, Tag))
+            continue
+        pieces = []
+        for child in node.contents:
+            if isinstance(child, Tag):
+                pieces.append(texts[id(child)])
+            elif type(child) in _TEXT_TYPES:
+                # Wie get_text: nur echter Text, keine Kommentare/Skripte
+                stripped = child.strip()
+                if stripped:
+                    pieces.append(stripped)
+        texts[id(node)] = "".join(pieces)
+    return texts
+
+def _parse_generic(soup):
+    """Letzte Strategien ohne bekannten Selektor: Keyword-Suche, dann alle li-Elemente."""
+    logger.info("🔍 Keine spezifischen Selektoren erfolgreich, versuche generische Suche...")
+    keywords = ['baustelle', 'sperrung', 'störung', 'verkehr', 'straße', 'autobahn', 'umleit']
+    skip_parents = ['script', 'style', 'nav', 'header', 'footer']
+    
+    texts = _stripped_texts(soup)
+    items = []
+    for elem in soup.find_all(['div', 'li', 'article', 'section']):
+        text = texts[id(elem)].lower()
+        if (len(text) > 30 and 
+                any(keyword in text for keyword in keywords) and
+                not elem.find_parent(skip_parents)):
+            items.append(elem)
+    logger.info(f"🔄 Keyword-basierte Suche: {len(items)} relevante Elemente gefunden")
+    
+    if not items:
+        for li in soup.find_all('li'):
+            text = texts[id(li)]
+            # Mindestens 20 Zeichen, aber nicht nur Navigation/Footer-Content
+            if (len(text) > 20 and 
+                    not text.lower().startswith(('home', 'kontakt', 'impressum', 'datenschutz')) and
+                    not li.find_parent(['nav', 'footer', 'header'])):
+                items.append(li)
+        logger.info(f"🔄 Generische li-Suche: {len(items)} Elemente gefunden")
+    
+    return _items_to_notices(items)
+
+class _OpenItem:
+    """Zustand des gerade offenen Meldungseintrags im Streaming-Parser."""
+    __slots__ = ("text", "title", "title_depth", "spans", "open_spans", "li_depth", "list_depth")
+
+    def __init__(self):
+        self.text = []
+        self.title = None       # None: noch kein <strong>; Liste: Teile des ersten <strong>
+        self.title_depth = 0    # > 0, solange das erste <strong> offen ist
+        self.spans = []         # Textteile je <span>, in Dokumentreihenfolge
+        self.open_spans = []    # Indizes der offenen <span> (verschachtelte erben den Text)
+        self.li_depth = 0       # verschachtelte <li> innerhalb des Eintrags
+        self.list_depth = 0     # verschachtelte <ul>/<ol> innerhalb des Eintrags
+
+class ItemStreamParser(HTMLParser):
+    """Inkrementeller Parser: liefert jede Meldung, sobald ihr Eintrag schließt.
+
+    Es wird kein Baum aufgebaut. Gehalten werden nur der Text des offenen
+    Eintrags und die fertigen, noch nicht abgeholten Notices; der Speicher
+    bleibt unabhängig von der Seitengröße flach. Die Felder sind dieselben
+    wie in _items_to_notices (strong = Titel, spans = Details).
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.items_seen = 0
+        self._notices = []
+        self._item = None
+        self._raw_text = 0  # > 0 innerhalb von <script>/<style>
+
+    def pop_notices(self):
+        """Gibt die seit dem letzten Aufruf fertig gewordenen Notices zurück."""
+        notices, self._notices = self._notices, []
+        return notices
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._raw_text += 1
+            return
+        item = self._item
+        if tag == "li":
+            if item is None:
+                classes = next((value for name, value in attrs if name == "class"), None) or ""
+                if ITEM_CLASS in classes.split():
+                    self._item = _OpenItem()
+                return
+            if item.li_depth == 0 and item.list_depth == 0:
+                # Nächster Eintrag ohne schließendes </li> davor
+                self._close_item()
+                self.handle_starttag(tag, attrs)
+                return
+            item.li_depth += 1
+        if item is None:
+            return
+        if tag in ("ul", "ol"):
+            item.list_depth += 1
+        elif tag == "span":
+            item.open_spans.append(len(item.spans))
+            item.spans.append([])
+        elif tag == "strong":
+            if item.title is None:
+                # Nur das erste <strong> ist der Titel (wie item.find('strong'))
+                item.title = []
+                item.title_depth = 1
+            elif item.title_depth:
+                item.title_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._raw_text = max(0, self._raw_text - 1)
+            return
+        item = self._item
+        if item is None:
+            return
+        if tag == "li":
+            if item.li_depth:
+                item.li_depth -= 1
+            else:
+                self._close_item()
+        elif tag in ("ul", "ol"):
+            if item.list_depth:
+                item.list_depth -= 1
+            else:
+                # Liste schließt, ohne dass der Eintrag geschlossen wurde
+                self._close_item()
+        elif tag == "span":
+            if item.open_spans:
+                item.open_spans.pop()
+        elif tag == "strong" and item.title_depth:
+            item.title_depth -= 1
+
+    def handle_data(self, data):
+        item = self._item
+        if item is None or self._raw_text:
+            return
+        item.text.append(data)
+        if item.title_depth:
+            item.title.append(data)
+        for index in item.open_spans:
+            item.spans[index].append(data)
+
+    def close(self):
+        super().close()
+        if self._item is not None:
+            self._close_item()
+
+    def _close_item(self):
+        item, self._item = self._item, None
+        self.items_seen += 1
+        text_content = "".join(item.text)
+        if text_content.strip().lower().startswith(_SKIP_PREFIXES):
+            return
+        title = " ".join("".join(item.title).split()) if item.title is not None else None
+        span_texts = [" ".join("".join(parts).split()) for parts in item.spans]
+        notice = build_notice(text_content, title, span_texts)
+        if notice:
+            self._notices.append(notice)
+
+def _stream_encoding(response):
+    """Zeichensatz laut Content-Type; ohne Angabe UTF-8 (requests würde sonst Latin-1 annehmen)."""
+    if "charset=" in response.headers.get("Content-Type", "").lower():
+        return response.encoding
+    return "utf-8"
+
+def iter_notices(chunks, encoding="utf-8", parser=None):
+    """Parst HTML-Bytes stückweise und liefert jede Meldung, sobald ihr Eintrag geschlossen ist.
+
+    Mit parser (ItemStreamParser) kann der Aufrufer danach items_seen auswerten.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    parser = parser or ItemStreamParser()
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk))
+        yield from parser.pop_notices()
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    yield from parser.pop_notices()
+    logger.info(f"✅ Fallback-Scraper (Streaming): {parser.items_seen} Elemente verarbeitet")
+
+def stream_viz_notices(session=None, timeout=30, chunk_size=STREAM_CHUNK_SIZE):
+    """Lädt die VIZ-Seite mit stream=True und liefert die Meldungen noch während des Downloads.
+
+    Die Seite wird nie als Ganzes gehalten; Normalisierung und Diff können
+    mit den ersten Meldungen beginnen, bevor die Antwort vollständig ist.
+    """
+    session = session or _create_session()
+    logger.info(f"📡 Lade Seite (Streaming): {URL}")
+    with session.get(URL, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        count = 0
+        for notice in iter_notices(response.iter_content(chunk_size=chunk_size), _stream_encoding(response)):
+            count += 1
+            if count <= 3:
+                logger.info(f"📋 Extrahierte Nachricht {count}: {notice.message[:100]}...")
+            yield notice
@@ -0,0 +1,224 @@
+import os
+import json
+import time
+import logging
+from collections import Counter
+
+import requests
+
+from records import Notice, notice_keys
+from state_store import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+# Gefundener JSON-Endpunkt der Meldungsliste (wird wie http_cache.json committet)
+FEED_FILE = os.getenv("VIZ_FEED_FILE", "viz_feed.json")
+# Anteil der Browser-Meldungen, die der Feed exakt reproduzieren muss, bevor er gespeichert wird
+FEED_MIN_MATCH = float(os.getenv("FEED_MIN_MATCH", "0.9"))
+FEED_TIMEOUT = 20
+# Der Feed wird nur so lange ohne Browser genutzt; danach läuft Selenium mit und prüft die Abbildung erneut
+FEED_REVALIDATE_SECONDS = float(os.getenv("FEED_REVALIDATE_SECONDS", str(24 * 3600)))
+# Anteil der bekannten State-Schlüssel, die ein Feed-Ergebnis wiederfinden muss
+FEED_MIN_OVERLAP = float(os.getenv("FEED_MIN_OVERLAP", "0.5"))
+
+# Chrome-Capability: Netzwerk-Events landen im Performance-Log
+LOGGING_PREFS = {"performance": "ALL"}
+_FEED_TYPES = ("XHR", "Fetch")
+
+NOTICE_FIELDS = ("title", "description", "period", "street")
+
+def _clean(value):
+    """Wie im HTML sichtbar: Leerraum zusammengefasst."""
+    if value is None or isinstance(value, (dict, list)):
+        return ""
+    return " ".join(str(value).split())
+
+def _flatten(record, prefix=""):
+    """Skalare Werte eines Datensatzes mit Punkt-Pfad als Schlüssel (eine Ebene Verschachtelung)."""
+    flat = {}
+    for key, value in record.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and not prefix:
+            flat.update(_flatten(value, f"{path}."))
+        elif not isinstance(value, (dict, list)):
+            flat[path] = _clean(value)
+    return flat
+
+def _record_lists(data, path=()):
+    """Alle Listen von Objekten im JSON, mit dem Schlüsselpfad dorthin."""
+    if isinstance(data, list):
+        if data and all(isinstance(entry, dict) for entry in data):
+            yield list(path), data
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            yield from _record_lists(value, path + (key,))
+
+def _resolve(data, path):
+    for key in path:
+        data = data[key]
+    return data
+
+# ----------------------------- Feed → Notices -----------------------------
+def map_records(records, fields):
+    """Baut Notices aus Feed-Datensätzen; fields ordnet jedem Notice-Feld Schlüssel zu."""
+    notices = []
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        flat = _flatten(record)
+        values = {
+            field: " | ".join(v for v in (flat.get(key, "") for key in fields.get(field, [])) if v)
+            for field in NOTICE_FIELDS
+        }
+        notice = Notice(values["title"], values["description"], values["period"], values["street"])
+        if len(notice.message.strip()) <= 5:
+            continue
+        notices.append(notice)
+    return notices
+
+def load_feed(path=FEED_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError, ValueError):
+        return None
+
+def save_feed(feed, path=FEED_FILE):
+    atomic_write_json(path, feed, indent=2, sort_keys=True)
+
+def feed_is_stale(feed, now=None):
+    """Die Abbildung wurde länger als FEED_REVALIDATE_SECONDS nicht gegen den Browser geprüft."""
+    now = now if now is not None else time.time()
+    validated_at = feed.get("validated_at", feed.get("discovered_at", 0))
+    return now - validated_at > FEED_REVALIDATE_SECONDS
+
+def feed_overlap(notices, known_keys):
+    """Anteil der bekannten State-Schlüssel, die in den Feed-Meldungen wieder auftauchen.
+
+    Ändert die Seite ihr JSON (Felder umbenannt, anders formatiert), liefert
+    die gespeicherte Abbildung zwar noch Meldungen, aber mit anderen
+    Schlüsseln - ohne diese Prüfung würde alles als neu und behoben gepostet.
+    """
+    if not known_keys:
+        return 1.0
+    return len(known_keys & set(notice_keys(notices))) / len(known_keys)
+
+def fetch_feed_notices(feed, session=None, timeout=FEED_TIMEOUT):
+    """Liest den gespeicherten Endpunkt per HTTP und bildet ihn auf Notices ab (ohne Browser)."""
+    session = session or requests.Session()
+    logger.info(f"📡 Lade Feed: {feed['url']}")
+    response = session.get(feed["url"], timeout=timeout)
+    response.raise_for_status()
+    records = _resolve(response.json(), feed["path"])
+    notices = map_records(records, feed["fields"])
+    logger.info(f"✅ Feed: {len(notices)} von {len(records)} Datensätzen verarbeitet")
+    return notices
+
+# ----------------------------- Discovery über das Performance-Log -----------------------------
+def _json_responses(driver):
+    """GET-Antworten vom Typ XHR/Fetch mit JSON-Body aus dem Performance-Log des Browsers.
+
+    Das Log wird dabei geleert. Bodies werden per CDP Network.getResponseBody
+    nachgeladen, solange die Seite noch offen ist.
+    """
+    methods, responses = {}, []
+    for entry in driver.get_log("performance"):
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, TypeError, ValueError):
+            continue
+        params = message.get("params", {})
+        if message.get("method") == "Network.requestWillBeSent":
+            methods[params.get("requestId")] = params.get("request", {}).get("method")
+        elif message.get("method") == "Network.responseReceived" and params.get("type") in _FEED_TYPES:
+            response = params.get("response", {})
+            if "json" in (response.get("mimeType") or "") and response.get("status") == 200:
+                responses.append((params["requestId"], response["url"]))
+
+    for request_id, url in responses:
+        if methods.get(request_id, "GET") != "GET":
+            continue
+        try:
+            body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            yield url, json.loads(body.get("body") or "null")
+        except Exception as e:
+            logger.debug(f"Body von {url} nicht lesbar: {e}")
+
+def infer_fields(records, notices):
+    """Ordnet jedem Notice-Feld die Feed-Schlüssel zu, deren Werte am häufigsten passen.
+
+    Datensätze werden über den Titel mit den Browser-Meldungen gepaart. Die
+    Beschreibung kann aus mehreren Schlüsseln bestehen (' | '-getrennt); leere
+    Werte fehlen darin, daher zählt jeder Schlüssel einzeln und behält seine Position.
+    """
+    by_title = {notice.title: notice for notice in notices if notice.title}
+    votes = {field: Counter() for field in NOTICE_FIELDS}
+    positions = Counter()
+    for record in records:
+        flat = _flatten(record)
+        notice = next((by_title[v] for v in flat.values() if v in by_title), None)
+        if notice is None:
+            continue
+        for field in ("title", "period", "street"):
+            key = next((k for k, v in flat.items() if v and v == getattr(notice, field)), None)
+            if key is not None:
+                votes[field][key] += 1
+        for position, part in enumerate(notice.description.split(" | ") if notice.description else []):
+            key = next((k for k, v in flat.items() if v == part), None)
+            if key is not None:
+                votes["description"][key] += 1
+                positions[key] += position
+
+    fields = {field: [votes[field].most_common(1)[0][0]] for field in ("title", "period", "street") if votes[field]}
+    if votes["description"]:
+        keys = votes["description"]
+        fields["description"] = sorted(keys, key=lambda key: positions[key] / keys[key])
+    return fields
+
+def discover_feed(driver, notices, path=FEED_FILE):
+    """Sucht im Netzwerkverkehr der gerade geladenen Seite den Endpunkt der Meldungsliste.
+
+    Gespeichert wird er nur, wenn seine Abbildung mindestens FEED_MIN_MATCH
+    der Browser-Meldungen exakt reproduziert; dann kommen die nächsten Läufe
+    ohne Browser aus. Gibt den Feed oder None zurück.
+    """
+    if not notices:
+        return None
+    expected = {notice.message for notice in notices}
+    best = None
+    for url, data in _json_responses(driver):
+        for record_path, records in _record_lists(data):
+            fields = infer_fields(records, notices)
+            if "title" not in fields:
+                continue
+            matched = len(expected & {n.message for n in map_records(records, fields)})
+            if best is None or matched > best["matched"]:
+                best = {"url": url, "path": record_path, "fields": fields, "matched": matched}
+
+    if best is None or best["matched"] < len(expected) * FEED_MIN_MATCH:
+        found = best["matched"] if best else 0
+        logger.info(f"🔎 Kein passender Feed gefunden ({found}/{len(expected)} Meldungen reproduziert)")
+        return None
+
+    now = int(time.time())
+    previous = load_feed(path)
+    if previous and (previous.get("url"), previous.get("path"), previous.get("fields")) == (
+            best["url"], best["path"], best["fields"]):
+        if not feed_is_stale(previous, now):
+            return previous
+        # Abbildung bestätigt: nur den Prüfzeitpunkt erneuern
+        previous["validated_at"] = now
+        logger.info(f"🔎 Feed erneut bestätigt ({best['matched']}/{len(expected)} Meldungen)")
+        try:
+            save_feed(previous, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Feed konnte nicht gespeichert werden: {e}")
+        return previous
+
+    best["discovered_at"] = best["validated_at"] = now
+    logger.info(f"🔎 Feed gefunden: {best['url']} ({best['matched']}/{len(expected)} Meldungen)")
+    try:
+        save_feed(best, path)
+    except OSError as e:
+        logger.warning(f"⚠️ Feed konnte nicht gespeichert werden: {e}")
+    return best
@@ -0,0 +1,97 @@
+import os
+import json
+import hashlib
+import logging
+
+import normalize
+import matcher
+import records
+from state_store import STATE_FILE, atomic_write_json
+from normalize import normalize_many
+from matcher import is_berlin_related
+
+logger = logging.getLogger(__name__)
+
+# Ergebnisse pro Meldungs-Rohtext aus dem letzten Lauf (reiner Cache, per actions/cache wiederhergestellt)
+FINGERPRINT_FILE = os.path.join(os.path.dirname(STATE_FILE), "fingerprints.json")
+
+def _code_version():
+    """Hash von Notice-Aufbau, Normalisierung und Berlin-Filter: ändert sich deren Code, wird der Cache verworfen."""
+    digest = hashlib.blake2b(digest_size=8)
+    for module in (records, normalize, matcher):
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+CACHE_VERSION = _code_version()
+
+def fingerprint(notice):
+    """Hash des Rohtexts einer Meldung (alle Felder, vor der Normalisierung)."""
+    raw = "\0".join((notice.title, notice.description, notice.period, notice.street))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()
+
+class FingerprintCache:
+    """Merkt sich pro Fingerprint den State-Schlüssel und das Berlin-Urteil.
+
+    Unveränderte Meldungen kosten so nur einen Hash und einen Dict-Zugriff;
+    Normalisierung und Berlin-Filter laufen nur für neue Rohtexte. Beim
+    Speichern bleiben nur die Fingerprints des letzten Laufs.
+    """
+
+    def __init__(self, entries=None, path=FINGERPRINT_FILE):
+        self.entries = entries or {}
+        self.path = path
+        self._seen = set()
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path=FINGERPRINT_FILE):
+        if not os.path.exists(path):
+            return cls(path=path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, ValueError, OSError) as e:
+            logger.warning(f"⚠️ Konnte {path} nicht lesen: {e}")
+            return cls(path=path)
+        if data.get("version") != CACHE_VERSION:
+            logger.info("🧮 Normalisierung/Filter geändert - Fingerprint-Cache wird neu aufgebaut")
+            return cls(path=path)
+        return cls(data.get("entries"), path)
+
+    def save(self):
+        """Schreibt den Cache atomar, aber nur, wenn sich etwas geändert hat."""
+        if self._seen:
+            stale = self.entries.keys() - self._seen
+            for fp in stale:
+                del self.entries[fp]
+            self._dirty |= bool(stale)
+        if not self._dirty:
+            return
+        try:
+            atomic_write_json(self.path, {"version": CACHE_VERSION, "entries": self.entries}, sort_keys=True)
+            self._dirty = False
+        except OSError as e:
+            logger.warning(f"⚠️ Fingerprint-Cache konnte nicht gespeichert werden: {e}")
+
+    def resolve(self, notices):
+        """Gibt [(notice, key)] der Berlin-bezogenen Meldungen zurück (Reihenfolge bleibt).
+
+        Nur Meldungen mit unbekanntem Fingerprint werden normalisiert und
+        auf Berlin-Bezug geprüft.
+        """
+        fingerprints = [fingerprint(notice) for notice in notices]
+        misses = [(fp, notice) for fp, notice in zip(fingerprints, notices) if fp not in self.entries]
+        keys = normalize_many(notice.message for _, notice in misses)
+        for (fp, notice), key in zip(misses, keys):
+            self.entries[fp] = {"key": key, "berlin": is_berlin_related(notice.message)}
+        self._dirty |= bool(misses)
+        logger.info(f"🧮 Fingerprints: {len(notices) - len(misses)} unverändert, {len(misses)} neu berechnet")
+
+        resolved = []
+        for fp, notice in zip(fingerprints, notices):
+            entry = self.entries[fp]
+            self._seen.add(fp)
+            if entry["berlin"]:
+                resolved.append((notice, entry["key"]))
+        return resolved
@@ -0,0 +1,110 @@
+import os
+import json
+import time
+import logging
+
+from state_store import STATE_FILE, atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+# Fehlzählungen der verschwundenen Meldungen liegen neben dem State
+MISSES_FILE = os.path.join(os.path.dirname(STATE_FILE), "misses.json")
+# Eine Meldung gilt erst als behoben, wenn sie so oft hintereinander fehlt ...
+RESOLVE_AFTER_MISSES = int(os.getenv("RESOLVE_AFTER_MISSES", "2"))
+# ... oder seit so vielen Sekunden nicht mehr gesehen wurde
+RESOLVE_AFTER_SECONDS = float(os.getenv("RESOLVE_AFTER_SECONDS", "1800"))
+# Fällt die Anzahl unter diesen Anteil des letzten guten Laufs, ist der Lauf verdächtig
+COLLAPSE_RATIO = float(os.getenv("COLLAPSE_RATIO", "0.5"))
+# Bleibt die Anzahl so viele Läufe niedrig, gilt sie als echt
+SUSPECT_MAX_RUNS = int(os.getenv("SUSPECT_MAX_RUNS", "3"))
+
+class MissTracker:
+    """Hysterese für "behoben": zählt, wie oft eine Meldung hintereinander fehlt.
+
+    Verfolgt werden nur Meldungen, die im State stehen, aber im letzten
+    Scrape fehlten (misses, last_seen). Dazu kommt die Anzahl Meldungen des
+    letzten unverdächtigen Laufs, um eingebrochene Scrapes zu erkennen.
+    """
+
+    def __init__(self, items=None, last_count=0, last_run=None, suspect_runs=0, path=MISSES_FILE):
+        self.items = items or {}
+        self.last_count = last_count
+        self.last_run = last_run
+        self.suspect_runs = suspect_runs
+        self.path = path
+
+    @classmethod
+    def load(cls, path=MISSES_FILE):
+        if not os.path.exists(path):
+            return cls(path=path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.warning(f"⚠️ Konnte {path} nicht lesen: {e}")
+            return cls(path=path)
+        return cls(
+            data.get("items", {}), data.get("last_count", 0), data.get("last_run"),
+            data.get("suspect_runs", 0), path,
+        )
+
+    def save(self):
+        """Schreibt die Fehlzählungen atomar; OSError wird wie beim State weitergereicht."""
+        data = {
+            "last_count": self.last_count,
+            "last_run": self.last_run,
+            "suspect_runs": self.suspect_runs,
+            "items": self.items,
+        }
+        atomic_write_json(self.path, data, indent=2, sort_keys=True)
+
+    def is_suspect(self, current_count):
+        """Verdächtig: die Anzahl ist gegenüber dem letzten guten Lauf eingebrochen."""
+        if not self.last_count:
+            return False
+        return current_count < self.last_count * COLLAPSE_RATIO
+
+    def confirm_resolved(self, disappeared, current_state, now=None):
+        """Trennt verschwundene Meldungen in bestätigt behobene und noch offene.
+
+        Gibt (behoben, offen) zurück. Offene Meldungen bleiben im State, damit
+        sie beim Wiederauftauchen nicht erneut als neu gepostet werden.
+        """
+        now = int(now if now is not None else time.time())
+        previous_run = self.last_run if self.last_run is not None else now
+
+        # Nur Meldungen weiterverfolgen, die noch fehlen (wieder aufgetauchte vergessen)
+        self.items = {item: entry for item, entry in self.items.items() if item in disappeared}
+
+        suspect = self.is_suspect(len(current_state))
+        if suspect:
+            self.suspect_runs += 1
+            if self.suspect_runs >= SUSPECT_MAX_RUNS:
+                logger.warning(f"⚠️ Anzahl seit {self.suspect_runs} Läufen niedrig - gilt jetzt als echt")
+                suspect = False
+            else:
+                logger.warning(
+                    f"⚠️ Verdächtiger Lauf: {len(current_state)} statt ~{self.last_count} Meldungen "
+                    f"- keine Behoben-Meldungen ({self.suspect_runs}/{SUSPECT_MAX_RUNS})"
+                )
+        if not suspect:
+            self.suspect_runs = 0
+            self.last_count = len(current_state)
+        self.last_run = now
+
+        resolved, pending = set(), set()
+        for item in disappeared:
+            entry = self.items.setdefault(item, {"misses": 0, "last_seen": previous_run})
+            if suspect:
+                pending.add(item)
+                continue
+            entry["misses"] += 1
+            if entry["misses"] >= RESOLVE_AFTER_MISSES or now - entry["last_seen"] >= RESOLVE_AFTER_SECONDS:
+                resolved.add(item)
+                del self.items[item]
+            else:
+                pending.add(item)
+
+        if pending:
+            logger.info(f"⏳ {len(pending)} verschwundene Meldungen noch nicht als behoben gewertet")
+        return resolved, pending
@@ -0,0 +1,111 @@
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+BERLIN_INDICATORS = [
+    'berlin', 'a100', 'a111', 'a113', 'a115', 'stadtring',
+    'charlottenburg', 'neukölln', 'friedrichshain', 'kreuzberg',
+    'prenzlauer berg', 'mitte', 'wedding', 'tiergarten', 'moabit',
+    'tempelhof', 'schöneberg', 'wilmersdorf', 'zehlendorf', 'steglitz',
+    'lichterfelde', 'lankwitz', 'mariendorf', 'marzahn', 'hellersdorf',
+    'köpenick', 'treptow', 'lichtenberg', 'pankow', 'reinickendorf',
+    'spandau', 'friedrichsfelde', 'karlshorst', 'weißensee', 'buch',
+    'wittenau', 'tegel', 'siemensstadt', 'hakenfelde', 'kladow',
+    'dahlem', 'grunewald', 'westend', 'wannsee', 'nikolassee',
+    'friedrichshagen', 'rahnsdorf', 'schmöckwitz', 'rudow', 'buckow',
+    'britz', 'johannisthal', 'adlershof', 'alt-treptow', 'plänterwald',
+    'oberschöneweide', 'niederschöneweide', 'baumschulenweg', 'wuhlheide',
+    'fennpfuhl', 'rummelsburg', 'alt-hohenschönhausen', 'neu-hohenschönhausen',
+    'malchow', 'französisch buchholz', 'rosenthal', 'wilhelmsruh',
+    'gesundbrunnen', 'hansaviertel', 'hansa', 'falkenhagener feld',
+    'staaken', 'gatow', 'pichelsdorf', 'charlottenburg-nord'
+]
+
+# Filter out: Bundesstraßen außerhalb Berlins, Kreis-/Landstraßen
+NON_BERLIN_PATTERNS = [
+    r'kreis\s+(barnim|oberhavel|märkisch-oderland|dahme-spreewald|teltow-fläming|potsdam-mittelmark|havelland|oder-spree|uckermark)',
+    r'od\s+[a-zäöü]+',  # "od xyz" = Ortsdurchfahrt außerhalb Berlins
+    r'ou\s+[a-zäöü]+',  # "ou xyz" = Ortsumgehung
+    r'l\d{2,3},',  # Landstraßen ohne Berlin-Kontext
+    r'k\d{4,5},',  # Kreisstraßen
+    r'b\d+[,\s]+(od|ou|zwischen).+?(elsterwerda|cottbus|spremberg|brandenburg|potsdam|neuruppin|wittenberge|eberswalde|fürstenberg|bad belzig|zossen|königs wusterhausen)',
+]
+
+def _trie_pattern(words):
+    """Baut aus Literalen eine präfix-faktorisierte Regex (Trie als Alternation).
+
+    So prüft die Regex-Engine pro Position nur die Zweige, deren Präfix
+    passt, statt alle Indikatoren einzeln zu vergleichen.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node):
+        branches = []
+        optional = '' in node
+        for ch in sorted(k for k in node if k):
+            branches.append(re.escape(ch) + build(node[ch]))
+        if not branches:
+            return ''
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        return group + '?' if optional else group
+
+    return build(trie)
+
+# Indikatoren als Trie-Regex; Ausschlussmuster als Lookahead, damit sie keinen
+# Text verbrauchen und ein Indikator innerhalb eines Ausschlusses trotzdem gefunden wird.
+_INDICATOR_PATTERN = _trie_pattern(BERLIN_INDICATORS)
+_INDICATOR_RE = re.compile(_INDICATOR_PATTERN)
+_MATCHER_RE = re.compile(
+    f"(?P<hit>{_INDICATOR_PATTERN})|(?=(?P<excl>{'|'.join(f'(?:{p})' for p in NON_BERLIN_PATTERNS)}))"
+)
+
+# Indikatoren, die keinen Bezirk/Ortsteil bezeichnen
+NON_DISTRICT_INDICATORS = {'berlin', 'a100', 'a111', 'a113', 'a115', 'stadtring'}
+_DISTRICT_RE = re.compile(
+    r"\b(" + _trie_pattern([i for i in BERLIN_INDICATORS if i not in NON_DISTRICT_INDICATORS]) + r")\b"
+)
+
+def find_district(text: str) -> str:
+    """Erster Bezirk/Ortsteil aus BERLIN_INDICATORS im Text (als ganzes Wort), sonst ''."""
+    match = _DISTRICT_RE.search(text.lower()) if text else None
+    return match.group(1) if match else ""
+
+def is_berlin_related(message: str) -> bool:
+    """Prüft, ob eine Meldung Berlin-bezogen ist.
+
+    Ein Berlin-Indikator irgendwo im Text gewinnt; sonst filtert ein
+    Ausschlussmuster die Meldung. Meldungen ohne beides gelten als Berlin.
+    Alles in einem Durchlauf über den Text.
+    """
+    if not message:
+        return False
+
+    msg_lower = message.lower()
+
+    for match in _MATCHER_RE.finditer(msg_lower):
+        if match.lastgroup == 'hit':
+            return True
+        # Ausschluss gefunden: Rest nur noch auf Indikatoren prüfen
+        if _INDICATOR_RE.search(msg_lower, match.start()):
+            return True
+        logger.debug(f"Gefiltert (außerhalb Berlin): {message[:50]}...")
+        return False
+
+    return True
+
+def filter_berlin_related(items, key=None):
+    """Batch-Variante: gibt nur die Berlin-bezogenen Einträge zurück (Reihenfolge bleibt).
+
+    key liefert den zu prüfenden Text eines Eintrags (Standard: der Eintrag selbst).
+    """
+    if key is None:
+        return [item for item in items if is_berlin_related(item)]
+    return [item for item in items if is_berlin_related(key(item))]
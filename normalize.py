@@ -0,0 +1,45 @@
+import re
+import unicodedata
+
+# ----------------------------- Translate-Tabelle -----------------------------
+class _SymbolTable(dict):
+    """str.translate-Tabelle für unsichtbare Zeichen und So-Symbole (Emojis).
+
+    Bekannte Zeichen sind vorberechnet; jeder weitere Codepoint wird beim
+    ersten Auftreten einmal per unicodedata klassifiziert und gemerkt.
+    """
+
+    def __missing__(self, codepoint):
+        value = None if unicodedata.category(chr(codepoint)) == "So" else codepoint
+        self[codepoint] = value
+        return value
+
+_TRANSLATE_TABLE = _SymbolTable()
+for _cp in range(0x250):  # Latin-Bereich vorberechnen
+    _TRANSLATE_TABLE[_cp]
+_TRANSLATE_TABLE[0x200B] = None  # Zero Width Space
+_TRANSLATE_TABLE[0xA0] = " "     # geschütztes Leerzeichen
+
+# Alles außer erlaubten Zeichen (Buchstaben, Zahlen, Umlaute, Satzzeichen, Trenner)
+# wird zusammen mit angrenzenden Leerzeichen zu genau einem Leerzeichen.
+_DISALLOWED_RUN_RE = re.compile(r"[^a-z0-9äöüß|,.:;\/\-]+")
+
+# ----------------------------- Normalisierung -----------------------------
+def normalize_message(message: str) -> str:
+    """Normiert Meldungen für stabilen Vergleich im State-File."""
+    if not message or not isinstance(message, str):
+        return ""
+
+    msg = message.lower().strip().translate(_TRANSLATE_TABLE)
+    msg = _DISALLOWED_RUN_RE.sub(" ", msg).strip()
+    return msg.replace(" | ", "|")
+
+def normalize_many(messages):
+    """Normiert einen Strom von Meldungen und liefert die Ergebnisse einzeln (Generator)."""
+    translate_table = _TRANSLATE_TABLE
+    sub = _DISALLOWED_RUN_RE.sub
+    for message in messages:
+        if not message or not isinstance(message, str):
+            yield ""
+            continue
+        yield sub(" ", message.lower().strip().translate(translate_table)).strip().replace(" | ", "|")
@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import hashlib
+import logging
+
+from bluesky import post_on_bluesky_thread
+from post_pipeline import post_threads_detailed
+from planner import plan_posts
+from state_store import STATE_FILE, atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+# Ausstehende Posts liegen neben dem State und werden mit ihm committet
+OUTBOX_FILE = os.path.join(os.path.dirname(STATE_FILE), "outbox.json")
+# Zeitbudget pro Abarbeitung der Outbox (Sekunden)
+OUTBOX_DRAIN_SECONDS = float(os.getenv("OUTBOX_DRAIN_SECONDS", "240"))
+# Nach so vielen Fehlversuchen wird ein Eintrag verworfen
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+
+def entry_id(kind, item):
+    """Stabiler Schlüssel eines Posts: gleiche Meldung + Art → gleicher Eintrag."""
+    return hashlib.sha1(f"{kind}\0{item}".encode("utf-8")).hexdigest()[:16]
+
+class Outbox:
+    """Persistente Warteschlange für Posts.
+
+    Diff-Ergebnisse werden zuerst hier eingetragen und erst nach einem
+    erfolgreichen Post entfernt; was scheitert oder nicht mehr ins Zeitbudget
+    passt, bleibt für den nächsten Lauf liegen. Jeder Eintrag bekommt vor dem
+    ersten Versuch einen festen Zeitstempel (tid_us), aus dem die rkeys des
+    Threads abgeleitet werden - ein erneuter Versuch nach Absturz oder Timeout
+    kann so keinen Doppelpost erzeugen.
+    """
+
+    def __init__(self, entries=None, path=OUTBOX_FILE):
+        self.entries = entries or []
+        self.path = path
+        # In diesem Lauf schon versuchte Einträge (nicht zweimal pro Lauf posten)
+        self._attempted = set()
+
+    @classmethod
+    def load(cls, path=OUTBOX_FILE):
+        if not os.path.exists(path):
+            return cls(path=path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = f.read().strip()
+            entries = json.loads(data) if data else []
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.warning(f"⚠️ Konnte {path} nicht lesen: {e}")
+            entries = []
+        if entries:
+            logger.info(f"📬 Outbox geladen: {len(entries)} ausstehende Posts")
+        return cls(entries, path)
+
+    def save(self):
+        """Schreibt die Outbox atomar; OSError bricht den Lauf ab, damit kein Post verloren geht."""
+        atomic_write_json(self.path, self.entries, indent=2)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def enqueue(self, kind, item, parts):
+        """Trägt einen Post ein, sofern er nicht schon aussteht. Gibt True zurück, wenn neu."""
+        key = entry_id(kind, item)
+        if any(entry["id"] == key for entry in self.entries):
+            return False
+        self.entries.append({
+            "id": key,
+            "kind": kind,
+            "item": item,
+            "parts": parts,
+            "tid_us": None,
+            "attempts": 0,
+            "enqueued": int(time.time()),
+        })
+        return True
+
+    def _assign_timestamps(self, entries):
+        """Vergibt fehlende tid_us so, dass sich die rkeys verschiedener Threads nie überschneiden."""
+        now_us = time.time_ns() // 1000
+        for entry in self.entries:
+            if entry["tid_us"] is not None:
+                now_us = max(now_us, entry["tid_us"] + 1000 * (len(entry["parts"]) + 1))
+        for entry in entries:
+            if entry["tid_us"] is None:
+                entry["tid_us"] = now_us
+                now_us += 1000 * (len(entry["parts"]) + 1)
+
+    def drain(self, budget_seconds=OUTBOX_DRAIN_SECONDS, post_fn=post_on_bluesky_thread, entries=None):
+        """Postet ausstehende Einträge nach Priorität, soweit sie ins Zeitbudget passen.
+
+        Der Planer (planner.plan_posts) stellt zu teure Einträge ausdrücklich
+        zurück; die Deadline fängt zusätzlich Fehlschätzungen ab und gilt bis
+        hinunter zum Rate-Budget (RateLimiter.acquire), sodass ein 429 mitten
+        im Lauf nicht bis zum Fenster-Reset schlafen lässt. Gibt
+        (erfolgreich, fehlgeschlagen) zurück; nicht versuchte Einträge bleiben stehen.
+        """
+        if entries is None:
+            entries = [entry for entry in self.entries if entry["id"] not in self._attempted]
+        if not entries:
+            return 0, 0
+
+        pending, deferred = plan_posts(entries, budget_seconds)
+        for entry in deferred:
+            entry["deferred"] = entry.get("deferred", 0) + 1
+        if not pending:
+            self.save()
+            return 0, 0
+
+        # Zeitstempel persistieren, bevor irgendetwas gesendet wird
+        self._assign_timestamps(pending)
+        self.save()
+
+        threads = [(entry["parts"][0], entry) for entry in pending]
+        deadline = time.monotonic() + budget_seconds
+        results = post_threads_detailed(
+            threads, post_fn=lambda entry: post_fn(entry["parts"], entry["tid_us"], deadline), deadline=deadline
+        )
+
+        done = set()
+        for entry, result in zip(pending, results):
+            if result is not None:
+                self._attempted.add(entry["id"])
+            if result:
+                done.add(entry["id"])
+            elif result is False:
+                entry["attempts"] += 1
+                if entry["attempts"] >= OUTBOX_MAX_ATTEMPTS:
+                    logger.error(f"❌ Post nach {entry['attempts']} Versuchen verworfen: {entry['item'][:50]}...")
+                    done.add(entry["id"])
+        self.entries = [entry for entry in self.entries if entry["id"] not in done]
+        self.save()
+
+        skipped = results.count(None)
+        if skipped:
+            logger.info(f"⏭️ Zeitbudget erschöpft: {skipped} Posts auf den nächsten Lauf verschoben")
+        return results.count(True), results.count(False)
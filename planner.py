@@ -0,0 +1,57 @@
+import os
+import re
+import logging
+
+from scheduler import posting_limiter
+from post_pipeline import POST_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+# Geschätzte Dauer eines Schreibzugriffs pro Thread-Teil (Netzwerk + PDS), Sekunden
+POST_SECONDS_PER_PART = float(os.getenv("POST_SECONDS_PER_PART", "1.5"))
+
+# Prioritätsstufen (kleiner = wichtiger), geprüft auf dem normalisierten Text
+_FULL_CLOSURE_RE = re.compile(r"vollsperrung|voll gesperrt|vollständig gesperrt|komplett gesperrt")
+_MOTORWAY_RE = re.compile(r"\ba1(?:00|11|13|15)\b|stadtring")
+_LANE_RE = re.compile(r"fahrstreifen|verengt|einengung")
+
+# Sammelmeldungen und neue Meldungen vor Änderungen vor Behoben-Meldungen
+KIND_RANK = {"digest": 0, "new": 0, "updated": 1, "resolved": 2}
+
+def severity(item):
+    """Stufe einer Meldung: 0 Vollsperrung, 1 Autobahn, 2 sonstige, 3 nur Fahrstreifen betroffen."""
+    if _FULL_CLOSURE_RE.search(item):
+        return 0
+    if _MOTORWAY_RE.search(item):
+        return 1
+    if _LANE_RE.search(item):
+        return 3
+    return 2
+
+def priority(entry):
+    """Sortierschlüssel eines Outbox-Eintrags; bei Gleichstand der ältere zuerst."""
+    return (severity(entry["item"]), KIND_RANK.get(entry["kind"], len(KIND_RANK)), entry.get("enqueued", 0))
+
+def plan_posts(entries, budget_seconds, limiter=posting_limiter, concurrency=POST_CONCURRENCY):
+    """Wählt die Einträge aus, die nach Priorität ins Zeitbudget passen.
+
+    Kosten eines Threads: ein Token im Rate-Budget (ein applyWrites-Aufruf)
+    plus POST_SECONDS_PER_PART je Teil, verteilt auf die Worker. Die Auswahl
+    endet beim ersten Eintrag, der nicht mehr passt, damit kein weniger
+    wichtiger Eintrag einen wichtigeren überholt. Gibt (ausgewählt, zurückgestellt) zurück.
+    """
+    ranked = sorted(entries, key=priority)
+    workers = max(1, concurrency)
+    parts_total = 0
+
+    for index, entry in enumerate(ranked):
+        parts_total += len(entry["parts"])
+        estimate = limiter.estimate_wait(index + 1) + parts_total * POST_SECONDS_PER_PART / workers
+        if estimate > budget_seconds:
+            selected, deferred = ranked[:index], ranked[index:]
+            logger.info(
+                f"🧮 Posting-Plan: {len(selected)} Threads passen in {budget_seconds:.0f} s, "
+                f"{len(deferred)} zurückgestellt"
+            )
+            return selected, deferred
+    return ranked, []
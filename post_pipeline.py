@@ -0,0 +1,67 @@
+import os
+import time
+import asyncio
+import logging
+
+from bluesky import post_on_bluesky_thread, BlueskyError
+from scheduler import DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+# Anzahl gleichzeitig gepostete Threads; das Rate-Budget (scheduler.posting_limiter)
+# gilt für alle Worker gemeinsam
+POST_CONCURRENCY = int(os.getenv("POST_CONCURRENCY", "4"))
+
+async def _worker(queue, post_fn, results, deadline):
+    """Holt Threads aus der Queue und postet sie; die Teile eines Threads bleiben in Reihenfolge."""
+    while True:
+        if deadline is not None and time.monotonic() >= deadline:
+            return  # Zeitbudget erschöpft → Rest bleibt unversucht (None)
+        try:
+            index, label, parts = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        try:
+            logger.info(f"📤 Poste: {label[:50]}...")
+            # Der Bluesky-Client ist synchron → im Thread-Pool ausführen
+            await asyncio.to_thread(post_fn, parts)
+            results[index] = True
+            logger.info("✅ Erfolgreich gepostet!")
+        except DeadlineExceeded as e:
+            # Nicht gescheitert, nur zu spät: bleibt unversucht (None) für den nächsten Lauf
+            logger.info(f"⏭️ Verschoben: {e}")
+        except BlueskyError as e:
+            logger.error(f"❌ Bluesky-Fehler: {e}")
+            results[index] = False
+        except Exception as e:
+            logger.error(f"❌ Unerwarteter Post-Fehler: {e}")
+            results[index] = False
+        finally:
+            queue.task_done()
+
+async def post_threads_async(threads, post_fn=post_on_bluesky_thread, concurrency=POST_CONCURRENCY, deadline=None):
+    """Postet unabhängige Threads mit höchstens concurrency Workern gleichzeitig.
+
+    threads ist eine Liste von (label, parts). Gibt pro Thread True (gepostet),
+    False (fehlgeschlagen) oder None (wegen deadline nicht versucht oder vom
+    Rate-Budget über sie hinaus verschoben) zurück.
+    deadline ist ein time.monotonic()-Zeitpunkt, ab dem kein Thread mehr begonnen wird.
+    """
+    results = [None] * len(threads)
+    if not threads:
+        return results
+
+    queue = asyncio.Queue()
+    for index, (label, parts) in enumerate(threads):
+        queue.put_nowait((index, label, parts))
+
+    workers = max(1, min(concurrency, len(threads)))
+    await asyncio.gather(*(_worker(queue, post_fn, results, deadline) for _ in range(workers)))
+    return results
+
+def post_threads_detailed(threads, post_fn=post_on_bluesky_thread, concurrency=POST_CONCURRENCY, deadline=None):
+    """Synchroner Einstieg: startet eine eigene Event-Loop und liefert das Ergebnis pro Thread."""
+    if not threads:
+        return []
+    logger.info(f"🚦 Poste {len(threads)} Threads mit bis zu {max(1, concurrency)} Workern")
+    return asyncio.run(post_threads_async(threads, post_fn, concurrency, deadline))
@@ -0,0 +1,57 @@
+from normalize import normalize_message, normalize_many
+
+class Notice:
+    """Kanonischer Datensatz einer VIZ-Meldung, unabhängig vom Scraper."""
+    __slots__ = ("title", "description", "period", "street")
+
+    def __init__(self, title="", description="", period="", street=""):
+        self.title = title
+        self.description = description
+        self.period = period
+        self.street = street
+
+    @property
+    def message(self):
+        """Meldungstext im Format 'title | description | zeitraum | location'."""
+        return " | ".join([p for p in (self.title, self.description, self.period, self.street) if p])
+
+    def key(self):
+        return notice_key(self)
+
+    def __repr__(self):
+        return f"Notice({self.message[:60]!r})"
+
+def notice_key(notice):
+    """Stabiler State-Schlüssel einer Meldung (identisch für Selenium und HTTP-Scraper)."""
+    return normalize_message(notice.message)
+
+def notice_keys(notices):
+    """Batch-Variante von notice_key (Generator, gleiche Schlüssel)."""
+    return normalize_many(notice.message for notice in notices)
+
+def build_notice(text_content, title=None, span_texts=None):
+    """Baut eine Notice aus den Rohfeldern eines Listeneintrags.
+
+    text_content ist der komplette Text des Eintrags, title der Text des
+    <strong>-Elements (None, wenn keins existiert), span_texts die Texte
+    aller <span>-Elemente (None, wenn sie nicht gelesen werden konnten).
+    """
+    if not text_content or len(text_content.strip()) < 10:
+        return None
+
+    if title is None:
+        # Fallback: ersten Teil als Titel verwenden
+        title = text_content.strip().split('\n')[0][:100]
+
+    if span_texts is not None:
+        period = next((t.replace("Zeitraum:", "").strip() for t in span_texts if "Zeitraum" in t), "")
+        street = next((t.replace("Straße:", "").strip() for t in span_texts if "Straße" in t), "")
+        description = " | ".join([t for t in span_texts if "Zeitraum" not in t and "Straße" not in t])
+        notice = Notice(title, description, period, street)
+    else:
+        # Fallback: ganzen Text verwenden
+        notice = Notice(text_content.strip().replace('\n', ' | '))
+
+    if len(notice.message.strip()) <= 5:
+        return None
+    return notice
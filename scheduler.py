@@ -0,0 +1,143 @@
+import os
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Budget, solange der Server noch keine RateLimit-Header geschickt hat
+DEFAULT_BURST = int(os.getenv("POST_DEFAULT_BURST", "10"))
+DEFAULT_RATE = float(os.getenv("POST_DEFAULT_RATE", "0.5"))  # Tokens pro Sekunde
+# Wartezeit bei 429 ohne ratelimit-reset-Header
+FALLBACK_PENALTY = 60
+
+def _header(headers, name):
+    """Case-insensitiver Header-Zugriff (HTTP/2 liefert Kleinbuchstaben)."""
+    name = name.lower()
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+def _int_header(headers, name):
+    value = _header(headers, name)
+    try:
+        return int(str(value).split(",")[0].strip()) if value is not None else None
+    except ValueError:
+        return None
+
+def _policy_window(value):
+    """Fensterlänge aus ratelimit-policy, z. B. "5000;w=3600" → 3600."""
+    for param in str(value or "").split(";")[1:]:
+        name, _, number = param.strip().partition("=")
+        if name == "w" and number.isdigit():
+            return int(number)
+    return None
+
+class DeadlineExceeded(Exception):
+    """Das Rate-Budget reicht erst nach der Deadline des Aufrufers wieder - lieber später erneut versuchen."""
+    pass
+
+class RateLimiter:
+    """Token-Bucket für Schreibzugriffe, gespeist aus den RateLimit-Headern des PDS.
+
+    ratelimit-limit/-remaining/-reset setzen das Budget des aktuellen
+    Fensters; ist es aufgebraucht, wird exakt bis zum Reset gewartet. Ohne
+    Header gilt ein lokaler Bucket (DEFAULT_BURST, DEFAULT_RATE).
+    Thread-sicher, Uhr und sleep sind für Tests austauschbar.
+    """
+
+    def __init__(self, burst=DEFAULT_BURST, rate=DEFAULT_RATE, clock=time.time, sleep=time.sleep):
+        self.rate = rate
+        self.limit = burst
+        self.tokens = float(burst)
+        self.reset_at = None  # Epoch-Sekunden aus ratelimit-reset
+        self.window = None  # Fensterlänge in Sekunden aus ratelimit-policy ("5000;w=3600")
+        self.clock = clock
+        self.sleep = sleep
+        self._last_refill = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        if self.reset_at is not None:
+            if now >= self.reset_at:
+                # Neues Fenster: volles Budget bis der Server etwas anderes sagt
+                self.tokens = float(self.limit)
+                self.reset_at = None
+        else:
+            self.tokens = min(float(self.limit), self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def try_acquire(self, cost=1):
+        """Nimmt cost Tokens, falls verfügbar. Gibt sonst die nötige Wartezeit zurück (0 = Erfolg)."""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            if self.tokens >= cost:
+                self.tokens -= cost
+                return 0
+            if self.reset_at is not None:
+                return max(self.reset_at - now, 0.01)
+            return (cost - self.tokens) / self.rate if self.rate > 0 else FALLBACK_PENALTY
+
+    def estimate_wait(self, cost):
+        """Schätzt, wie lange es dauert, bis cost Tokens verbraucht werden können (ohne zu nehmen)."""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            missing = cost - self.tokens
+            if missing <= 0:
+                return 0.0
+            if self.reset_at is not None and self.limit > 0:
+                # Erst bis zum Reset, danach volle Fenster à limit Tokens
+                window = self.window
+                if window is None:
+                    window = self.limit / self.rate if self.rate > 0 else FALLBACK_PENALTY
+                windows = int((missing - 1) // self.limit)
+                return max(self.reset_at - now, 0.0) + windows * window
+            return missing / self.rate if self.rate > 0 else float("inf")
+
+    def acquire(self, cost=1, deadline=None):
+        """Blockiert, bis das Budget cost Tokens erlaubt. Gibt die gewartete Zeit zurück.
+
+        deadline ist ein time.monotonic()-Zeitpunkt: müsste über ihn hinaus
+        gewartet werden (z. B. bis zum Reset eines Stunden-Fensters), wird
+        sofort DeadlineExceeded ausgelöst statt zu schlafen.
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(cost)
+            if not wait:
+                return waited
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise DeadlineExceeded(f"Rate-Budget erst in {wait:.0f} Sekunden wieder frei")
+            if wait >= 1:
+                logger.info(f"⏳ Rate-Budget erschöpft, warte {wait:.1f} Sekunden...")
+            self.sleep(wait)
+            waited += wait
+
+    def update_from_headers(self, headers, status_code=None):
+        """Übernimmt limit/remaining/reset aus einer Server-Antwort."""
+        limit = _int_header(headers, "ratelimit-limit")
+        remaining = _int_header(headers, "ratelimit-remaining")
+        reset = _int_header(headers, "ratelimit-reset")
+        window = _policy_window(_header(headers, "ratelimit-policy"))
+
+        with self._lock:
+            if limit is not None:
+                self.limit = limit
+            if window is not None:
+                self.window = window
+            if remaining is not None:
+                self.tokens = float(remaining)
+                self.reset_at = reset
+            if status_code == 429:
+                self.tokens = 0.0
+                self.reset_at = reset if reset is not None else self.clock() + FALLBACK_PENALTY
+            self._last_refill = self.clock()
+
+        if remaining is not None:
+            logger.debug(f"📊 Rate-Budget: {remaining}/{self.limit}, Reset: {reset}")
+
+# Gemeinsames Budget für alle Bluesky-Schreibzugriffe eines Prozesses
+posting_limiter = RateLimiter()
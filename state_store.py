@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Snapshot: sortierte JSON-Liste (Format wie bisher), Journal: eine JSON-Zeile pro Lauf
+STATE_FILE = "data.json"
+JOURNAL_FILE = "data.journal"
+# Ab dieser Journal-Größe wird in einen neuen Snapshot kompaktiert
+COMPACT_BYTES = int(os.getenv("STATE_COMPACT_BYTES", str(64 * 1024)))
+
+def _fsync_dir(path):
+    """Macht ein os.replace im Verzeichnis dauerhaft (wo unterstützt)."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def atomic_write_text(path, text, mode=0o666):
+    """Schreibt text atomar nach path (tmp + fsync + os.replace + fsync des Verzeichnisses).
+
+    Nach einem Absturz liegt entweder die alte oder die neue Datei vor, nie
+    eine halbe. Fehler werden als OSError weitergereicht; ob das einen Lauf
+    abbricht (State, Outbox) oder nur geloggt wird (Caches), entscheidet der
+    Aufrufer. mode gilt wie bei open() abzüglich umask.
+    """
+    tmp_file = f"{path}.tmp"
+    try:
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+    except BaseException:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(path)
+
+def atomic_write_json(path, data, **dump_kwargs):
+    """atomic_write_text für JSON; dump_kwargs gehen an json.dumps (Standard: ensure_ascii=False)."""
+    dump_kwargs.setdefault("ensure_ascii", False)
+    atomic_write_text(path, json.dumps(data, **dump_kwargs))
+
+def _read_snapshot():
+    if not os.path.exists(STATE_FILE):
+        return set()
+    with open(STATE_FILE, "r", encoding="utf-8") as f:
+        data = f.read().strip()
+    if not data:  # Datei leer
+        return set()
+    return set(json.loads(data))
+
+def _replay_journal(state):
+    """Spielt alle vollständigen Journal-Zeilen auf den Snapshot ein."""
+    if not os.path.exists(JOURNAL_FILE):
+        return 0
+    applied = 0
+    with open(JOURNAL_FILE, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # Abgebrochener Schreibvorgang → Zeile ignorieren
+                logger.warning(f"⚠️ Unvollständige Journal-Zeile {line_no} ignoriert")
+                continue
+            state.update(entry.get("add", []))
+            state.difference_update(entry.get("remove", []))
+            applied += 1
+    return applied
+
+def load_state():
+    """Lädt den State aus Snapshot + Journal."""
+    try:
+        state = _read_snapshot()
+    except (json.JSONDecodeError, ValueError) as e:
+        logger.warning(f"⚠️ Konnte {STATE_FILE} nicht lesen: {e}")
+        state = set()
+    except Exception as e:
+        logger.error(f"❌ Unerwarteter Fehler beim Laden von {STATE_FILE}: {e}")
+        state = set()
+
+    try:
+        applied = _replay_journal(state)
+    except Exception as e:
+        logger.error(f"❌ Unerwarteter Fehler beim Lesen von {JOURNAL_FILE}: {e}")
+        applied = 0
+
+    if state or applied:
+        logger.info(f"✅ State geladen: {len(state)} Einträge ({applied} Journal-Einträge)")
+    else:
+        logger.info("📝 Neuer State wird erstellt")
+    return state
+
+def write_snapshot(state):
+    """Schreibt einen vollständigen Snapshot atomar und leert danach das Journal.
+
+    Stürzt der Prozess zwischen Snapshot und Leeren ab, ist das harmlos:
+    das erneute Einspielen des alten Journals auf den neuen Snapshot ergibt
+    denselben State.
+    """
+    atomic_write_json(STATE_FILE, sorted(state), indent=2)
+
+    if os.path.exists(JOURNAL_FILE):
+        with open(JOURNAL_FILE, "w", encoding="utf-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
+    logger.info(f"🗜️ Snapshot geschrieben: {len(state)} Einträge, Journal geleert")
+
+def append_journal(added, removed):
+    """Hängt die Änderungen eines Laufs als eine Zeile an das Journal an."""
+    entry = {"ts": int(time.time()), "add": sorted(added), "remove": sorted(removed)}
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
+    with open(JOURNAL_FILE, "a+b") as f:
+        # Nach einem abgebrochenen Schreibvorgang erst die Zeile abschließen
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                line = "\n" + line
+        f.write(line.encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+
+def save_state(state, prev_state=None):
+    """Speichert den State als Diff gegenüber prev_state im Journal.
+
+    Ohne prev_state (oder wenn das Journal zu groß wird) wird ein
+    vollständiger Snapshot geschrieben.
+    """
+    if not isinstance(state, (set, list)):
+        logger.error("❌ Ungültiger State-Typ")
+        return False
+
+    state = set(state)
+    try:
+        if prev_state is None:
+            write_snapshot(state)
+        else:
+            added = state - prev_state
+            removed = prev_state - state
+            if added or removed:
+                append_journal(added, removed)
+            logger.info(f"📝 Journal: +{len(added)} / -{len(removed)}")
+
+            if os.path.exists(JOURNAL_FILE) and os.path.getsize(JOURNAL_FILE) > COMPACT_BYTES:
+                write_snapshot(state)
+
+        logger.info(f"💾 State gespeichert: {len(state)} Einträge")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Fehler beim Speichern des States: {e}")
+        return False
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from beautify import (
+    HASHTAGS, POST_MAX_GRAPHEMES, beautify_text, format_text, grapheme_len, hashtag_facets,
+)
+
+def _messages():
+    with open("data.json", "r", encoding="utf-8") as f:
+        messages = json.load(f)
+    # Zusätzlich Varianten mit Großschreibung (Ersetzungen greifen) und Emoji-Sequenzen
+    return messages + [f"{m.title()} 👩‍💻🇩🇪🛣️ é" * 3 for m in messages]
+
+@pytest.fixture(scope="module", params=[False, True], ids=["neu", "behoben"])
+def threads(request):
+    resolved = request.param
+    return [(message, resolved, beautify_text(message, resolved=resolved)) for message in _messages()]
+
+def test_parts_fit_post_limit(threads):
+    too_long = [part[:40] for _, _, parts in threads for part in parts if grapheme_len(part) > POST_MAX_GRAPHEMES]
+    assert not too_long
+
+def test_facets_point_at_hashtags(threads):
+    for _, _, parts in threads:
+        for part in parts:
+            data = part.encode("utf-8")
+            for facet in hashtag_facets(part):
+                index = facet["index"]
+                tag = data[index["byteStart"]:index["byteEnd"]].decode("utf-8")
+                assert tag == "#" + facet["features"][0]["tag"], part[:40]
+
+def test_split_only_drops_whitespace(threads):
+    for message, resolved, parts in threads:
+        assert "".join("".join(parts).split()) == "".join(format_text(message, resolved).split()), message[:40]
+
+def test_hashtags_stay_whole(threads):
+    for message, _, parts in threads:
+        assert parts[-1].endswith(HASHTAGS[-1]), message[:40]
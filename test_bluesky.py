@@ -0,0 +1,51 @@
+from conftest import FAKE_DID
+from thread_writer import build_thread_writes
+
+PARTS = ["Teil eins #Berlin", "Teil zwei", "Teil drei"]
+TIMESTAMP_US = 1_700_000_000_000_000
+
+def expected_rkeys(parts=PARTS):
+    return sorted(write["rkey"] for write in build_thread_writes(FAKE_DID, parts, TIMESTAMP_US))
+
+def test_thread_goes_out_in_one_apply_writes(bluesky_client, fake_pds):
+    assert bluesky_client.post_on_bluesky_thread(PARTS, TIMESTAMP_US) == 3
+    assert fake_pds.calls == ["com.atproto.repo.applyWrites"]
+    assert sorted(fake_pds.records) == expected_rkeys()
+    assert fake_pds.texts() == PARTS
+
+def test_repost_with_same_timestamp_is_idempotent(bluesky_client, fake_pds):
+    bluesky_client.post_on_bluesky_thread(PARTS, TIMESTAMP_US)
+    assert bluesky_client.post_on_bluesky_thread(PARTS, TIMESTAMP_US) == 3
+    assert len(fake_pds.records) == 3
+
+def test_fallback_uses_deterministic_rkeys(bluesky_client, fake_pds):
+    fake_pds.fail_apply_writes = True
+    assert bluesky_client.post_on_bluesky_thread(PARTS, TIMESTAMP_US) == 3
+    assert fake_pds.calls.count("com.atproto.repo.createRecord") == 3
+    assert sorted(fake_pds.records) == expected_rkeys()
+
+    # Reply-Refs zeigen auf die vorab berechneten Posts
+    writes = build_thread_writes(FAKE_DID, PARTS, TIMESTAMP_US)
+    last = fake_pds.records[writes[-1]["rkey"]]
+    assert last["reply"]["root"]["uri"] == writes[0]["uri"]
+    assert last["reply"]["parent"]["uri"] == writes[1]["uri"]
+
+def test_fallback_resumes_partial_thread_without_duplicates(bluesky_client, fake_pds):
+    fake_pds.fail_apply_writes = True
+    first = build_thread_writes(FAKE_DID, PARTS, TIMESTAMP_US)[0]
+    fake_pds.records[first["rkey"]] = first["record"]
+
+    assert bluesky_client.post_on_bluesky_thread(PARTS, TIMESTAMP_US) == 3
+    assert fake_pds.calls.count("com.atproto.repo.createRecord") == 3
+    assert sorted(fake_pds.records) == expected_rkeys()
+    assert fake_pds.texts() == PARTS
+
+def test_batch_conflict_completes_partial_thread(bluesky_client, fake_pds):
+    # Teil 1 stammt aus einem abgebrochenen Einzel-Fallback; applyWrites scheitert atomar daran
+    first = build_thread_writes(FAKE_DID, PARTS, TIMESTAMP_US)[0]
+    fake_pds.records[first["rkey"]] = first["record"]
+
+    assert bluesky_client.post_on_bluesky_thread(PARTS, TIMESTAMP_US) == 3
+    assert fake_pds.calls[0] == "com.atproto.repo.applyWrites"
+    assert sorted(fake_pds.records) == expected_rkeys()
+    assert fake_pds.texts() == PARTS
@@ -0,0 +1,42 @@
+from bot import race_scrapers
+from records import Notice
+
+def notice(i):
+    return Notice(title=f"Baustelle {i}", description="Sperrung", street=f"Straße {i}")
+
+class StubEngine:
+    def __init__(self, name, result):
+        self.name = name
+        self.result = result
+
+    def run(self):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+    def cancel(self):
+        pass
+
+class StubHealth:
+    def __init__(self):
+        self.successes, self.failures = [], []
+
+    def record_success(self, name, latency):
+        self.successes.append(name)
+
+    def record_failure(self, name):
+        self.failures.append(name)
+
+def test_collapsed_count_is_no_engine_failure():
+    health = StubHealth()
+    engines = [StubEngine("http", [notice(1), notice(2)])]
+    name, notices = race_scrapers(engines, expected_count=10, health=health)
+    assert (name, len(notices)) == ("http", 2)
+    assert health.successes == ["http"] and health.failures == []
+
+def test_exceptions_and_broken_results_are_failures():
+    health = StubHealth()
+    engines = [StubEngine("selenium", RuntimeError("kaputt")), StubEngine("http", [Notice(title="")])]
+    race_scrapers(engines, health=health)
+    assert sorted(health.failures) == ["http", "selenium"]
+    assert health.successes == []
@@ -0,0 +1,60 @@
+import json
+
+import bot
+from diffing import DiffResult, diff_states
+
+def _items():
+    with open("data.json", "r", encoding="utf-8") as f:
+        return json.load(f)
+
+WUHLHEIDE = "baustelle an der wuhlheide oberschöneweide"
+WUHLHEIDE_DETAILS = WUHLHEIDE + "|stromleitungsarbeiten, fahrbahn auf einen fahrstreifen verengt"
+
+def test_appended_details_pair_as_update():
+    items = _items()
+    assert WUHLHEIDE in items and WUHLHEIDE_DETAILS in items
+    diff = diff_states({WUHLHEIDE}, {WUHLHEIDE_DETAILS})
+    assert diff.new == set() and diff.resolved == set()
+    assert [(old, new) for old, new, _ in diff.updated] == [(WUHLHEIDE, WUHLHEIDE_DETAILS)]
+
+def test_each_notice_pairs_at_most_once():
+    other = "baustelle an der wuhlheide wuhlheide|kanalarbeiten, fahrbahn auf einen fahrstreifen verengt"
+    diff = diff_states({WUHLHEIDE}, {WUHLHEIDE_DETAILS, other})
+    assert [new for _, new, _ in diff.updated] == [WUHLHEIDE_DETAILS]
+    assert diff.new == {other}
+
+    extended = WUHLHEIDE_DETAILS + " bis 31.12."
+    diff = diff_states({WUHLHEIDE, WUHLHEIDE_DETAILS}, {extended})
+    assert [(old, new) for old, new, _ in diff.updated] == [(WUHLHEIDE_DETAILS, extended)]
+    assert diff.resolved == {WUHLHEIDE}
+
+def test_shared_boilerplate_at_another_place_is_no_update():
+    old = "baustelle alt-biesdorf biesdorf|baustelle, fahrbahn auf einen fahrstreifen verengt"
+    new = "baustelle argentinische allee zehlendorf|baustelle, fahrbahn auf einen fahrstreifen verengt"
+    diff = diff_states({old}, {new})
+    assert diff.updated == [] and diff.new == {new} and diff.resolved == {old}
+
+def test_unchanged_notices_are_not_in_the_diff():
+    items = set(_items())
+    diff = diff_states(items, items)
+    assert (diff.new, diff.resolved, diff.updated) == (set(), set(), [])
+
+class StubOutbox:
+    def __init__(self):
+        self.entries = []
+
+    def enqueue(self, kind, item, parts):
+        self.entries.append((kind, item))
+
+def test_suppress_mode_posts_no_updates(monkeypatch):
+    diff = DiffResult(new={"baustelle a"}, resolved={"baustelle b"}, updated=[(WUHLHEIDE, WUHLHEIDE_DETAILS, 1.0)])
+
+    monkeypatch.setattr(bot, "UPDATE_MODE", "suppress")
+    outbox = StubOutbox()
+    bot.enqueue_posts(outbox, diff)
+    assert sorted(outbox.entries) == [("new", "baustelle a"), ("resolved", "baustelle b")]
+
+    monkeypatch.setattr(bot, "UPDATE_MODE", "post")
+    outbox = StubOutbox()
+    bot.enqueue_posts(outbox, diff)
+    assert ("updated", WUHLHEIDE_DETAILS) in outbox.entries
@@ -0,0 +1,37 @@
+from beautify import POST_MAX_GRAPHEMES, grapheme_len
+from digest import DIGEST_HASHTAGS, DIGEST_MAX_ITEMS, _pack_lines, build_digest_parts, build_digests, needs_digest
+
+def test_pack_lines_fills_posts_without_splitting_lines():
+    lines = [f"🆕 Meldung {i} 👩‍💻🇩🇪 " + "x" * 60 for i in range(20)]
+    parts = _pack_lines(lines)
+    assert all(grapheme_len(part) <= POST_MAX_GRAPHEMES for part in parts)
+    assert "\n".join(parts).split("\n") == lines
+    # Jeder Post ist so voll, dass die nächste Zeile nicht mehr hineinpasst
+    for part, following in zip(parts, parts[1:]):
+        first_line = following.split("\n", 1)[0]
+        assert grapheme_len(f"{part}\n{first_line}") > POST_MAX_GRAPHEMES
+
+def test_pack_lines_cuts_overlong_line():
+    parts = _pack_lines(["kurz", "y" * 400])
+    assert parts == ["kurz", "y" * POST_MAX_GRAPHEMES]
+
+def test_digest_parts_fit_and_count_the_rest():
+    changes = [("new", f"baustelle {i} in mitte | " + "lang " * 30) for i in range(DIGEST_MAX_ITEMS + 5)]
+    changes.append(("resolved", "sperrung alexanderplatz"))
+    parts = build_digest_parts("mitte", changes)
+
+    assert all(grapheme_len(part) <= POST_MAX_GRAPHEMES for part in parts)
+    text = "\n".join(parts)
+    assert text.startswith("📋 Sammelmeldung Mitte: 17 neu, 1 behoben")
+    assert "… und 6 weitere" in text
+    assert text.endswith(DIGEST_HASHTAGS)
+
+def test_digest_key_ignores_order():
+    changes = [("new", "baustelle in mitte"), ("resolved", "sperrung in pankow"), ("updated", "stau in mitte")]
+    assert build_digests(changes) == build_digests(list(reversed(changes)))
+    assert len(build_digests(changes)) == 2
+
+def test_needs_digest_threshold():
+    assert needs_digest(26, threshold=25)
+    assert not needs_digest(25, threshold=25)
+    assert not needs_digest(1000, threshold=0)
@@ -0,0 +1,90 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import fallback
+from bench import sample_page
+from fallback import fetch_viz_page, iter_notices, parse_viz_html
+
+def _messages():
+    with open("data.json", "r", encoding="utf-8") as f:
+        return json.load(f)
+
+@pytest.fixture(scope="module")
+def page():
+    return sample_page(_messages())
+
+def chunked(content, size):
+    return (content[i:i + size] for i in range(0, len(content), size))
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_stream_parser_matches_soup_parser(page, chunk_size):
+    expected = [n.message for n in parse_viz_html(page)]
+    assert len(expected) == len(_messages())
+    assert [n.message for n in iter_notices(chunked(page, chunk_size))] == expected
+
+def test_multibyte_characters_split_across_chunks():
+    page = "<ul><li class='construction-sites-item'><strong>Störung Straße</strong><span>Grüntaler Str. 🚧</span></li></ul>"
+    notices = list(iter_notices(chunked(page.encode("utf-8"), 1)))
+    assert [n.message for n in notices] == [n.message for n in parse_viz_html(page.encode("utf-8"))]
+    assert "Störung Straße" in notices[0].message
+
+@pytest.fixture
+def viz_server(page, monkeypatch):
+    """Liefert die Seite mit ETag aus und beantwortet If-None-Match mit 304."""
+    served = {"body": page, "etag": '"v1"'}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.headers.get("If-None-Match") == served["etag"]:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("ETag", served["etag"])
+            self.end_headers()
+            self.wfile.write(served["body"])
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(fallback, "URL", f"http://127.0.0.1:{server.server_address[1]}/")
+    yield served
+    server.shutdown()
+    server.server_close()
+
+def test_fetch_viz_page_streams_and_validates(viz_server, page):
+    first = fetch_viz_page(chunk_size=1024)
+    assert first["status"] == "changed" and first["rendered"]
+    assert [n.message for n in first["notices"]] == [n.message for n in parse_viz_html(page)]
+
+    cache = {key: first[key] for key in ("etag", "last_modified", "body_hash", "rendered")}
+    assert fetch_viz_page(cache)["status"] == "not_modified"
+
+    # Neuer ETag, gleicher Body: am Hash als unverändert erkannt
+    viz_server["etag"] = '"v2"'
+    assert fetch_viz_page(cache)["status"] == "unchanged"
+
+def test_fetch_viz_page_detects_js_only_page(viz_server):
+    viz_server["body"] = b"<html><body><div id='app'></div><script src='app.js'></script></body></html>"
+    result = fetch_viz_page()
+    assert result["notices"] == [] and not result["rendered"]
+
+def test_last_selector_survives_a_new_process(selector_file, monkeypatch):
+    page = "<div><article>Sperrung Invalidenstraße zwischen Chausseestraße und Hauptbahnhof</article></div>"
+    assert parse_viz_html(page)
+    assert json.loads(selector_file.read_text(encoding="utf-8")) == {"selector": "article"}
+
+    # Neuer Cron-Lauf: Modulzustand leer, der Selektor kommt aus der Datei und wird zuerst probiert
+    monkeypatch.setattr(fallback, "_last_selector", None)
+    monkeypatch.setattr(fallback, "_selector_loaded", False)
+    tried = []
+    select = fallback.BeautifulSoup.select
+    monkeypatch.setattr(fallback.BeautifulSoup, "select", lambda soup, selector: tried.append(selector) or select(soup, selector))
+    assert parse_viz_html(page)
+    assert tried == ["article"]
@@ -0,0 +1,68 @@
+import json
+
+import feed_discovery
+from feed_discovery import discover_feed, feed_is_stale, feed_overlap, load_feed, save_feed
+from records import Notice, notice_keys
+
+NOTICES = [Notice(f"Baustelle {i}", "Sperrung", "", f"Straße {i}") for i in range(10)]
+RECORDS = [{"titel": n.title, "info": n.description, "ort": n.street} for n in NOTICES]
+FIELDS = {"title": ["titel"], "description": ["info"], "street": ["ort"]}
+
+class FakeDriver:
+    """Liefert eine JSON-Antwort so, wie sie im Performance-Log stünde."""
+
+    def __init__(self, url, data):
+        self.url = url
+        self.data = data
+
+    def get_log(self, kind):
+        events = [
+            {"method": "Network.requestWillBeSent", "params": {"requestId": "1", "request": {"method": "GET"}}},
+            {"method": "Network.responseReceived", "params": {
+                "requestId": "1", "type": "XHR",
+                "response": {"url": self.url, "mimeType": "application/json", "status": 200},
+            }},
+        ]
+        return [{"message": json.dumps({"message": event})} for event in events]
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {"body": json.dumps(self.data)}
+
+def test_overlap_with_known_keys():
+    known = set(notice_keys(NOTICES))
+    assert feed_overlap(NOTICES, known) == 1.0
+    assert feed_overlap(NOTICES[:3], known) == 0.3
+    # Umbenanntes Feld: gleiche Anzahl, aber andere Schlüssel
+    drifted = [Notice(n.title, "", "", n.description) for n in NOTICES]
+    assert feed_overlap(drifted, known) == 0.0
+    assert feed_overlap(drifted, set()) == 1.0
+
+def test_feed_engine_rejects_drifted_mapping(monkeypatch):
+    import bot
+
+    feed = {"url": "https://example.invalid/feed", "path": ["items"], "fields": FIELDS}
+    drifted = [Notice(n.title, "", "", n.description) for n in NOTICES]
+    monkeypatch.setattr(bot, "fetch_feed_notices", lambda feed: drifted)
+    assert bot.FeedEngine(feed, set(notice_keys(NOTICES))).run() == []
+    assert bot.FeedEngine(feed).run() == drifted
+
+def test_discovery_saves_and_revalidates(tmp_path, monkeypatch):
+    path = str(tmp_path / "viz_feed.json")
+    driver = FakeDriver("https://example.invalid/feed", {"items": RECORDS})
+
+    feed = discover_feed(driver, NOTICES, path)
+    assert feed["fields"] == FIELDS and feed["path"] == ["items"]
+    assert not feed_is_stale(load_feed(path))
+
+    stale = dict(feed, validated_at=0)
+    save_feed(stale, path)
+    assert feed_is_stale(load_feed(path))
+    discover_feed(driver, NOTICES, path)
+    refreshed = load_feed(path)
+    assert not feed_is_stale(refreshed)
+    assert refreshed["discovered_at"] == feed["discovered_at"]
+
+def test_stale_without_validation_timestamp(monkeypatch):
+    monkeypatch.setattr(feed_discovery, "FEED_REVALIDATE_SECONDS", 100)
+    assert feed_is_stale({"discovered_at": 1000}, now=1101)
+    assert not feed_is_stale({"discovered_at": 1000, "validated_at": 1050}, now=1101)
@@ -0,0 +1,58 @@
+import json
+
+import fingerprints
+from fingerprints import FingerprintCache
+from matcher import is_berlin_related
+from normalize import normalize_message
+from records import Notice
+
+def notices():
+    with open("data.json", "r", encoding="utf-8") as f:
+        items = json.load(f)
+    raw = [Notice(*(item.split(" | ") + ["", "", ""])[:4]) for item in items]
+    raw.append(Notice("Sperrung", "Bauarbeiten", "", "Potsdam, Zeppelinstraße"))
+    return raw
+
+def uncached(items):
+    return [(n, normalize_message(n.message)) for n in items if is_berlin_related(n.message)]
+
+def test_cache_matches_uncached_path(tmp_path):
+    path = str(tmp_path / "fingerprints.json")
+    items = notices()
+    cold = FingerprintCache.load(path)
+    assert cold.resolve(items) == uncached(items)
+    cold.save()
+
+    warm = FingerprintCache.load(path)
+    assert warm.entries == cold.entries
+    assert warm.resolve(items) == uncached(items)
+
+def test_save_prunes_unseen_entries(tmp_path):
+    path = str(tmp_path / "fingerprints.json")
+    items = notices()
+    cache = FingerprintCache.load(path)
+    cache.resolve(items)
+    cache.save()
+
+    cache = FingerprintCache.load(path)
+    cache.resolve(items[:10])
+    cache.save()
+    assert len(FingerprintCache.load(path).entries) == len({fingerprints.fingerprint(n) for n in items[:10]})
+
+def test_code_change_discards_cache(tmp_path, monkeypatch):
+    path = str(tmp_path / "fingerprints.json")
+    cache = FingerprintCache.load(path)
+    cache.resolve(notices())
+    cache.save()
+
+    monkeypatch.setattr(fingerprints, "CACHE_VERSION", "anders")
+    assert FingerprintCache.load(path).entries == {}
+
+def test_version_covers_notice_construction(monkeypatch):
+    import records
+
+    opened = []
+    real_open = open
+    monkeypatch.setattr(fingerprints, "open", lambda path, *args: opened.append(path) or real_open(path, *args), raising=False)
+    fingerprints._code_version()
+    assert records.__file__ in opened
@@ -0,0 +1,47 @@
+import hysteresis
+from hysteresis import MissTracker
+
+def tracker(tmp_path, **kwargs):
+    return MissTracker(path=str(tmp_path / "misses.json"), **kwargs)
+
+def test_resolved_only_after_repeated_misses(tmp_path):
+    misses = tracker(tmp_path)
+    state = {"a", "b"}
+    assert misses.confirm_resolved({"x"}, state, now=1000) == (set(), {"x"})
+    assert misses.confirm_resolved({"x"}, state, now=1060) == ({"x"}, set())
+    assert misses.items == {}
+
+def test_reappearing_notice_resets_its_misses(tmp_path):
+    misses = tracker(tmp_path)
+    misses.confirm_resolved({"x"}, {"a"}, now=1000)
+    misses.confirm_resolved(set(), {"a", "x"}, now=1060)
+    assert misses.confirm_resolved({"x"}, {"a"}, now=1120) == (set(), {"x"})
+
+def test_long_absence_resolves_after_one_miss(tmp_path):
+    misses = tracker(tmp_path, last_count=1, last_run=1000)
+    now = 1000 + hysteresis.RESOLVE_AFTER_SECONDS
+    assert misses.confirm_resolved({"x"}, {"a"}, now=now) == ({"x"}, set())
+
+def test_collapsed_run_resolves_nothing_until_it_persists(tmp_path, monkeypatch):
+    monkeypatch.setattr(hysteresis, "SUSPECT_MAX_RUNS", 2)
+    misses = tracker(tmp_path, last_count=10)
+    gone = {f"m{i}" for i in range(8)}
+    small = {"a", "b"}
+
+    assert misses.confirm_resolved(gone, small, now=1000) == (set(), gone)
+    assert misses.last_count == 10
+    # Bleibt die Anzahl niedrig, gilt sie als echt und zählt wieder
+    resolved, pending = misses.confirm_resolved(gone, small, now=1060)
+    assert misses.last_count == 2
+    assert resolved == set() and pending == gone
+    assert misses.confirm_resolved(gone, small, now=1120) == (gone, set())
+
+def test_state_survives_save_and_load(tmp_path):
+    misses = tracker(tmp_path)
+    misses.confirm_resolved({"x"}, {"a"}, now=1000)
+    misses.save()
+
+    loaded = MissTracker.load(misses.path)
+    assert loaded.items == misses.items
+    assert (loaded.last_count, loaded.last_run) == (1, 1000)
+    assert loaded.confirm_resolved({"x"}, {"a"}, now=1060) == ({"x"}, set())
@@ -0,0 +1,107 @@
+import json
+
+import outbox
+from bluesky import BlueskyError
+from conftest import FAKE_DID
+from outbox import Outbox
+from scheduler import DeadlineExceeded
+from thread_writer import build_thread_writes
+
+class StubPoster:
+    """post_fn für Outbox.drain: merkt sich die Aufrufe, Ergebnis pro Meldung einstellbar."""
+
+    def __init__(self, outbox_path=None, fail=(), late=()):
+        self.calls = []
+        self.fail = set(fail)
+        self.late = set(late)
+        self.outbox_path = outbox_path
+        self.saved_tids = []
+
+    def __call__(self, parts, tid_us, deadline=None):
+        self.calls.append((parts, tid_us))
+        if self.outbox_path:
+            with open(self.outbox_path, "r", encoding="utf-8") as f:
+                self.saved_tids.append([entry["tid_us"] for entry in json.load(f)])
+        if parts[0] in self.fail:
+            raise BlueskyError("PDS nicht erreichbar")
+        if parts[0] in self.late:
+            raise DeadlineExceeded("Rate-Budget erst nach dem Reset frei")
+        return len(parts)
+
+def make_outbox(tmp_path, items=("baustelle a", "baustelle b")):
+    box = Outbox(path=str(tmp_path / "outbox.json"))
+    for item in items:
+        box.enqueue("new", item, [item, f"{item} teil 2"])
+    return box
+
+def test_enqueue_dedupes_by_entry_id(tmp_path):
+    box = make_outbox(tmp_path, ())
+    assert box.enqueue("new", "baustelle a", ["a"])
+    assert not box.enqueue("new", "baustelle a", ["a anders formatiert"])
+    assert box.enqueue("resolved", "baustelle a", ["a"])
+    assert len(box) == 2
+
+def test_timestamps_are_saved_before_sending(tmp_path):
+    box = make_outbox(tmp_path)
+    poster = StubPoster(outbox_path=box.path)
+    assert box.drain(600, post_fn=poster) == (2, 0)
+    for tids in poster.saved_tids:
+        assert len(tids) == 2 and None not in tids
+    assert sorted(tid for _, tid in poster.calls) == sorted(poster.saved_tids[0])
+    assert len(Outbox.load(box.path)) == 0
+
+def test_rkey_ranges_never_overlap(tmp_path):
+    box = make_outbox(tmp_path, [f"baustelle {i}" for i in range(5)])
+    box._assign_timestamps(box.entries[:2])
+    box._assign_timestamps(box.entries[2:])
+
+    seen = set()
+    for entry in box.entries:
+        rkeys = {write["rkey"] for write in build_thread_writes(FAKE_DID, entry["parts"], entry["tid_us"])}
+        assert not rkeys & seen
+        seen |= rkeys
+
+def test_retry_reuses_the_saved_timestamp(tmp_path):
+    box = make_outbox(tmp_path, ["baustelle a"])
+    assert box.drain(600, post_fn=StubPoster(fail={"baustelle a"})) == (0, 1)
+    tid_us = box.entries[0]["tid_us"]
+
+    # Nächster Lauf: gleicher Eintrag, gleiche rkeys
+    poster = StubPoster()
+    assert Outbox.load(box.path).drain(600, post_fn=poster) == (1, 0)
+    assert poster.calls[0][1] == tid_us
+
+def test_failing_entry_is_dropped_after_max_attempts(tmp_path, monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_MAX_ATTEMPTS", 2)
+    make_outbox(tmp_path, ["baustelle a"]).save()
+    path = str(tmp_path / "outbox.json")
+    poster = StubPoster(fail={"baustelle a"})
+
+    box = Outbox.load(path)
+    box.drain(600, post_fn=poster)
+    assert box.entries[0]["attempts"] == 1
+    # Im selben Lauf kein zweiter Versuch
+    assert box.drain(600, post_fn=poster) == (0, 0)
+
+    box = Outbox.load(path)
+    assert box.drain(600, post_fn=poster) == (0, 1)
+    assert len(box) == 0 and len(Outbox.load(path)) == 0
+
+def test_deferred_entries_stay_queued(tmp_path):
+    box = make_outbox(tmp_path)
+    poster = StubPoster()
+    assert box.drain(0, post_fn=poster) == (0, 0)
+    assert poster.calls == []
+
+    box = Outbox.load(box.path)
+    assert len(box) == 2
+    assert all(entry["deferred"] == 1 and entry["tid_us"] is None for entry in box.entries)
+
+def test_rate_limited_entry_stays_queued_without_an_attempt(tmp_path):
+    box = make_outbox(tmp_path)
+    poster = StubPoster(late={"baustelle a"})
+    assert box.drain(600, post_fn=poster) == (1, 0)
+
+    box = Outbox.load(box.path)
+    assert [entry["item"] for entry in box.entries] == ["baustelle a"]
+    assert box.entries[0]["attempts"] == 0 and box.entries[0]["tid_us"] is not None
@@ -0,0 +1,55 @@
+import planner
+from planner import plan_posts, severity
+
+class FreeLimiter:
+    """Rate-Budget ohne Wartezeit bis auf ein festes Kontingent."""
+
+    def __init__(self, tokens=100, wait=3600):
+        self.tokens = tokens
+        self.wait = wait
+
+    def estimate_wait(self, cost):
+        return 0 if cost <= self.tokens else self.wait
+
+def entry(item, kind="new", parts=1, enqueued=0):
+    return {"item": item, "kind": kind, "parts": ["x"] * parts, "enqueued": enqueued}
+
+def test_severity_levels():
+    assert severity("a100 vollsperrung") == 0
+    assert severity("a100 stau") == 1
+    assert severity("bauarbeiten friedrichstraße") == 2
+    assert severity("fahrstreifen verengt") == 3
+
+def test_priority_order_when_everything_fits():
+    entries = [
+        entry("fahrstreifen verengt"),
+        entry("baustelle", kind="resolved"),
+        entry("baustelle", kind="updated", enqueued=2),
+        entry("baustelle", enqueued=5),
+        entry("baustelle", enqueued=1),
+        entry("vollsperrung"),
+    ]
+    selected, deferred = plan_posts(entries, budget_seconds=1000, limiter=FreeLimiter(), concurrency=1)
+    assert deferred == []
+    assert selected == [entries[5], entries[4], entries[3], entries[2], entries[1], entries[0]]
+
+def test_stops_at_first_entry_over_budget(monkeypatch):
+    monkeypatch.setattr(planner, "POST_SECONDS_PER_PART", 1.0)
+    big = entry("vollsperrung", parts=5)
+    small = entry("fahrstreifen verengt")
+    medium = entry("baustelle", parts=3)
+    selected, deferred = plan_posts([small, medium, big], budget_seconds=6, limiter=FreeLimiter(), concurrency=1)
+    # Der kleine, unwichtigere Eintrag überholt den nicht passenden nicht
+    assert selected == [big]
+    assert deferred == [medium, small]
+
+def test_workers_share_the_part_cost(monkeypatch):
+    monkeypatch.setattr(planner, "POST_SECONDS_PER_PART", 1.0)
+    entries = [entry(f"baustelle {i}", parts=2) for i in range(4)]
+    assert len(plan_posts(entries, 4, limiter=FreeLimiter(), concurrency=1)[0]) == 2
+    assert len(plan_posts(entries, 4, limiter=FreeLimiter(), concurrency=2)[0]) == 4
+
+def test_rate_budget_defers_the_rest():
+    entries = [entry(f"baustelle {i}") for i in range(5)]
+    selected, deferred = plan_posts(entries, 60, limiter=FreeLimiter(tokens=3), concurrency=4)
+    assert len(selected) == 3 and len(deferred) == 2
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from atproto_client.models.dot_dict import DotDict
+
+from conftest import FAKE_DID, POST_COLLECTION
+from scheduler import DeadlineExceeded, RateLimiter
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+def make_limiter(burst=3, rate=1.0):
+    clock = FakeClock()
+    return RateLimiter(burst=burst, rate=rate, clock=clock, sleep=clock.sleep), clock
+
+def test_local_bucket_refills_at_rate():
+    limiter, clock = make_limiter(burst=2, rate=0.5)
+    assert limiter.try_acquire() == 0
+    assert limiter.try_acquire() == 0
+    assert limiter.try_acquire() == 2.0
+    clock.now += 2
+    assert limiter.try_acquire() == 0
+
+def test_acquire_waits_until_server_reset():
+    limiter, clock = make_limiter()
+    limiter.update_from_headers({"RateLimit-Limit": "5", "RateLimit-Remaining": "0", "RateLimit-Reset": "1030"})
+    assert limiter.acquire() == 30
+    assert clock.slept == [30]
+    # Neues Fenster: volles Budget laut ratelimit-limit
+    assert limiter.tokens == 4
+
+def test_429_without_reset_header_uses_fallback_penalty():
+    limiter, clock = make_limiter()
+    limiter.update_from_headers({}, 429)
+    assert limiter.try_acquire() == 60
+
+def test_estimate_wait_uses_policy_window():
+    limiter, clock = make_limiter()
+    limiter.update_from_headers({
+        "ratelimit-limit": "10", "ratelimit-remaining": "2",
+        "ratelimit-reset": "1050", "ratelimit-policy": "10;w=3600",
+    })
+    assert limiter.estimate_wait(2) == 0
+    # 3. Token erst nach dem Reset, das 13. erst ein ganzes Fenster später
+    assert limiter.estimate_wait(3) == 50
+    assert limiter.estimate_wait(13) == 50 + 3600
+
+def test_headers_from_pds_feed_the_limiter(fake_pds):
+    from bluesky import RateLimitedClient
+
+    limiter, _ = make_limiter()
+    client = RateLimitedClient(fake_pds.url, rate_limiter=limiter)
+    client._import_session_string(fake_pds.session_string())
+    payload = {"repo": FAKE_DID, "collection": POST_COLLECTION, "rkey": "3kabc", "record": {"text": "x"}}
+    client.invoke_procedure("com.atproto.repo.createRecord", data=DotDict(payload), input_encoding="application/json")
+
+    assert limiter.limit == fake_pds.limit
+    assert limiter.tokens == fake_pds.limit - 1
+    assert limiter.reset_at == fake_pds.reset
+    assert limiter.window == fake_pds.window
+
+def test_pds_error_with_ratelimit_headers_is_no_rate_limit(bluesky_client, fake_pds):
+    fake_pds.fail_apply_writes = True
+    client = bluesky_client.get_client()
+    with pytest.raises(bluesky_client.BlueskyError):
+        client.post_thread_batch(["Teil eins", "Teil zwei"])
+    assert fake_pds.calls == ["com.atproto.repo.applyWrites"] * 3
+    assert bluesky_client.posting_limiter.try_acquire() == 0
+
+def test_acquire_raises_instead_of_sleeping_past_deadline():
+    limiter, clock = make_limiter()
+    limiter.update_from_headers({"ratelimit-limit": "5", "ratelimit-remaining": "0", "ratelimit-reset": "4600"})
+    with pytest.raises(DeadlineExceeded):
+        limiter.acquire(deadline=time.monotonic() + 60)
+    assert clock.slept == []
+    # Ohne Deadline wird wie bisher bis zum Reset gewartet
+    assert limiter.acquire() == 3600
+
+def test_429_mid_drain_defers_instead_of_waiting_for_reset(bluesky_client, fake_pds):
+    fake_pds.remaining = 0
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        bluesky_client.post_on_bluesky_thread(["Teil eins"], deadline=time.monotonic() + 30)
+    assert time.monotonic() - started < 10
+    assert fake_pds.records == {}
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+import state_store
+from state_store import atomic_write_json, load_state, save_state, write_snapshot
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_store, "STATE_FILE", str(tmp_path / "data.json"))
+    monkeypatch.setattr(state_store, "JOURNAL_FILE", str(tmp_path / "data.journal"))
+    return tmp_path
+
+def journal_lines(store):
+    return (store / "data.journal").read_text(encoding="utf-8").splitlines()
+
+def test_journal_replays_onto_snapshot(store):
+    write_snapshot({"a", "b"})
+    assert save_state({"a", "c"}, {"a", "b"})
+    assert save_state({"c", "d"}, {"a", "c"})
+
+    assert len(journal_lines(store)) == 2
+    assert json.loads((store / "data.json").read_text(encoding="utf-8")) == ["a", "b"]
+    assert load_state() == {"c", "d"}
+
+def test_unchanged_state_writes_no_journal_line(store):
+    write_snapshot({"a"})
+    assert save_state({"a"}, {"a"})
+    assert not (store / "data.journal").exists()
+
+def test_removals_are_journaled(store):
+    # Auch Schlüssel, die nur aus dem geladenen State wegfallen, müssen ins Journal
+    write_snapshot({"berlin", "potsdam"})
+    loaded = load_state()
+    assert save_state({"berlin"}, loaded)
+    assert load_state() == {"berlin"}
+
+def test_truncated_journal_line_is_ignored(store):
+    write_snapshot({"a"})
+    save_state({"a", "b"}, {"a"})
+    with open(store / "data.journal", "a", encoding="utf-8") as f:
+        f.write('{"add": ["kaputt"')  # Absturz mitten im Schreiben
+
+    assert load_state() == {"a", "b"}
+    save_state({"a", "b", "c"}, {"a", "b"})
+    assert load_state() == {"a", "b", "c"}
+    assert json.loads(journal_lines(store)[-1])["add"] == ["c"]
+
+def test_large_journal_is_compacted(store, monkeypatch):
+    monkeypatch.setattr(state_store, "COMPACT_BYTES", 0)
+    write_snapshot({"a"})
+    assert save_state({"a", "b"}, {"a"})
+
+    assert journal_lines(store) == []
+    assert json.loads((store / "data.json").read_text(encoding="utf-8")) == ["a", "b"]
+    assert load_state() == {"a", "b"}
+
+def test_save_without_prev_state_writes_snapshot(store):
+    assert save_state(["b", "a"])
+    assert json.loads((store / "data.json").read_text(encoding="utf-8")) == ["a", "b"]
+    assert not (store / "data.journal").exists()
+
+def test_failed_atomic_write_keeps_old_file(store, monkeypatch):
+    path = store / "cache.json"
+    atomic_write_json(str(path), {"alt": True})
+
+    def fail_replace(src, dst):
+        raise OSError("Platte voll")
+
+    monkeypatch.setattr(state_store.os, "replace", fail_replace)
+    with pytest.raises(OSError):
+        atomic_write_json(str(path), {"neu": True})
+    assert json.loads(path.read_text(encoding="utf-8")) == {"alt": True}
+    assert not (store / "cache.json.tmp").exists()
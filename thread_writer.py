@@ -0,0 +1,111 @@
+import time
+import hashlib
+import logging
+from datetime import datetime, timezone
+
+import libipld  # wird von atproto mitinstalliert (DAG-CBOR/Multibase)
+from atproto_client.models.dot_dict import DotDict
+
+from beautify import hashtag_facets
+
+logger = logging.getLogger(__name__)
+
+POST_COLLECTION = "app.bsky.feed.post"
+POST_LANGS = ["de"]
+# applyWrites erlaubt max. 200 Operationen pro Aufruf
+MAX_BATCH_WRITES = 200
+
+_TID_ALPHABET = "234567abcdefghijklmnopqrstuvwxyz"
+
+def make_tid(timestamp_us, clock_id=0):
+    """Record-Key im TID-Format (13 Zeichen base32-sortable, 53 Bit Zeit + 10 Bit Clock-ID)."""
+    value = (timestamp_us << 10) | (clock_id & 0x3FF)
+    chars = []
+    for _ in range(13):
+        chars.append(_TID_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+def record_cid(record):
+    """CIDv1 (dag-cbor, sha2-256) eines Records, wie ihn der PDS berechnet."""
+    digest = hashlib.sha256(libipld.encode_dag_cbor(record)).digest()
+    return libipld.encode_multibase("b", b"\x01\x71\x12\x20" + digest)
+
+def _iso_timestamp(timestamp_us):
+    dt = datetime.fromtimestamp(timestamp_us / 1_000_000, tz=timezone.utc)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.") + f"{dt.microsecond // 1000:03d}Z"
+
+def build_thread_writes(did, parts, timestamp_us=None, clock_id=0):
+    """Baut alle Posts eines Threads mit vorab berechneten rkeys und Strong-Refs.
+
+    Gibt eine Liste von Dicts (rkey, uri, cid, record) in Thread-Reihenfolge
+    zurück. Jeder Teil referenziert den ersten Post als root und den
+    vorherigen als parent.
+    """
+    if timestamp_us is None:
+        timestamp_us = time.time_ns() // 1000
+
+    writes = []
+    root = parent = None
+    for i, text in enumerate(parts):
+        # 1 ms Abstand: eindeutige, aufsteigende rkeys und createdAt-Zeitstempel
+        part_us = timestamp_us + i * 1000
+        record = {
+            "$type": POST_COLLECTION,
+            "text": text,
+            "createdAt": _iso_timestamp(part_us),
+            "langs": POST_LANGS,
+        }
+        facets = hashtag_facets(text)
+        if facets:
+            record["facets"] = facets
+        if root:
+            record["reply"] = {"root": root, "parent": parent}
+
+        rkey = make_tid(part_us, clock_id)
+        cid = record_cid(record)
+        uri = f"at://{did}/{POST_COLLECTION}/{rkey}"
+        writes.append({"rkey": rkey, "uri": uri, "cid": cid, "record": record})
+
+        parent = {"uri": uri, "cid": cid}
+        if root is None:
+            root = parent
+    return writes
+
+def apply_thread_writes(client, did, writes):
+    """Schreibt alle Thread-Teile in einem com.atproto.repo.applyWrites-Aufruf."""
+    if len(writes) > MAX_BATCH_WRITES:
+        raise ValueError(f"Thread zu lang für einen applyWrites-Aufruf: {len(writes)} Teile")
+    payload = {
+        "repo": did,
+        "writes": [
+            {
+                "$type": "com.atproto.repo.applyWrites#create",
+                "collection": POST_COLLECTION,
+                "rkey": write["rkey"],
+                "value": write["record"],
+            }
+            for write in writes
+        ],
+    }
+    # Rohes JSON senden: die atproto-Modelle würden $type-Felder ergänzen und
+    # damit die vorab berechneten CIDs ungültig machen
+    client.invoke_procedure(
+        "com.atproto.repo.applyWrites", data=DotDict(payload), input_encoding="application/json"
+    )
+    logger.debug(f"✅ Thread per applyWrites geschrieben: {writes[0]['uri']}")
+    return writes
+
+def create_thread_write(client, did, write):
+    """Schreibt einen einzelnen Thread-Teil per com.atproto.repo.createRecord mit seinem festen rkey."""
+    payload = {
+        "repo": did,
+        "collection": POST_COLLECTION,
+        "rkey": write["rkey"],
+        "record": write["record"],
+    }
+    client.invoke_procedure(
+        "com.atproto.repo.createRecord", data=DotDict(payload), input_encoding="application/json"
+    )
+    logger.debug(f"✅ Thread-Teil per createRecord geschrieben: {write['uri']}")
+    return write